@@ -49,7 +49,10 @@ class MoodResponse(MoodBase):
     id: str
     created_at: datetime
     empathetic_response: Optional[str] = None  # Added for Sprint 3 empathy layer
+    cached: Optional[bool] = None  # Set by /moods/analyze when served from the sentiment cache
 
 class MoodHistory(BaseModel):
     moods: List[MoodResponse]
     count: int
+    # Opaque cursor for the next (older) page, None on the last page
+    next_cursor: Optional[str] = None
@@ -68,3 +68,5 @@ class PlanResponse(PlanBase):
 class PlanList(BaseModel):
     plans: List[PlanResponse]
     count: int
+    # Opaque cursor for the next page (None on the last page)
+    next_cursor: Optional[str] = None
@@ -7,13 +7,14 @@ from jose import JWTError
 from app.models.user import UserCreate, User, UserInDB, UserUpdate
 from app.models.token import Token
 from app.utils.security import (
-    verify_password, 
-    get_password_hash, 
+    password_hasher,
+    PasswordHasherBusy,
     create_access_token, 
     decode_token,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
 from app.utils.database import db
+from app.utils.user_cache import user_cache
 from bson import ObjectId
 from datetime import datetime
 
@@ -37,6 +38,14 @@ def get_bearer_or_cookie_token(request: Request) -> str | None:
     cookie_token = request.cookies.get("access_token")
     return cookie_token
 
+def hasher_busy_exception() -> HTTPException:
+    """503 returned when the password hashing pool is saturated"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is busy, please try again shortly",
+        headers={"Retry-After": "1"},
+    )
+
 # Dependencies
 async def get_current_user(request: Request) -> User:
     """
@@ -62,10 +71,12 @@ async def get_current_user(request: Request) -> User:
         if not token:
             raise credentials_exception
         token_data = decode_token(token)
-        user = db.get_user_by_id(token_data.user_id)
-        
+        user = user_cache.get(token_data.user_id)
         if user is None:
-            raise credentials_exception
+            user = await db.get_user_by_id(token_data.user_id)
+            if user is None:
+                raise credentials_exception
+            user_cache.put(token_data.user_id, user)
         
         return User(
             id=user["id"],
@@ -100,7 +111,7 @@ async def register_user(user_data: UserCreate):
         HTTPException: If a user with the provided email already exists
     """
     # Check if user already exists
-    existing_user = db.get_user_by_email(user_data.email)
+    existing_user = await db.get_user_by_email(user_data.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -109,7 +120,10 @@ async def register_user(user_data: UserCreate):
     
     # Create user document
     user_id = str(ObjectId())
-    hashed_password = get_password_hash(user_data.password)
+    try:
+        hashed_password = await password_hasher.hash(user_data.password)
+    except PasswordHasherBusy:
+        raise hasher_busy_exception()
     user_dict = {
         "email": user_data.email,
         "full_name": user_data.full_name,
@@ -118,7 +132,7 @@ async def register_user(user_data: UserCreate):
         "show_peer_pulse": True
     }
     
-    created_user = db.create_user(user_dict)
+    created_user = await db.create_user(user_dict)
     
     if not created_user:
         raise HTTPException(
@@ -151,7 +165,7 @@ async def login_for_access_token(response: Response, form_data: Annotated[OAuth2
         HTTPException: If the credentials are invalid
     """
     # Find user by email
-    user = db.get_user_by_email(form_data.username)
+    user = await db.get_user_by_email(form_data.username)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -159,8 +173,12 @@ async def login_for_access_token(response: Response, form_data: Annotated[OAuth2
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Verify password
-    if not verify_password(form_data.password, user["hashed_password"]):
+    # Verify password (off the event loop)
+    try:
+        password_ok = await password_hasher.verify(form_data.password, user["hashed_password"])
+    except PasswordHasherBusy:
+        raise hasher_busy_exception()
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -223,7 +241,7 @@ async def update_current_user(
         return current_user
     
     # Update user in database
-    updated_user = db.update_user(current_user.id, update_dict)
+    updated_user = await db.update_user(current_user.id, update_dict)
     
     if not updated_user:
         raise HTTPException(
@@ -1,10 +1,15 @@
 from fastapi import APIRouter, HTTPException, Depends, status
-from typing import Annotated, Optional
-from pydantic import BaseModel
+from typing import Annotated, List, Optional
+from pydantic import BaseModel, Field
+import asyncio
+import os
 
 from app.models.user import User
 from app.routes.auth import get_current_user
-from app.utils.decision import evaluate_decision
+from app.utils.decision import evaluate_decision, evaluate_decisions_batch
+
+# Maximum number of decisions per /decision/batch request
+DECISION_BATCH_MAX_ITEMS = int(os.getenv("DECISION_BATCH_MAX_ITEMS", "1000"))
 
 router = APIRouter(
     prefix="/decision",
@@ -30,6 +35,33 @@ class DecisionResponse(BaseModel):
     explanation: str
     advice: str
 
+class DecisionBatchItem(BaseModel):
+    option1: str
+    option2: str
+    context: str = ""
+    mood: str = "neutral"
+    # Explicit factors override the ones extracted from the context
+    time_pressure: Optional[float] = Field(None, ge=0, le=10)
+    fatigue: Optional[float] = Field(None, ge=0, le=10)
+    task_importance: Optional[float] = Field(None, ge=0, le=10)
+
+class DecisionBatchRequest(BaseModel):
+    items: List[DecisionBatchItem] = Field(..., min_length=1, max_length=DECISION_BATCH_MAX_ITEMS)
+    include_explanations: bool = True
+
+class DecisionBatchResult(BaseModel):
+    recommendation: str
+    confidence: int
+    option1_score: int
+    option2_score: int
+    factors: dict
+    explanation: Optional[str] = None
+    advice: Optional[str] = None
+
+class DecisionBatchResponse(BaseModel):
+    results: List[DecisionBatchResult]
+    count: int
+
 @router.post("/", response_model=DecisionResponse)
 async def make_decision(
     request: DecisionRequest,
@@ -74,3 +106,37 @@ async def make_decision(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error processing decision: {str(e)}"
         )
+
+@router.post("/batch", response_model=DecisionBatchResponse)
+async def make_decisions_batch(
+    request: DecisionBatchRequest,
+    current_user: Annotated[User, Depends(get_current_user)]
+):
+    """
+    Evaluate many decisions at once (option pairs, context sweeps, candidate blocks)
+    
+    Args:
+        request: Decision items and whether to include explanation/advice texts
+        current_user: The current authenticated user
+        
+    Returns:
+        DecisionBatchResponse: One result per item, in request order
+    """
+    items = []
+    for item in request.items:
+        if not item.option1 or not item.option2:
+            raise HTTPException(status_code=400, detail="Both options must be provided")
+        if not item.context and None in (item.time_pressure, item.fatigue, item.task_importance):
+            raise HTTPException(status_code=400, detail="Context or all three factors must be provided")
+        data = item.model_dump()
+        data["mood"] = item.mood.lower() if item.mood else "neutral"
+        items.append(data)
+    
+    try:
+        results = await asyncio.to_thread(evaluate_decisions_batch, items, request.include_explanations)
+        return DecisionBatchResponse(results=results, count=len(results))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error processing decisions: {str(e)}"
+        )
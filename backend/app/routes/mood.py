@@ -18,6 +18,7 @@ class MoodResponse(BaseModel):
     polarity: Optional[float] = None
     subjectivity: Optional[float] = None
     source: Optional[str] = None
+    cached: Optional[bool] = None
 
 @router.post("/", response_model=MoodResponse)
 async def analyze_mood(input_data: MoodInput):
@@ -1,14 +1,19 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+from fastapi.responses import StreamingResponse
 from typing import Annotated, List, Optional
-from datetime import datetime
+from datetime import date, datetime, time, timedelta
 from bson import ObjectId
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+import json
+import os
 
 from app.models.user import User
 from app.models.mood import MoodCreate, MoodResponse, MoodHistory, MoodType
 from app.utils.sentiment import analyze_sentiment
 from app.routes.auth import get_current_user
-from app.utils.database import db
+from app.utils.database import db, mood_cursor
+from app.utils.inference_batcher import emotion_batcher
+from app.utils.pagination import decode_cursor, encode_cursor
 
 router = APIRouter(
     prefix="/moods",
@@ -50,7 +55,7 @@ async def track_mood(
     mood_dict["created_at"] = now
     
     # Save mood to database
-    created_mood = db.save_mood(current_user.id, mood_dict)
+    created_mood = await db.save_mood(current_user.id, mood_dict)
     
     # Ensure we have an ID field
     if "id" not in created_mood and "_id" in created_mood:
@@ -92,11 +97,11 @@ async def analyze_mood(
     
     try:
         # Use the HuggingFace model with fallback to TextBlob
-        from app.utils.sentiment import analyze_with_huggingface, get_empathetic_response
+        from app.utils.sentiment import get_empathetic_response
         
-        # Parameter controls whether to attempt using HuggingFace
+        # Concurrent requests are micro-batched onto the model off the event loop
         # If model isn't available, it will automatically fall back to TextBlob
-        result = analyze_with_huggingface(request.text, use_huggingface=True)
+        result = await emotion_batcher.analyze(request.text)
         
         # Get empathetic response based on mood
         empathetic_response = get_empathetic_response(result["mood"])
@@ -109,36 +114,172 @@ async def analyze_mood(
             score=result.get("polarity", 0),
             language=request.language,
             created_at=datetime.now(),
-            empathetic_response=empathetic_response  # Added for Sprint 3
+            empathetic_response=empathetic_response,  # Added for Sprint 3
+            cached=result.get("cached")
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing mood: {str(e)}")
 
+# Batch analysis limits (texts per request / texts per model call)
+MOOD_BATCH_MAX_TEXTS = int(os.getenv("MOOD_BATCH_MAX_TEXTS", "5000"))
+MOOD_BATCH_CHUNK_SIZE = max(1, int(os.getenv("MOOD_BATCH_CHUNK_SIZE", "32")))
+MOOD_HISTORY_MAX_LIMIT = int(os.getenv("MOOD_HISTORY_MAX_LIMIT", "500"))
+
+class BatchAnalyzeRequest(BaseModel):
+    texts: List[str] = Field(..., min_length=1, max_length=MOOD_BATCH_MAX_TEXTS)
+    language: str = "english"
+    persist: bool = False
+
+def _batch_result_line(index: int, text: str, result: dict, language: str, mood_id: Optional[str] = None) -> str:
+    line = {
+        "index": index,
+        "text": text,
+        "mood_type": result["mood"],
+        "score": max(-1.0, min(1.0, float(result.get("polarity", 0) or 0))),
+        "language": language,
+        "source": result.get("source"),
+        "cached": bool(result.get("cached")),
+    }
+    if result.get("emotion"):
+        line["emotion"] = result["emotion"]
+    if mood_id:
+        line["id"] = mood_id
+    return json.dumps(line, ensure_ascii=False) + "\n"
+
+@router.post("/analyze/batch")
+async def analyze_mood_batch(
+    request: BatchAnalyzeRequest,
+    current_user: Annotated[User, Depends(get_current_user)],
+):
+    """
+    Analyze many texts (e.g. an imported mood journal) in one request
+    
+    Identical texts are analyzed once. Unique texts are processed in chunks of
+    MOOD_BATCH_CHUNK_SIZE and each chunk's results are streamed back as NDJSON
+    lines as soon as it completes, followed by a final summary line.
+    
+    Args:
+        request: Texts, their language and whether to save them as mood entries
+        current_user: The current authenticated user
+        
+    Returns:
+        StreamingResponse: application/x-ndjson, one result per input text
+    """
+    texts = request.texts
+    if any(not text for text in texts):
+        raise HTTPException(status_code=400, detail="Text cannot be empty")
+    
+    # Input positions of every distinct text, in first-seen order
+    positions = {}
+    for index, text in enumerate(texts):
+        positions.setdefault(text, []).append(index)
+    unique_texts = list(positions)
+    user_id = current_user.id
+    
+    async def stream():
+        persisted = 0
+        for start in range(0, len(unique_texts), MOOD_BATCH_CHUNK_SIZE):
+            chunk = unique_texts[start:start + MOOD_BATCH_CHUNK_SIZE]
+            try:
+                # On the batcher's inference thread, never next to it
+                results = await emotion_batcher.analyze_chunk(chunk)
+                
+                saved_ids = {}
+                if request.persist:
+                    now = datetime.now()
+                    entries = [
+                        (index, {
+                            "text": text,
+                            "mood_type": result["mood"],
+                            "score": max(-1.0, min(1.0, float(result.get("polarity", 0) or 0))),
+                            "language": request.language,
+                            "created_at": now,
+                        })
+                        for text, result in zip(chunk, results)
+                        for index in positions[text]
+                    ]
+                    saved = await db.save_moods_bulk(user_id, [doc for _, doc in entries])
+                    saved_ids = {index: doc["id"] for (index, _), doc in zip(entries, saved)}
+                    persisted += len(saved)
+            except Exception as e:
+                print(f"Batch mood analysis failed: {e}")
+                yield json.dumps({"error": f"Error analyzing mood: {str(e)}", "processed_unique": start}) + "\n"
+                return
+            
+            yield "".join(
+                _batch_result_line(index, text, result, request.language, saved_ids.get(index))
+                for text, result in zip(chunk, results)
+                for index in positions[text]
+            )
+        
+        yield json.dumps({"done": True, "count": len(texts), "unique": len(unique_texts), "persisted": persisted}) + "\n"
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+def _decode_mood_cursor(cursor: Optional[str]) -> Optional[dict]:
+    if not cursor:
+        return None
+    try:
+        key = decode_cursor(cursor)
+        datetime.fromisoformat(str(key.get("t")))
+        if not ObjectId.is_valid(str(key.get("id"))):
+            raise ValueError("Invalid cursor")
+        return key
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid cursor: {e}")
+
 @router.get("/", response_model=MoodHistory)
 async def get_mood_history(
     current_user: Annotated[User, Depends(get_current_user)],
-    limit: int = 10,
-    mood_type: Optional[MoodType] = None
+    limit: int = Query(default=10, ge=1, le=MOOD_HISTORY_MAX_LIMIT),
+    mood_type: Optional[MoodType] = None,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None
 ):
     """
-    Get mood history for the current user
+    Get mood history for the current user, newest first
+    
+    Pass the returned next_cursor as `before` to get the next (older) page.
+    With `after`, the page holds the entries just newer than that cursor
+    and next_cursor continues towards newer entries (pass it as `after`).
     
     Args:
         current_user: The current authenticated user
         limit: Maximum number of entries to return
         mood_type: Optional filter by mood type
+        before: Only entries older than this cursor
+        after: Only entries newer than this cursor
+        from_date: Optional first day (inclusive)
+        to_date: Optional last day (inclusive)
         
     Returns:
-        MoodHistory: The mood history
+        MoodHistory: The mood history page and the cursor of the next page
     """
-    moods = db.get_user_moods(current_user.id)
-    
-    # Filter by mood_type if provided
-    if mood_type:
-        moods = [m for m in moods if m.get("mood_type") == mood_type]
+    before_key = _decode_mood_cursor(before)
+    after_key = _decode_mood_cursor(after)
     
-    # Limit the number of results
-    moods = moods[:limit]
+    # One extra entry tells whether an older page exists
+    moods = await db.get_user_moods(
+        current_user.id,
+        limit=limit + 1,
+        before=before_key,
+        after=after_key,
+        mood_type=mood_type.value if mood_type else None,
+        start=datetime.combine(from_date, time()) if from_date else None,
+        end=datetime.combine(to_date + timedelta(days=1), time()) if to_date else None,
+    )
+    next_cursor = None
+    if len(moods) > limit:
+        if after_key is not None and before_key is None:
+            # Paging towards newer entries: the surplus is the newest one,
+            # and the next page continues after the newest entry kept
+            moods = moods[1:]
+            next_cursor = encode_cursor(mood_cursor(moods[0]))
+        else:
+            moods = moods[:limit]
+            next_cursor = encode_cursor(mood_cursor(moods[-1]))
     
     # Convert to MoodResponse objects
     mood_responses = []
@@ -158,4 +299,4 @@ async def get_mood_history(
             print(f"Error converting mood record: {e}, data: {mood}")
             continue
     
-    return MoodHistory(moods=mood_responses, count=len(mood_responses))
+    return MoodHistory(moods=mood_responses, count=len(mood_responses), next_cursor=next_cursor)
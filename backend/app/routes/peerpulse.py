@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from typing import Annotated, Optional, Dict
 from datetime import datetime, timedelta
 from app.routes.auth import get_current_user
-import hashlib, os
+import asyncio, hashlib, math, os
+from collections import deque
 from app.models.user import User
 from app.utils.database import db
+from app.utils.pulse_broadcaster import PulseBroadcaster
+from app.utils.pulse_counters import PEERPULSE_RETENTION_MINUTES, pulse_counters
+from app.utils.rate_limiter import RateLimiter
 from pydantic import BaseModel
 
 router = APIRouter(
@@ -43,7 +48,21 @@ def bucket_activity(raw: str) -> str:
     return r if r in ALLOWED_BUCKETS else 'chilling'
 
 RATE_LIMIT_MINUTES = 5
-_last_cache = { 'key': None, 'data': None, 'ts': 0 }
+pulse_rate_limiter = RateLimiter('peerpulse', RATE_LIMIT_MINUTES * 60)
+
+# In-memory mode only keeps the pulses the stats counters can still use
+PEERPULSE_MEMORY_MAX_PULSES = int(os.getenv('PEERPULSE_MEMORY_MAX_PULSES', '100000'))
+
+def _keep_in_memory(entry: dict) -> None:
+    pulses = getattr(db, 'peerpulse_mem', None)
+    if not isinstance(pulses, deque) or pulses.maxlen != PEERPULSE_MEMORY_MAX_PULSES:
+        pulses = deque(pulses or (), maxlen=PEERPULSE_MEMORY_MAX_PULSES)
+        db.peerpulse_mem = pulses
+    pulses.append(entry)
+    # Pulses arrive in time order, so expired ones sit at the front
+    cutoff = entry['created_at'] - timedelta(minutes=PEERPULSE_RETENTION_MINUTES)
+    while pulses and pulses[0]['created_at'] < cutoff:
+        pulses.popleft()
 
 @router.post("/", response_model=PulseOut, status_code=status.HTTP_201_CREATED)
 async def submit_pulse(pulse: PulseIn, current_user: Annotated[User, Depends(get_current_user)]):
@@ -57,58 +76,94 @@ async def submit_pulse(pulse: PulseIn, current_user: Annotated[User, Depends(get
         'mood': pulse.mood,
         'created_at': datetime.utcnow(),
     }
+    # Set between recording the rate limit hit and storing the pulse
+    unstored_hit = False
     try:
+        # Rate limit: one pulse per user_hash every RATE_LIMIT_MINUTES
+        retry_after = await pulse_rate_limiter.hit(user_hash)
+        if retry_after:
+            raise HTTPException(
+                status_code=429,
+                detail=f"One pulse every {RATE_LIMIT_MINUTES} minutes",
+                headers={'Retry-After': str(math.ceil(retry_after))},
+            )
+        unstored_hit = True
         if db.is_connected():
             if not hasattr(db, 'peerpulse'):
                 db.peerpulse = db.db.peerpulse
-                db.peerpulse.create_index('created_at')
-                db.peerpulse.create_index('user_hash')
-            # Rate limit: find most recent pulse for this user_hash within window
-            cutoff = datetime.utcnow() - timedelta(minutes=RATE_LIMIT_MINUTES)
-            recent = db.peerpulse.find_one({'user_hash': user_hash, 'created_at': { '$gte': cutoff }})
-            if recent:
-                raise HTTPException(status_code=429, detail=f"One pulse every {RATE_LIMIT_MINUTES} minutes")
-            db.peerpulse.insert_one(entry)
+            await db.peerpulse.insert_one(entry)
         else:
-            if not hasattr(db, 'peerpulse_mem'):
-                db.peerpulse_mem = []
-            # In-memory rate limit
-            cutoff = datetime.utcnow() - timedelta(minutes=RATE_LIMIT_MINUTES)
-            if any(r for r in db.peerpulse_mem if r['user_hash']==user_hash and r['created_at'] >= cutoff):
-                raise HTTPException(status_code=429, detail=f"One pulse every {RATE_LIMIT_MINUTES} minutes")
-            db.peerpulse_mem.append(entry)
-        # Invalidate cache
-        _last_cache['key'] = None
+            _keep_in_memory(entry)
+        unstored_hit = False
+        # Count it in the per-minute stats buckets
+        pulse_counters.record(entry['activity'], entry['mood'], entry['created_at'])
+        pulse_broadcaster.notify()
+    except HTTPException:
+        raise
     except Exception as e:
+        if unstored_hit:
+            # Nothing was stored, so do not hold the user to the window
+            try:
+                await pulse_rate_limiter.release(user_hash)
+            except Exception as release_error:
+                print(f"Failed to release peer pulse rate limit: {release_error}")
         raise HTTPException(status_code=500, detail=f"Failed to store pulse: {e}")
     return PulseOut(activity=entry['activity'], mood=entry.get('mood'), at=entry['created_at'])
 
+def _pulse_stats(window_minutes: int) -> PulseStats:
+    # Merged from per-minute counters (app/utils/pulse_counters.py), not from the raw pulses
+    counts = pulse_counters.window(window_minutes)
+    total = counts['total']
+    distribution = {k: (v / total * 100.0 if total else 0.0) for k, v in counts['activity'].items()}
+    mood_distribution = {k: (v / total * 100.0 if total else 0.0) for k, v in counts['mood'].items()}
+    return PulseStats(window_minutes=window_minutes, total=total, distribution=distribution, mood_distribution=mood_distribution)
+
+# Shared by every /stream connection: one computation per window and tick
+pulse_broadcaster = PulseBroadcaster(lambda window_minutes: _pulse_stats(window_minutes).model_dump_json())
+
+# Comment line sent when nothing changed, so proxies keep idle streams open
+STREAM_KEEPALIVE_SECONDS = float(os.getenv('PEERPULSE_STREAM_KEEPALIVE_SECONDS', '15'))
+
 @router.get("/", response_model=PulseStats)
-async def get_pulse_stats(window_minutes: int = 30, cache_seconds: int = 30):
-    # Simple cache
-    key = f"{window_minutes}:{cache_seconds}"
-    now_ts = datetime.utcnow().timestamp()
-    if _last_cache['key'] == key and (now_ts - _last_cache['ts']) < cache_seconds:
-        return _last_cache['data']
-    cutoff = datetime.utcnow() - timedelta(minutes=window_minutes)
-    records = []
-    if db.is_connected() and hasattr(db, 'peerpulse'):
-        records = list(db.peerpulse.find({'created_at': {'$gte': cutoff}}))
-    elif hasattr(db, 'peerpulse_mem'):
-        records = [r for r in db.peerpulse_mem if r['created_at'] >= cutoff]
-    total = len(records)
-    counts: Dict[str, int] = {}
-    mood_counts: Dict[str, int] = {}
-    for r in records:
-        a = r.get('activity', 'chilling')
-        counts[a] = counts.get(a, 0) + 1
-        m = (r.get('mood') or '').strip().lower()
-        if m:
-            mood_counts[m] = mood_counts.get(m, 0) + 1
-    distribution = {k: (v / total * 100.0 if total else 0.0) for k, v in counts.items()}
-    mood_distribution = {k: (v / total * 100.0 if total else 0.0) for k, v in mood_counts.items()}
-    data = PulseStats(window_minutes=window_minutes, total=total, distribution=distribution, mood_distribution=mood_distribution)
-    _last_cache['key'] = key
-    _last_cache['data'] = data
-    _last_cache['ts'] = now_ts
-    return data
+async def get_pulse_stats(window_minutes: int = Query(30, ge=1, le=PEERPULSE_RETENTION_MINUTES)):
+    return _pulse_stats(window_minutes)
+
+# Streams use one of these windows (the smallest one covering the request),
+# so the broadcaster recomputes a bounded set per tick whatever clients ask for
+STREAM_WINDOWS = sorted({
+    min(int(m), PEERPULSE_RETENTION_MINUTES)
+    for m in os.getenv('PEERPULSE_STREAM_WINDOWS', '5,15,30,60,180,360,720,1440').split(',') if m.strip()
+} | {PEERPULSE_RETENTION_MINUTES})
+
+def _stream_window(window_minutes: int) -> int:
+    return next(w for w in STREAM_WINDOWS if w >= window_minutes)
+
+@router.get("/stream")
+async def stream_pulse_stats(request: Request, window_minutes: int = Query(30, ge=1, le=PEERPULSE_RETENTION_MINUTES)):
+    """Server-sent events: the PulseStats JSON of the window, sent whenever it changes
+
+    window_minutes is rounded up to one of STREAM_WINDOWS; the payload's
+    window_minutes is the window actually used.
+    """
+    window_minutes = _stream_window(window_minutes)
+    queue = pulse_broadcaster.subscribe(window_minutes)
+    if queue is None:
+        raise HTTPException(status_code=503, detail="Too many live peer pulse subscribers, poll GET /peerpulse instead")
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    payload = await asyncio.wait_for(queue.get(), timeout=STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: pulse\ndata: {payload}\n\n"
+        finally:
+            pulse_broadcaster.unsubscribe(window_minutes, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
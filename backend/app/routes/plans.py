@@ -1,7 +1,9 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import Annotated, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+from fastapi.responses import JSONResponse
+from typing import Annotated, Literal, Optional
 from bson import ObjectId
-from datetime import datetime, time, timedelta
+from datetime import date, datetime, time, timedelta
+import os
 
 from app.models.user import User
 from app.models.plan import (
@@ -14,6 +16,16 @@ from app.models.plan import (
 )
 from app.routes.auth import get_current_user
 from app.utils.database import db
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.plan_rollups import PLAN_CALENDAR_BACKEND, finalize_calendar
+from app.utils.scheduler import plan_scheduler
+
+PLANS_PAGE_DEFAULT_LIMIT = int(os.getenv("PLANS_PAGE_DEFAULT_LIMIT", "200"))
+PLANS_PAGE_MAX_LIMIT = int(os.getenv("PLANS_PAGE_MAX_LIMIT", "1000"))
+
+# Fields PlanResponse cannot do without; always part of a projection
+PLAN_REQUIRED_FIELDS = ("title", "category", "created_at", "updated_at")
+PLAN_FIELDS = set(PlanResponse.model_fields)
 
 router = APIRouter(
     prefix="/plans",
@@ -33,48 +45,20 @@ async def get_calendar_history(
 ):
     """Return aggregated plan stats grouped by scheduled_date (calendar view).
     If month & year provided, filter to that month; otherwise return all.
+    Reads the per-day rollups kept up to date by the plan writes
+    (app/utils/plan_rollups.py), or with PLAN_CALENDAR_BACKEND=aggregation
+    groups the plans by day inside MongoDB.
     Output: { days: { 'YYYY-MM-DD': { total, completed, pending, missed, completion_rate } }, summary: {...} }
     """
-    plans = db.get_user_plans(current_user.id)
-    days: dict[str, dict] = {}
-    for p in plans:
-        day = p.get('scheduled_date')
-        if not day:
-            continue
-        if month and year:
-            if not (day.startswith(f"{year:04d}-{month:02d}")):
-                continue
-        drec = days.setdefault(day, { 'total':0, 'completed':0, 'missed':0, 'pending':0, 'planned_minutes':0, 'completed_minutes':0 })
-        drec['total'] += 1
-        status = p.get('status')
-        dur = int(p.get('duration_minutes') or 0)
-        drec['planned_minutes'] += dur
-        if status == 'completed':
-            drec['completed'] += 1
-            drec['completed_minutes'] += dur
-        elif status == 'missed':
-            drec['missed'] += 1
-        else:
-            drec['pending'] += 1
-    # compute per-day completion rate
-    for d,v in days.items():
-        v['completion_rate'] = (v['completed']/v['total']*100) if v['total'] else 0
-        v['minutes_completion_rate'] = (v['completed_minutes']/v['planned_minutes']*100) if v['planned_minutes'] else 0
-    # overall summary
-    total = sum(v['total'] for v in days.values()) or 0
-    completed = sum(v['completed'] for v in days.values())
-    total_planned = sum(v['planned_minutes'] for v in days.values()) or 0
-    total_completed_minutes = sum(v['completed_minutes'] for v in days.values()) or 0
-    summary = {
-        'days_count': len(days),
-        'total_tasks': total,
-        'completed': completed,
-        'overall_completion_rate': (completed/total*100) if total else 0,
-        'total_planned_minutes': total_planned,
-        'completed_minutes': total_completed_minutes,
-        'overall_minutes_completion_rate': (total_completed_minutes/total_planned*100) if total_planned else 0
-    }
-    return { 'days': days, 'summary': summary }
+    start_day = end_day = None
+    if month and year:
+        start_day = f"{year:04d}-{month:02d}-01"
+        end_day = f"{year:04d}-{month:02d}-31"
+    if PLAN_CALENDAR_BACKEND == "aggregation":
+        days = await db.aggregate_plan_days(current_user.id, start_day, end_day)
+    else:
+        days = await db.get_plan_rollups(current_user.id, start_day, end_day)
+    return finalize_calendar(days)
 
 def _parse_hhmm_to_minutes(value) -> int | None:
     try:
@@ -89,27 +73,12 @@ def _parse_hhmm_to_minutes(value) -> int | None:
         return None
     return None
 
-def _detect_time_conflict(user_id: str, new_start: int, new_duration: int, ignore_plan_id: str | None = None):
-    """Return existing conflicting plan dict or None.
+async def _detect_time_conflict(user_id: str, scheduled_date, new_start: int, new_duration: int, ignore_plan_id: str | None = None):
+    """Return a summary of an existing conflicting plan on the same day or None.
     Excludes completed / cancelled plans and optionally a specific plan id (for updates)."""
     if new_start is None or new_duration <= 0:
         return None
-    new_end = new_start + new_duration
-    existing_plans = db.get_user_plans(user_id)
-    for ep in existing_plans:
-        if ignore_plan_id and ep.get("id") == ignore_plan_id:
-            continue
-        status_ep = ep.get("status")
-        if status_ep in ("completed", "cancelled"):
-            continue
-        ep_start = _parse_hhmm_to_minutes(ep.get("scheduled_time"))
-        ep_dur = int(ep.get("duration_minutes") or 0)
-        ep_end = (ep_start + ep_dur) if ep_start is not None and ep_dur > 0 else None
-        if ep_start is None or ep_end is None:
-            continue
-        if new_start < ep_end and ep_start < new_end:  # overlap
-            return ep
-    return None
+    return await db.plan_index.first_overlap(user_id, scheduled_date, new_start, new_duration, ignore_plan_id=ignore_plan_id)
 
 @router.post("/", response_model=PlanResponse, status_code=status.HTTP_201_CREATED)
 async def create_plan(
@@ -135,7 +104,7 @@ async def create_plan(
         new_start = _parse_hhmm_to_minutes(plan_dict.get("scheduled_time"))
         new_dur = int(plan_dict.get("duration_minutes") or 0)
         if new_start is not None and new_dur > 0:
-            ep = _detect_time_conflict(current_user.id, new_start, new_dur)
+            ep = await _detect_time_conflict(current_user.id, plan_dict.get("scheduled_date"), new_start, new_dur)
             if ep:
                 message = (
                     "Time conflict: an existing task overlaps this time window. "
@@ -160,7 +129,8 @@ async def create_plan(
                     }
                 )
         # Create plan in database
-        created_plan = db.create_plan(plan_dict)
+        created_plan = await db.create_plan(plan_dict)
+        plan_scheduler.schedule(created_plan)
         return PlanResponse(**created_plan)
     except HTTPException:
         # Re-raise HTTPExceptions as-is (these are our own validation errors)
@@ -204,34 +174,79 @@ async def create_plan(
 async def get_plans(
     current_user: Annotated[User, Depends(get_current_user)],
     category: Optional[PlanCategory] = None,
-    status: Optional[PlanStatus] = None
+    status: Optional[PlanStatus] = None,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    limit: int = Query(default=PLANS_PAGE_DEFAULT_LIMIT, ge=1, le=PLANS_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    order: Literal["asc", "desc"] = "asc"
 ):
     """
-    Get all plans for the current user
+    Get one page of plans for the current user
+    
+    Plans are ordered by (scheduled_date, scheduled_time, id). Pass the
+    returned next_cursor back as `cursor` to get the following page.
     
     Args:
         current_user: The current authenticated user
         category: Optional filter by category
         status: Optional filter by status
+        from_date: Optional earliest scheduled_date (inclusive)
+        to_date: Optional latest scheduled_date (inclusive)
+        limit: Maximum number of plans in the page
+        cursor: next_cursor of the previous page
+        fields: Optional comma-separated fields to return (id, title, category,
+            created_at, updated_at, scheduled_date and scheduled_time are always included)
+        order: "asc" (oldest first) or "desc" (newest first)
         
     Returns:
-        PlanList: The list of plans
+        PlanList: The page of plans and the cursor of the next page
     """
-    plans = db.get_user_plans(current_user.id)
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+            if not ObjectId.is_valid(str(after.get("id"))):
+                raise ValueError("Invalid cursor")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    projection = None
+    if fields:
+        requested = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in requested if f not in PLAN_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown plan fields: {', '.join(unknown)}"
+            )
+        projection = list(dict.fromkeys([*PLAN_REQUIRED_FIELDS, *requested]))
 
-    # Coerce enums to primitive values for comparison
+    # Coerce enums to primitive values for the query
     cat_val = category.value if category is not None and hasattr(category, "value") else category
     stat_val = status.value if status is not None and hasattr(status, "value") else status
 
-    # Filter by category if provided
-    if cat_val:
-        plans = [p for p in plans if p.get("category") == cat_val]
-
-    # Filter by status if provided
-    if stat_val:
-        plans = [p for p in plans if p.get("status") == stat_val]
-    
-    return PlanList(plans=plans, count=len(plans))
+    plans, next_key = await db.find_user_plans(
+        current_user.id,
+        category=cat_val,
+        status=stat_val,
+        from_date=from_date.isoformat() if from_date else None,
+        to_date=to_date.isoformat() if to_date else None,
+        after=after,
+        limit=limit,
+        fields=projection,
+        descending=order == "desc",
+    )
+    page = PlanList(
+        plans=plans,
+        count=len(plans),
+        next_cursor=encode_cursor(next_key) if next_key else None,
+    )
+    if projection is not None:
+        # Leave out the fields that were not projected instead of defaulting them
+        return JSONResponse(page.model_dump(mode="json", exclude_unset=True) | {"next_cursor": page.next_cursor})
+    return page
 
 @router.get("/{plan_id}", response_model=PlanResponse)
 async def get_plan(
@@ -251,7 +266,7 @@ async def get_plan(
     Raises:
         HTTPException: If the plan is not found or doesn't belong to the user
     """
-    plan = db.get_plan_by_id(plan_id)
+    plan = await db.get_plan_by_id(plan_id)
     
     if not plan:
         raise HTTPException(
@@ -289,7 +304,7 @@ async def update_plan(
         HTTPException: If the plan is not found, doesn't belong to the user, or there was an error updating
     """
     # Get the plan to verify ownership
-    plan = db.get_plan_by_id(plan_id)
+    plan = await db.get_plan_by_id(plan_id)
     
     if not plan:
         raise HTTPException(
@@ -314,11 +329,12 @@ async def update_plan(
     prospective_scheduled = update_dict.get("scheduled_time", plan.get("scheduled_time"))
     prospective_duration = int(update_dict.get("duration_minutes", plan.get("duration_minutes") or 0) or 0)
     prospective_status = update_dict.get("status", plan.get("status"))
+    prospective_date = update_dict.get("scheduled_date") or plan.get("scheduled_date")
     # If status is moving to completed, conflicts no longer matter – but still block if scheduling change collides while not completed
     if prospective_scheduled and prospective_duration > 0 and prospective_status not in ("completed", "cancelled"):
         st_mins = _parse_hhmm_to_minutes(prospective_scheduled)
         if st_mins is not None:
-            ep = _detect_time_conflict(current_user.id, st_mins, prospective_duration, ignore_plan_id=plan_id)
+            ep = await _detect_time_conflict(current_user.id, prospective_date, st_mins, prospective_duration, ignore_plan_id=plan_id)
             if ep:
                 scheduled_time = ep.get("scheduled_time")
                 time_str = scheduled_time
@@ -340,7 +356,7 @@ async def update_plan(
                 )
 
     # Update plan in database
-    updated_plan = db.update_plan(plan_id, update_dict)
+    updated_plan = await db.update_plan(plan_id, update_dict)
     
     if not updated_plan:
         raise HTTPException(
@@ -348,6 +364,7 @@ async def update_plan(
             detail="Error updating plan"
         )
     
+    plan_scheduler.schedule(updated_plan)
     return PlanResponse(**updated_plan)
 
 @router.post("/{plan_id}/snooze", response_model=PlanResponse)
@@ -363,7 +380,7 @@ async def snooze_plan(
     if minutes <= 0 or minutes > 240:
         raise HTTPException(status_code=400, detail="Invalid snooze minutes")
 
-    plan = db.get_plan_by_id(plan_id)
+    plan = await db.get_plan_by_id(plan_id)
     if not plan:
         raise HTTPException(status_code=404, detail="Plan not found")
     if plan["user_id"] != current_user.id:
@@ -385,9 +402,10 @@ async def snooze_plan(
     new_dt = base_dt + timedelta(minutes=minutes)
     new_st = f"{new_dt.hour:02d}:{new_dt.minute:02d}"
 
-    updated = db.update_plan(plan_id, {"scheduled_time": new_st, "status": "snoozed"})
+    updated = await db.update_plan(plan_id, {"scheduled_time": new_st, "status": "snoozed"})
     if not updated:
         raise HTTPException(status_code=500, detail="Error snoozing plan")
+    plan_scheduler.schedule(updated)
     return PlanResponse(**updated)
 
 @router.post("/{plan_id}/reminder", response_model=PlanResponse)
@@ -402,13 +420,13 @@ async def set_plan_reminder(
     if lead_minutes < 0 or lead_minutes > 120:
         raise HTTPException(status_code=400, detail="lead_minutes must be between 0 and 120")
 
-    plan = db.get_plan_by_id(plan_id)
+    plan = await db.get_plan_by_id(plan_id)
     if not plan:
         raise HTTPException(status_code=404, detail="Plan not found")
     if plan["user_id"] != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to update this plan")
 
-    updated = db.update_plan(plan_id, {"reminder_lead_minutes": lead_minutes})
+    updated = await db.update_plan(plan_id, {"reminder_lead_minutes": lead_minutes})
     if not updated:
         raise HTTPException(status_code=500, detail="Error updating reminder settings")
     return PlanResponse(**updated)
@@ -429,7 +447,7 @@ async def delete_plan(
         HTTPException: If the plan is not found, doesn't belong to the user, or there was an error deleting
     """
     # Get the plan to verify ownership
-    plan = db.get_plan_by_id(plan_id)
+    plan = await db.get_plan_by_id(plan_id)
     
     if not plan:
         raise HTTPException(
@@ -445,10 +463,12 @@ async def delete_plan(
         )
     
     # Delete the plan
-    success = db.delete_plan(plan_id)
+    success = await db.delete_plan(plan_id)
     
     if not success:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error deleting plan"
         )
+    
+    plan_scheduler.unschedule(plan_id)
@@ -1,6 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
+from jose import JWTError
 from app.utils.response_picker import get_quote
+from app.utils.security import decode_token
+from app.routes.auth import get_bearer_or_cookie_token
 
 router = APIRouter(
     prefix="/quote",
@@ -17,8 +20,18 @@ class QuoteResponse(BaseModel):
     mood: str
     language: str
 
+def _rotation_key(request: Request) -> str:
+    """Owner of the no-repeat rotation: the signed-in user, else the client address"""
+    token = get_bearer_or_cookie_token(request)
+    if token:
+        try:
+            return f"user:{decode_token(token).user_id}"
+        except JWTError:
+            pass
+    return f"client:{request.client.host if request.client else 'unknown'}"
+
 @router.get("/", response_model=QuoteResponse)
-async def get_motivational_quote(mood: str, language: str = "english"):
+async def get_motivational_quote(request: Request, mood: str, language: str = "english"):
     """
     Get a motivational quote based on mood and language
     
@@ -30,7 +43,7 @@ async def get_motivational_quote(mood: str, language: str = "english"):
         A motivational quote
     """
     try:
-        quote = get_quote(mood, language)
+        quote = await get_quote(mood, language, _rotation_key(request))
         return {"quote": quote, "mood": mood, "language": language}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting quote: {str(e)}")
@@ -33,12 +33,12 @@ async def get_mood_suggestion(request: SuggestionRequest, current_user: User = D
         print(f"Getting suggestion for mood: {request.mood}, category: {request.category}, subject: {request.subject}")
         
         # Get suggestions for the given mood and category
-        suggestions = db.get_suggestions_for_mood_category(request.mood, request.category)
+        suggestions = await db.get_suggestions_for_mood_category(request.mood, request.category)
         
         if not suggestions:
             print(f"No suggestions found for {request.mood}/{request.category}, falling back to neutral")
             # Fall back to neutral mood if no suggestions found
-            suggestions = db.get_suggestions_for_mood_category("neutral", request.category)
+            suggestions = await db.get_suggestions_for_mood_category("neutral", request.category)
         
         if not suggestions:
             print(f"No suggestions found for neutral/{request.category} either, using generic")
@@ -66,7 +66,7 @@ async def get_mood_suggestion(request: SuggestionRequest, current_user: User = D
         if not subject and request.category in ["study", "work", "personal"]:
             print(f"Looking for subjects in category {request.category} for user {current_user.id}")
             # Include user-specific subjects
-            subjects = db.get_subjects_for_category(request.category, current_user.id)
+            subjects = await db.get_subjects_for_category(request.category, current_user.id)
             if subjects:
                 subject = random.choice(subjects)
                 print(f"Selected subject: {subject}")
@@ -110,7 +110,7 @@ async def get_subjects_by_category(category: str, current_user: User = Depends(g
     """
     try:
         # Include user-specific subjects along with default subjects
-        subjects = db.get_subjects_for_category(category, current_user.id)
+        subjects = await db.get_subjects_for_category(category, current_user.id)
         return SuggestionListResponse(
             suggestions=[SuggestionWithSubject(suggestion=subject) for subject in subjects]
         )
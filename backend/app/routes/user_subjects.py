@@ -28,7 +28,7 @@ async def create_user_subject(subject: UserSubjectCreate, current_user: User = D
     subject_dict["user_id"] = current_user.id
     
     try:
-        created_subject = db.create_user_subject(subject_dict)
+        created_subject = await db.create_user_subject(subject_dict)
         return created_subject
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating subject: {str(e)}")
@@ -41,7 +41,7 @@ async def get_user_subjects_by_category(category: str, current_user: User = Depe
     try:
         # Validate category
         CategoryType(category)  # This will raise a ValueError if invalid
-        subjects = db.get_user_subjects_by_category(current_user.id, category)
+        subjects = await db.get_user_subjects_by_category(current_user.id, category)
         return UserSubjectsResponse(subjects=subjects, count=len(subjects))
     except ValueError:
         raise HTTPException(status_code=400, detail=f"Invalid category: {category}")
@@ -54,7 +54,7 @@ async def get_user_subject(subject_id: str, current_user: User = Depends(get_cur
     Get a specific user subject by ID
     """
     try:
-        subject = db.get_user_subject_by_id(subject_id)
+        subject = await db.get_user_subject_by_id(subject_id)
         if not subject:
             raise HTTPException(status_code=404, detail="Subject not found")
         
@@ -75,7 +75,7 @@ async def update_user_subject(subject_id: str, update_data: UserSubjectCreate, c
     """
     try:
         # Check if subject exists and belongs to the user
-        existing_subject = db.get_user_subject_by_id(subject_id)
+        existing_subject = await db.get_user_subject_by_id(subject_id)
         if not existing_subject:
             raise HTTPException(status_code=404, detail="Subject not found")
         
@@ -86,7 +86,7 @@ async def update_user_subject(subject_id: str, update_data: UserSubjectCreate, c
         update_dict = update_data.model_dump(exclude_unset=True)
         update_dict["user_id"] = current_user.id  # Ensure user_id remains the same
         
-        updated_subject = db.update_user_subject(subject_id, update_dict)
+        updated_subject = await db.update_user_subject(subject_id, update_dict)
         if not updated_subject:
             raise HTTPException(status_code=500, detail="Failed to update subject")
             
@@ -103,7 +103,7 @@ async def delete_user_subject(subject_id: str, current_user: User = Depends(get_
     """
     try:
         # Check if subject exists and belongs to the user
-        existing_subject = db.get_user_subject_by_id(subject_id)
+        existing_subject = await db.get_user_subject_by_id(subject_id)
         if not existing_subject:
             raise HTTPException(status_code=404, detail="Subject not found")
         
@@ -111,7 +111,7 @@ async def delete_user_subject(subject_id: str, current_user: User = Depends(get_
             raise HTTPException(status_code=403, detail="Not authorized to delete this subject")
         
         # Delete the subject
-        success = db.delete_user_subject(subject_id)
+        success = await db.delete_user_subject(subject_id)
         if not success:
             raise HTTPException(status_code=500, detail="Failed to delete subject")
             
@@ -0,0 +1,279 @@
+"""
+Per-user/day interval index for plan time-conflict detection.
+
+Every non-terminal plan with a scheduled_time is kept as a [start, end)
+interval in minutes of its scheduled_date, in a list sorted by start.
+Overlap and free-slot queries bisect into that list, and only look at
+plans whose start lies within the longest duration on that day. A query
+therefore costs O(log n + k), not a scan over all of the user's plans.
+Adding or removing an interval shifts the day's list, so a write costs
+O(n) in the plans of that one day.
+
+A user's intervals are loaded lazily on first query and are then kept in
+sync by Database.create_plan / update_plan / delete_plan. With MongoDB,
+several worker processes may write the same user's plans, so every query
+first reloads the (user, day) it looks at through the day loader (one
+indexed read of that day's plans). The whole user is also reloaded after
+PLAN_INDEX_TTL_SECONDS.
+"""
+import os
+import time as _time
+from bisect import bisect_left, bisect_right
+from datetime import date, time, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Plans in these statuses never block a time slot
+TERMINAL_STATUSES = ("completed", "cancelled")
+
+PLAN_INDEX_TTL_SECONDS = int(os.getenv("PLAN_INDEX_TTL_SECONDS", "300"))
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def to_minutes(value) -> Optional[int]:
+    """Convert an 'HH:MM' string or time object to minutes since midnight"""
+    try:
+        if isinstance(value, str) and value:
+            hh, mm = value.split(":")[:2]
+            return int(hh) * 60 + int(mm)
+        if isinstance(value, time):
+            return value.hour * 60 + value.minute
+    except (ValueError, TypeError):
+        return None
+    return None
+
+
+def to_day(value) -> str:
+    """Normalize a scheduled_date value to an ISO date string (defaults to today)"""
+    if isinstance(value, date):
+        return value.isoformat()[:10]
+    if isinstance(value, str) and value:
+        return value[:10]
+    return date.today().isoformat()
+
+
+class _DayIntervals:
+    """Sorted intervals of one user on one day"""
+
+    def __init__(self):
+        self.starts: List[int] = []
+        self.entries: List[Tuple[int, int, str]] = []
+        # Longest current interval; bounds the query window
+        self.max_len = 0
+        # interval length -> number of intervals with that length
+        self._lengths: Dict[int, int] = {}
+
+    def add(self, start: int, end: int, plan_id: str) -> None:
+        entry = (start, end, plan_id)
+        i = bisect_right(self.entries, entry)
+        self.entries.insert(i, entry)
+        self.starts.insert(i, start)
+        self._lengths[end - start] = self._lengths.get(end - start, 0) + 1
+        self.max_len = max(self.max_len, end - start)
+
+    def remove(self, start: int, end: int, plan_id: str) -> None:
+        i = bisect_left(self.entries, (start, end, plan_id))
+        if i < len(self.entries) and self.entries[i] == (start, end, plan_id):
+            del self.entries[i]
+            del self.starts[i]
+            length = end - start
+            self._lengths[length] -= 1
+            if not self._lengths[length]:
+                del self._lengths[length]
+                if length == self.max_len:
+                    self.max_len = max(self._lengths, default=0)
+
+    def first_overlap(self, start: int, end: int, ignore_plan_id: Optional[str] = None) -> Optional[Tuple[int, int, str]]:
+        # An overlapping interval starts in (start - max_len, end)
+        i = bisect_right(self.starts, start - self.max_len)
+        while i < len(self.entries) and self.starts[i] < end:
+            ep_start, ep_end, plan_id = self.entries[i]
+            if ep_end > start and plan_id != ignore_plan_id:
+                return self.entries[i]
+            i += 1
+        return None
+
+
+class PlanConflictIndex:
+    """
+    Interval index of plan time slots keyed by (user_id, scheduled_date)
+
+    Args:
+        loader: Async callable returning all plans of a user (used for lazy loading)
+        day_loader: Async callable(user_id, day) returning the user's plans on that
+            day, or None when this process is the only writer (in-memory mode)
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Awaitable[List[Dict[str, Any]]]],
+        day_loader: Optional[Callable[[str, str], Awaitable[Optional[List[Dict[str, Any]]]]]] = None
+    ):
+        self._loader = loader
+        self._day_loader = day_loader
+        self._days: Dict[Tuple[str, str], _DayIntervals] = {}
+        # plan_id -> (user_id, day, start, end)
+        self._slots: Dict[str, Tuple[str, str, int, int]] = {}
+        # plan_id -> summary returned to callers on conflict
+        self._info: Dict[str, Dict[str, Any]] = {}
+        # user_id -> ids of that user's indexed plans
+        self._user_plans: Dict[str, set] = {}
+        # user_id -> monotonic load time
+        self._loaded: Dict[str, float] = {}
+
+    async def _ensure_user(self, user_id: str) -> None:
+        loaded_at = self._loaded.get(user_id)
+        if loaded_at is not None and _time.monotonic() - loaded_at < PLAN_INDEX_TTL_SECONDS:
+            return
+        plans = await self._loader(user_id)
+        for plan_id in list(self._user_plans.get(user_id, ())):
+            self._discard(plan_id)
+        for plan in plans:
+            self._put(plan)
+        self._loaded[user_id] = _time.monotonic()
+
+    async def _sync_day(self, user_id: str, day: str) -> Optional[_DayIntervals]:
+        """Bring one (user, day) up to date and return its intervals"""
+        await self._ensure_user(user_id)
+        if self._day_loader is not None:
+            plans = await self._day_loader(user_id, day)
+            if plans is not None:
+                day_index = self._days.get((user_id, day))
+                for _, _, plan_id in list(day_index.entries if day_index else ()):
+                    self._discard(plan_id)
+                for plan in plans:
+                    self._put(plan)
+        return self._days.get((user_id, day))
+
+    def _discard(self, plan_id: str) -> None:
+        slot = self._slots.pop(plan_id, None)
+        self._info.pop(plan_id, None)
+        if slot is None:
+            return
+        user_id, day, start, end = slot
+        self._user_plans.get(user_id, set()).discard(plan_id)
+        day_index = self._days.get((user_id, day))
+        if day_index is not None:
+            day_index.remove(start, end, plan_id)
+            if not day_index.entries:
+                del self._days[(user_id, day)]
+
+    def _put(self, plan: Dict[str, Any]) -> None:
+        plan_id = str(plan.get("id") or plan.get("_id") or "")
+        if not plan_id:
+            return
+        self._discard(plan_id)
+        status = plan.get("status")
+        if hasattr(status, "value"):
+            status = status.value
+        start = to_minutes(plan.get("scheduled_time"))
+        duration = int(plan.get("duration_minutes") or 0)
+        user_id = plan.get("user_id")
+        if not user_id or status in TERMINAL_STATUSES or start is None or duration <= 0:
+            return
+        day = to_day(plan.get("scheduled_date"))
+        self._days.setdefault((user_id, day), _DayIntervals()).add(start, start + duration, plan_id)
+        self._slots[plan_id] = (user_id, day, start, start + duration)
+        self._user_plans.setdefault(user_id, set()).add(plan_id)
+        scheduled_time = plan.get("scheduled_time")
+        self._info[plan_id] = {
+            "id": plan_id,
+            "title": plan.get("title"),
+            "scheduled_time": scheduled_time.strftime("%H:%M") if hasattr(scheduled_time, "strftime") else scheduled_time,
+            "duration_minutes": duration,
+            "status": status,
+        }
+
+    # Maintenance hooks (called by Database)
+    def on_plan_saved(self, plan: Dict[str, Any]) -> None:
+        """Insert or move a plan after it was created or updated"""
+        if plan.get("user_id") in self._loaded:
+            self._put(plan)
+
+    def on_plan_deleted(self, plan_id: str) -> None:
+        """Drop a deleted plan"""
+        self._discard(str(plan_id))
+
+    # Queries
+    async def first_overlap(
+        self,
+        user_id: str,
+        scheduled_date,
+        start: int,
+        duration: int,
+        ignore_plan_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find the first non-terminal plan overlapping a time window
+
+        Args:
+            user_id (str): User ID
+            scheduled_date: Day of the window (date or ISO string)
+            start (int): Window start in minutes since midnight
+            duration (int): Window length in minutes
+            ignore_plan_id (str, optional): Plan to skip (the one being updated)
+
+        Returns:
+            dict: Summary of the conflicting plan or None
+        """
+        if start is None or duration <= 0:
+            return None
+        day_index = await self._sync_day(user_id, to_day(scheduled_date))
+        if day_index is None:
+            return None
+        hit = day_index.first_overlap(start, start + duration, ignore_plan_id)
+        return dict(self._info[hit[2]]) if hit else None
+
+    async def next_free_slot(
+        self,
+        user_id: str,
+        scheduled_date,
+        after: int,
+        duration: int,
+        gap: int = 0,
+        ignore_plan_id: Optional[str] = None
+    ) -> int:
+        """
+        Find the earliest start >= `after` where `duration` minutes are free
+
+        A slot running past midnight is also checked against the plans of
+        the following day(s).
+
+        Args:
+            user_id (str): User ID
+            scheduled_date: Day to search (date or ISO string)
+            after (int): Earliest acceptable start in minutes since midnight
+            duration (int): Required length in minutes
+            gap (int): Buffer minutes to leave after a blocking plan
+            ignore_plan_id (str, optional): Plan to skip (the one being moved)
+
+        Returns:
+            int: Start of the free slot in minutes since midnight of
+                `scheduled_date` (1440 or more means a later day)
+        """
+        slot = after
+        if duration <= 0:
+            return slot
+        first_day = date.fromisoformat(to_day(scheduled_date))
+        synced = set()
+        while True:
+            blocked_until = None
+            # Days the window [slot, slot + duration) touches, in minutes of first_day
+            for offset in range((slot + duration - 1) // MINUTES_PER_DAY + 1):
+                day = (first_day + timedelta(days=offset)).isoformat()
+                if day not in synced:
+                    await self._sync_day(user_id, day)
+                    synced.add(day)
+                day_index = self._days.get((user_id, day))
+                shift = offset * MINUTES_PER_DAY
+                hit = day_index.first_overlap(slot - shift, slot + duration - shift, ignore_plan_id) if day_index else None
+                if hit is not None:
+                    blocked_until = hit[1] + shift
+                    break
+            if blocked_until is None:
+                return slot
+            slot = blocked_until + gap
+
+    def stats(self) -> Dict[str, int]:
+        """Return index size counters"""
+        return {"users": len(self._loaded), "days": len(self._days), "plans": len(self._slots)}
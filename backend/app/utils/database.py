@@ -1,9 +1,18 @@
-from pymongo import MongoClient
+from pymongo import AsyncMongoClient, ReturnDocument
 from bson import ObjectId
 from dotenv import load_dotenv
+import asyncio
 import os
 from datetime import datetime, time, date
-from typing import List, Dict, Optional, Any, Union
+from typing import List, Dict, Optional, Any, Tuple, Union
+
+from app.utils.conflict_index import PlanConflictIndex
+from app.utils.memory_store import MemoryTable
+from app.utils.mongo_pool import MONGO_CONNECT_ATTEMPTS, MONGO_MIN_POOL_SIZE, MONGO_REQUIRED, PoolStats, client_options, compression_report
+from app.utils.subject_catalog import SubjectCatalog
+from app.utils.suggestion_catalog import SuggestionCatalog
+from app.utils.plan_rollups import ROLLUP_COUNTERS, accumulate, calendar_pipeline, plan_day, rollup_delta
+from app.utils.user_cache import user_cache
 
 # Load environment variables
 load_dotenv()
@@ -11,15 +20,93 @@ load_dotenv()
 # MongoDB connection string
 MONGODB_URI = os.getenv("MONGODB_URI")
 
+def _mood_created_at(mood: Dict[str, Any]) -> datetime:
+    value = mood.get("created_at") or mood.get("timestamp")
+    return value if isinstance(value, datetime) else datetime.min
+
+
+def _mood_sort_key(mood: Dict[str, Any]) -> Tuple[datetime, str]:
+    """(created_at, id) of a mood entry"""
+    return (_mood_created_at(mood), str(mood.get("id") or mood.get("_id") or ""))
+
+
+def mood_cursor(mood: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Keyset cursor key of a mood entry (for get_user_moods before/after)
+    
+    Args:
+        mood (dict): Mood entry
+        
+    Returns:
+        dict: {"t": ISO created_at, "id": mood ID}
+    """
+    created_at, mood_id = _mood_sort_key(mood)
+    return {"t": created_at.isoformat(), "id": mood_id}
+
+
+def _mood_cursor_key(key: Dict[str, Any]) -> Tuple[datetime, str]:
+    return (datetime.fromisoformat(key["t"]), str(key["id"]))
+
+
+def _mood_keyset_filter(key: Dict[str, Any], op: str) -> Dict[str, Any]:
+    """MongoDB filter for moods strictly before ($lt) or after ($gt) a (created_at, _id) key"""
+    created_at, mood_id = _mood_cursor_key(key)
+    return {"$or": [
+        {"created_at": {op: created_at}},
+        {"created_at": created_at, "_id": {op: ObjectId(mood_id)}},
+    ]}
+
+
+def _plan_sort_key(plan: Dict[str, Any]) -> Tuple[str, str, str]:
+    """(scheduled_date, scheduled_time, id) as comparable strings; a missing time sorts first"""
+    st = plan.get("scheduled_time")
+    if isinstance(st, time):
+        st = st.strftime("%H:%M")
+    return (str(plan.get("scheduled_date") or ""), st or "", str(plan.get("id") or plan.get("_id") or ""))
+
+
+def _plan_keyset_filter(after: Dict[str, Any], descending: bool) -> Dict[str, Any]:
+    """
+    MongoDB filter for plans strictly after a (scheduled_date, scheduled_time, _id) key
+    
+    A missing scheduled_time is null, which MongoDB sorts before any string.
+    """
+    d, t, plan_id = after.get("d"), after.get("t"), ObjectId(after.get("id"))
+    if not descending:
+        later_time = {"scheduled_time": {"$gt": t}} if t else {"scheduled_time": {"$ne": None}}
+        return {"$or": [
+            {"scheduled_date": {"$gt": d}},
+            {"scheduled_date": d, **later_time},
+            {"scheduled_date": d, "scheduled_time": t, "_id": {"$gt": plan_id}},
+        ]}
+    branches = [{"scheduled_date": {"$lt": d}}]
+    if t:
+        branches.append({"scheduled_date": d, "$or": [{"scheduled_time": {"$lt": t}}, {"scheduled_time": None}]})
+    branches.append({"scheduled_date": d, "scheduled_time": t, "_id": {"$lt": plan_id}})
+    return {"$or": branches}
+
 class Database:
+    """
+    Storage layer with an awaitable API.
+    
+    Uses the native async PyMongo driver (AsyncMongoClient) so Mongo round
+    trips never block the event loop. When MongoDB is unreachable at
+    connect() time, the same async methods are served from in-memory tables
+    (unless MONGO_REQUIRED is set, in which case startup fails instead).
+    Pool sizes, timeouts and compression come from app/utils/mongo_pool.py.
+    """
     _instance = None
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(Database, cls).__new__(cls)
+            cls._instance.pool_stats = PoolStats()
+            cls._instance.client_settings = {}
+            cls._instance.supports_transactions = False
             try:
-                # Connect to MongoDB
-                cls._instance.client = MongoClient(MONGODB_URI)
+                # The async client is lazy: no I/O happens until connect()
+                cls._instance.client_settings = client_options(MONGODB_URI, cls._instance.pool_stats)
+                cls._instance.client = AsyncMongoClient(MONGODB_URI, **cls._instance.client_settings)
                 cls._instance.db = cls._instance.client.mannmitra
                 
                 # Create collections
@@ -30,28 +117,132 @@ class Database:
                 cls._instance.suggestions = cls._instance.db.suggestions
                 cls._instance.subjects = cls._instance.db.subjects
                 cls._instance.user_subjects = cls._instance.db.user_subjects
-                
-                # Create indexes
-                if not list(cls._instance.db.users.list_indexes()):
-                    cls._instance.users.create_index("email", unique=True)
-                
-                print("Connected to MongoDB")
+                cls._instance.plan_rollups = cls._instance.db.plan_daily_rollups
             except Exception as e:
-                print(f"Error connecting to MongoDB: {str(e)}")
-                # Fall back to in-memory storage
-                cls._instance.client = None
-                cls._instance.db = None
-                cls._instance.quotes = {}
-                cls._instance.moods = {}
-                cls._instance.plans = {}
-                cls._instance.users = {}
-                cls._instance.suggestions = {}
-                cls._instance.subjects = {}
-                cls._instance.user_subjects = {}
-                print("Using in-memory storage")
+                print(f"Error creating MongoDB client: {str(e)}")
+                cls._instance.client_error = str(e)
+                cls._instance._use_memory()
+            
+            # Time-slot index used for plan conflict detection
+            instance = cls._instance
+            cls._instance.plan_index = PlanConflictIndex(
+                cls._instance.get_user_plans,
+                lambda user_id, day: instance.get_user_day_plans(user_id, day)
+            )
+            # Preloaded suggestion matrix with resolved fallbacks (get_all_suggestions
+            # is registered on the class further down, so resolve it lazily)
+            cls._instance.suggestion_catalog = SuggestionCatalog(lambda: instance.get_all_suggestions())
+            # Default subjects in memory plus a per-user overlay cache
+            cls._instance.subject_catalog = SubjectCatalog(
+                lambda: instance.get_all_subjects(),
+                lambda user_id, category: instance.get_user_subject_names(user_id, category)
+            )
         
         return cls._instance
     
+    def _use_memory(self) -> None:
+        """Fall back to in-memory storage"""
+        self.client = None
+        self.db = None
+        self.quotes = {}
+        self.moods = {}
+        # Indexed tables: O(1) lookups by ID, user and email
+        self.plans = MemoryTable(user_id=lambda p: p.get("user_id"))
+        self.users = MemoryTable(email=lambda u: u.get("email"))
+        self.suggestions = {}
+        self.subjects = {}
+        self.user_subjects = MemoryTable(
+            user_category=lambda s: (s.get("user_id"), s.get("category"))
+        )
+        # (user_id, 'YYYY-MM-DD') -> counters
+        self.plan_rollups = {}
+        print("Using in-memory storage")
+    
+    async def connect(self) -> bool:
+        """
+        Verify the MongoDB connection and warm the connection pool
+        
+        Tries MONGO_CONNECT_ATTEMPTS times, then falls back to in-memory
+        storage, or raises if MONGO_REQUIRED is set.
+        
+        Returns:
+            bool: True if connected to MongoDB, False otherwise
+        
+        Raises:
+            RuntimeError: MongoDB is unreachable and MONGO_REQUIRED is set,
+                or a query shape is a collection scan and MONGO_INDEX_CHECK=strict
+        """
+        if self.client is None:
+            error = getattr(self, "client_error", "client not configured")
+            if MONGO_REQUIRED:
+                raise RuntimeError(f"MongoDB is required but unavailable: {error}")
+            return False
+        
+        error = None
+        for attempt in range(1, MONGO_CONNECT_ATTEMPTS + 1):
+            try:
+                await self.client.admin.command("ping")
+                error = None
+                break
+            except Exception as e:
+                error = e
+                print(f"Error connecting to MongoDB (attempt {attempt}/{MONGO_CONNECT_ATTEMPTS}): {str(e)}")
+                if attempt < MONGO_CONNECT_ATTEMPTS:
+                    await asyncio.sleep(min(2 ** attempt, 10))
+        
+        if error is not None:
+            client = self.client
+            self._use_memory()
+            try:
+                await client.close()
+            except Exception:
+                pass
+            if MONGO_REQUIRED:
+                raise RuntimeError(f"MongoDB is required but unavailable: {error}")
+            print("WARNING: MongoDB unreachable, data will NOT be persisted (set MONGO_REQUIRED=true to fail instead)")
+            return False
+        
+        # Warm the pool: concurrent pings each check out their own connection
+        if MONGO_MIN_POOL_SIZE > 1:
+            try:
+                await asyncio.gather(*(self.client.admin.command("ping") for _ in range(MONGO_MIN_POOL_SIZE)))
+            except Exception as e:
+                print(f"MongoDB pool warm-up failed: {str(e)}")
+        
+        # Multi-document transactions need a replica set or a sharded cluster
+        try:
+            hello = await self.client.admin.command("hello")
+            self.supports_transactions = bool(hello.get("setName")) or hello.get("msg") == "isdbgrid"
+        except Exception as e:
+            print(f"Could not detect MongoDB topology: {str(e)}")
+        
+        # Create the registered indexes (app/utils/indexes.py)
+        # Imported here: the registry reads settings from modules that import db
+        from app.utils.indexes import provision_indexes
+        await provision_indexes(self.db)
+        
+        print(f"Connected to MongoDB ({self.pool_stats.connections_open} pooled connections)")
+        report = compression_report()
+        if report:
+            print(report)
+        return True
+    
+    async def close(self) -> None:
+        """Close the MongoDB client and its connection pool"""
+        if self.client is not None:
+            await self.client.close()
+            print("MongoDB connection pool closed")
+    
+    def pool_metrics(self) -> Dict[str, Any]:
+        """
+        Report connection pool settings and checkout counters
+        
+        Returns:
+            dict: Pool metrics
+        """
+        settings = {k: v for k, v in self.client_settings.items() if k != "event_listeners"}
+        return {"connected": self.is_connected(), "settings": settings, **self.pool_stats.stats()}
+    
     def is_connected(self) -> bool:
         """
         Check if connected to MongoDB
@@ -62,7 +253,7 @@ class Database:
         return self.client is not None
     
     # Quotes methods
-    def save_quotes(self, quotes_data: Dict[str, Any]) -> None:
+    async def save_quotes(self, quotes_data: Dict[str, Any]) -> None:
         """
         Save quotes to database
         
@@ -82,14 +273,14 @@ class Database:
             ]
             
             # Clear existing quotes and insert new ones
-            self.quotes.delete_many({})
+            await self.quotes.delete_many({})
             if quotes_list:
-                self.quotes.insert_many(quotes_list)
+                await self.quotes.insert_many(quotes_list)
         else:
             # Store in memory
             self.quotes = quotes_data
     
-    def get_quotes(self) -> Dict[str, Any]:
+    async def get_quotes(self) -> Dict[str, Any]:
         """
         Get quotes from database
         
@@ -99,7 +290,7 @@ class Database:
         if self.is_connected():
             # Convert from MongoDB format back to nested dict
             result = {}
-            quotes_list = list(self.quotes.find({}, {"_id": 0}))
+            quotes_list = await self.quotes.find({}, {"_id": 0}).to_list(None)
             
             for item in quotes_list:
                 mood = item["mood"]
@@ -117,7 +308,7 @@ class Database:
             return self.quotes
     
     # Mood history methods
-    def save_mood(self, user_id: str, mood_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def save_mood(self, user_id: str, mood_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Save mood entry to database
         
@@ -131,12 +322,14 @@ class Database:
         # Add timestamp if not present
         if "timestamp" not in mood_data:
             mood_data["timestamp"] = datetime.now()
+        # created_at is the history sort key
+        mood_data.setdefault("created_at", mood_data["timestamp"])
         
         mood_data["user_id"] = user_id
         
         if self.is_connected():
             # Insert into MongoDB
-            result = self.moods.insert_one(mood_data)
+            result = await self.moods.insert_one(mood_data)
             mood_data["_id"] = result.inserted_id
             mood_data["id"] = str(result.inserted_id)
         else:
@@ -152,18 +345,92 @@ class Database:
         
         return mood_data
     
-    def get_user_moods(self, user_id: str) -> List[Dict[str, Any]]:
+    async def save_moods_bulk(self, user_id: str, moods: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Save many mood entries in one write (used by batch imports)
+        
+        Args:
+            user_id (str): User ID
+            moods (list): Mood data dicts
+            
+        Returns:
+            list: Saved mood data with IDs, in input order
+        """
+        if not moods:
+            return []
+        now = datetime.now()
+        for mood_data in moods:
+            mood_data.setdefault("timestamp", now)
+            mood_data.setdefault("created_at", mood_data["timestamp"])
+            mood_data["user_id"] = user_id
+        
+        if self.is_connected():
+            result = await self.moods.insert_many(moods, ordered=True)
+            for mood_data, inserted_id in zip(moods, result.inserted_ids):
+                mood_data["_id"] = inserted_id
+                mood_data["id"] = str(inserted_id)
+        else:
+            for mood_data in moods:
+                if "id" not in mood_data:
+                    mood_data["id"] = str(ObjectId())
+            self.moods.setdefault(user_id, []).extend(moods)
+        
+        return moods
+    
+    async def get_user_moods(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        before: Optional[Dict[str, Any]] = None,
+        after: Optional[Dict[str, Any]] = None,
+        mood_type: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
         """
-        Get mood history for a user
+        Get mood history for a user, newest first
+        
+        Filters, keyset bounds and the limit are applied by MongoDB
+        (index user_id, created_at, _id), so a page costs O(limit).
         
         Args:
             user_id (str): User ID
+            limit (int, optional): Maximum number of entries (None for all)
+            before (dict, optional): Only entries older than this {"t", "id"} key
+            after (dict, optional): Only entries newer than this {"t", "id"} key
+            mood_type (str, optional): Only entries of this mood type
+            start (datetime, optional): Earliest created_at (inclusive)
+            end (datetime, optional): Latest created_at (exclusive)
             
         Returns:
             list: List of mood entries
         """
         if self.is_connected():
-            moods = list(self.moods.find({"user_id": user_id}).sort("created_at", -1))
+            query: Dict[str, Any] = {"user_id": user_id}
+            if mood_type:
+                query["mood_type"] = mood_type
+            if start or end:
+                query["created_at"] = {}
+                if start:
+                    query["created_at"]["$gte"] = start
+                if end:
+                    query["created_at"]["$lt"] = end
+            bounds = []
+            if before is not None:
+                bounds.append(_mood_keyset_filter(before, "$lt"))
+            if after is not None:
+                bounds.append(_mood_keyset_filter(after, "$gt"))
+            if bounds:
+                query = {"$and": [query, *bounds]}
+            
+            # Paging forward from `after` walks up from the key, then flips
+            direction = 1 if after is not None and before is None else -1
+            cursor = self.moods.find(query).sort([("created_at", direction), ("_id", direction)])
+            if limit is not None:
+                cursor = cursor.limit(limit)
+            moods = await cursor.to_list(None)
+            if direction == 1:
+                moods.reverse()
             
             # Convert ObjectId to string and ensure ID field exists
             for mood in moods:
@@ -174,10 +441,25 @@ class Database:
             
             return moods
         else:
-            # Return from memory
-            return self.moods.get(user_id, [])
+            # Return from memory (newest first, like MongoDB)
+            moods = [
+                m for m in self.moods.get(user_id, [])
+                if (not mood_type or m.get("mood_type") == mood_type)
+                and (start is None or _mood_created_at(m) >= start)
+                and (end is None or _mood_created_at(m) < end)
+            ]
+            if before is not None:
+                before_key = _mood_cursor_key(before)
+                moods = [m for m in moods if _mood_sort_key(m) < before_key]
+            if after is not None:
+                after_key = _mood_cursor_key(after)
+                moods = [m for m in moods if _mood_sort_key(m) > after_key]
+            if after is not None and before is None and limit is not None:
+                moods = sorted(moods, key=_mood_sort_key)[:limit]
+            moods.sort(key=_mood_sort_key, reverse=True)
+            return moods[:limit] if limit is not None else moods
     
-    def update_mood_task(self, user_id: str, mood_id: str, task_completed: bool) -> bool:
+    async def update_mood_task(self, user_id: str, mood_id: str, task_completed: bool) -> bool:
         """
         Update task completion status for a mood entry
         
@@ -190,7 +472,7 @@ class Database:
             bool: True if updated successfully, False otherwise
         """
         if self.is_connected():
-            result = self.moods.update_one(
+            result = await self.moods.update_one(
                 {"_id": mood_id, "user_id": user_id},
                 {"$set": {"task_completed": task_completed}}
             )
@@ -208,7 +490,7 @@ class Database:
                 return False
 
 # User-related methods
-    def create_user(self, user_data: Dict[str, Any]) -> Union[Dict[str, Any], None]:
+    async def create_user(self, user_data: Dict[str, Any]) -> Union[Dict[str, Any], None]:
         """
         Create a new user in the database
         
@@ -226,7 +508,7 @@ class Database:
         if self.is_connected():
             try:
                 # Insert into MongoDB
-                result = self.users.insert_one(user_data)
+                result = await self.users.insert_one(user_data)
                 user_data["id"] = str(result.inserted_id)
                 del user_data["_id"]
                 return user_data
@@ -236,18 +518,16 @@ class Database:
                 return None
         else:
             # Store in memory
-            email = user_data.get("email")
             # Check if user exists
-            for user in self.users.values():
-                if user.get("email") == email:
-                    return None
+            if self.users.first("email", user_data.get("email")) is not None:
+                return None
             
             user_id = str(ObjectId())
             user_data["id"] = user_id
-            self.users[user_id] = user_data
+            self.users.insert(user_id, user_data)
             return user_data
     
-    def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+    async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """
         Get a user by email
         
@@ -258,7 +538,7 @@ class Database:
             dict: User data or None if not found
         """
         if self.is_connected():
-            user = self.users.find_one({"email": email})
+            user = await self.users.find_one({"email": email})
             if user:
                 user["id"] = str(user["_id"])
                 del user["_id"]
@@ -266,12 +546,9 @@ class Database:
             return None
         else:
             # Search in memory
-            for user in self.users.values():
-                if user.get("email") == email:
-                    return user
-            return None
+            return self.users.first("email", email)
     
-    def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
+    async def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
         """
         Get a user by ID
         
@@ -283,7 +560,7 @@ class Database:
         """
         if self.is_connected():
             try:
-                user = self.users.find_one({"_id": ObjectId(user_id)})
+                user = await self.users.find_one({"_id": ObjectId(user_id)})
                 if user:
                     user["id"] = str(user["_id"])
                     del user["_id"]
@@ -295,7 +572,7 @@ class Database:
             # Get from memory
             return self.users.get(user_id)
     
-    def update_user(self, user_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    async def update_user(self, user_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Update a user in the database
         
@@ -312,26 +589,27 @@ class Database:
         if self.is_connected():
             try:
                 # Update in MongoDB
-                result = self.users.update_one(
+                result = await self.users.update_one(
                     {"_id": ObjectId(user_id)},
                     {"$set": update_data}
                 )
+                # After the write, so a concurrent lookup cannot re-cache the old document
+                user_cache.invalidate(user_id)
                 
                 if result.modified_count > 0:
                     # Get updated user
-                    return self.get_user_by_id(user_id)
+                    return await self.get_user_by_id(user_id)
                 return None
             except:
                 return None
         else:
             # Update in memory
-            if user_id in self.users:
-                self.users[user_id].update(update_data)
-                return self.users[user_id]
-            return None
+            updated = self.users.update(user_id, update_data)
+            user_cache.invalidate(user_id)
+            return updated
     
     # Plan-related methods
-    def create_plan(self, plan_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def create_plan(self, plan_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Create a new plan in the database
         
@@ -348,6 +626,8 @@ class Database:
         # Default scheduled_date to today if absent
         if not plan_data.get("scheduled_date"):
             plan_data["scheduled_date"] = date.today().isoformat()
+        elif isinstance(plan_data["scheduled_date"], date):
+            plan_data["scheduled_date"] = plan_data["scheduled_date"].isoformat()
         
         # Convert time object to string if present
         if "scheduled_time" in plan_data and isinstance(plan_data["scheduled_time"], time):
@@ -355,9 +635,12 @@ class Database:
             plan_data["scheduled_time"] = plan_data["scheduled_time"].strftime("%H:%M")
         
         if self.is_connected():
-            # Insert into MongoDB
-            result = self.plans.insert_one(plan_data)
-            plan_data["id"] = str(result.inserted_id)
+            # Insert into MongoDB together with the day's rollup
+            async def write(session):
+                result = await self.plans.insert_one(plan_data, session=session)
+                return result.inserted_id, rollup_delta(None, plan_data)
+            
+            plan_data["id"] = str(await self._write_plan(write))
             if "_id" in plan_data:
                 del plan_data["_id"]
         else:
@@ -365,15 +648,13 @@ class Database:
             plan_id = str(ObjectId())
             plan_data["id"] = plan_id
             
-            user_id = plan_data.get("user_id")
-            if user_id not in self.plans:
-                self.plans[user_id] = []
-            
-            self.plans[user_id].append(plan_data)
+            self.plans.insert(plan_id, plan_data)
+            await self._apply_plan_rollups(rollup_delta(None, plan_data))
         
+        self.plan_index.on_plan_saved(plan_data)
         return plan_data
     
-    def get_user_plans(self, user_id: str) -> List[Dict[str, Any]]:
+    async def get_user_plans(self, user_id: str) -> List[Dict[str, Any]]:
         """
         Get plans for a user
         
@@ -384,7 +665,7 @@ class Database:
             list: List of plan entries
         """
         if self.is_connected():
-            plans = list(self.plans.find({"user_id": user_id}))
+            plans = await self.plans.find({"user_id": user_id}).to_list(None)
             # Convert ObjectId to string
             for plan in plans:
                 plan["id"] = str(plan["_id"])
@@ -405,9 +686,134 @@ class Database:
             return plans
         else:
             # Return from memory
-            return self.plans.get(user_id, [])
+            return self.plans.lookup("user_id", user_id)
     
-    def get_plan_by_id(self, plan_id: str) -> Optional[Dict[str, Any]]:
+    async def get_user_day_plans(self, user_id: str, day: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the time-slot fields of a user's plans on one day (for the conflict index)
+        
+        Args:
+            user_id (str): User ID
+            day (str): ISO date
+            
+        Returns:
+            list: Plans of that day, or None in in-memory mode (the conflict
+                index is then kept current by this process's own writes)
+        """
+        if not self.is_connected():
+            return None
+        days = [day]
+        if day == date.today().isoformat():
+            # Legacy plans without a scheduled_date count as today
+            days += [None, ""]
+        projection = {"user_id": 1, "title": 1, "status": 1, "scheduled_date": 1, "scheduled_time": 1, "duration_minutes": 1}
+        plans = await self.plans.find(
+            {"user_id": user_id, "scheduled_date": {"$in": days}}, projection
+        ).to_list(None)
+        for plan in plans:
+            plan["id"] = str(plan.pop("_id"))
+            if not plan.get("scheduled_date"):
+                plan["scheduled_date"] = date.today().isoformat()
+        return plans
+    
+    async def find_user_plans(
+        self,
+        user_id: str,
+        category: Optional[str] = None,
+        status: Optional[str] = None,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+        after: Optional[Dict[str, Any]] = None,
+        limit: int = 100,
+        fields: Optional[List[str]] = None,
+        descending: bool = False
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Get one page of a user's plans ordered by (scheduled_date, scheduled_time, id)
+        
+        Filtering, ordering and the page limit are applied by MongoDB
+        (index user_id, scheduled_date, scheduled_time, _id).
+        
+        Args:
+            user_id (str): User ID
+            category (str, optional): Only plans of this category
+            status (str, optional): Only plans with this status
+            from_date (str, optional): Earliest scheduled_date (ISO, inclusive)
+            to_date (str, optional): Latest scheduled_date (ISO, inclusive)
+            after (dict, optional): Sort key of the last plan of the previous page
+            limit (int): Maximum number of plans returned
+            fields (list, optional): Fields to return (sort key fields are always included)
+            descending (bool): Newest first instead of oldest first
+            
+        Returns:
+            tuple: (plans, sort key for the next page or None on the last page)
+        """
+        if self.is_connected():
+            query: Dict[str, Any] = {"user_id": user_id}
+            if category:
+                query["category"] = category
+            if status:
+                query["status"] = status
+            if from_date or to_date:
+                query["scheduled_date"] = {}
+                if from_date:
+                    query["scheduled_date"]["$gte"] = from_date
+                if to_date:
+                    query["scheduled_date"]["$lte"] = to_date
+            if after is not None:
+                query = {"$and": [query, _plan_keyset_filter(after, descending)]}
+            
+            projection = None
+            if fields:
+                projection = {field: 1 for field in fields}
+                projection.update(scheduled_date=1, scheduled_time=1)
+            direction = -1 if descending else 1
+            cursor = self.plans.find(query, projection).sort(
+                [("scheduled_date", direction), ("scheduled_time", direction), ("_id", direction)]
+            ).limit(limit + 1)
+            plans = await cursor.to_list(None)
+            for plan in plans:
+                plan["id"] = str(plan["_id"])
+                del plan["_id"]
+        else:
+            plans = [
+                p for p in self.plans.lookup("user_id", user_id)
+                if (not category or p.get("category") == category)
+                and (not status or p.get("status") == status)
+                and (not from_date or str(p.get("scheduled_date") or "") >= from_date)
+                and (not to_date or str(p.get("scheduled_date") or "") <= to_date)
+            ]
+            plans.sort(key=_plan_sort_key, reverse=descending)
+            if after is not None:
+                after_key = (after.get("d") or "", after.get("t") or "", after.get("id") or "")
+                if descending:
+                    plans = [p for p in plans if _plan_sort_key(p) < after_key]
+                else:
+                    plans = [p for p in plans if _plan_sort_key(p) > after_key]
+            # Copy so the time conversion below does not touch the stored plans
+            keep = set(fields) | {"id", "scheduled_date", "scheduled_time"} if fields else None
+            plans = [
+                {k: v for k, v in p.items() if keep is None or k in keep}
+                for p in plans[:limit + 1]
+            ]
+        
+        next_key = None
+        if len(plans) > limit:
+            plans = plans[:limit]
+            d, t, plan_id = _plan_sort_key(plans[-1])
+            next_key = {"d": d, "t": t or None, "id": plan_id}
+        
+        for plan in plans:
+            # Convert scheduled_time string back to time object if it exists
+            if isinstance(plan.get("scheduled_time"), str):
+                try:
+                    hour, minute = map(int, plan["scheduled_time"].split(":"))
+                    plan["scheduled_time"] = time(hour=hour, minute=minute)
+                except (ValueError, TypeError):
+                    pass
+        return plans, next_key
+    
+    async def get_plan_by_id(self, plan_id: str) -> Optional[Dict[str, Any]]:
         """
         Get a plan by ID
         
@@ -419,7 +825,7 @@ class Database:
         """
         if self.is_connected():
             try:
-                plan = self.plans.find_one({"_id": ObjectId(plan_id)})
+                plan = await self.plans.find_one({"_id": ObjectId(plan_id)})
                 if plan:
                     plan["id"] = str(plan["_id"])
                     del plan["_id"]
@@ -439,13 +845,9 @@ class Database:
                 return None
         else:
             # Search in memory
-            for user_plans in self.plans.values():
-                for plan in user_plans:
-                    if plan.get("id") == plan_id:
-                        return plan
-            return None
+            return self.plans.get(plan_id)
     
-    def update_plan(self, plan_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    async def update_plan(self, plan_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Update a plan in the database
         
@@ -488,28 +890,39 @@ class Database:
         
         if self.is_connected():
             try:
-                # Update in MongoDB
-                result = self.plans.update_one(
-                    {"_id": ObjectId(plan_id)},
-                    {"$set": update_data}
-                )
+                # Update in MongoDB; the previous version gives the rollup delta
+                async def write(session):
+                    before = await self.plans.find_one_and_update(
+                        {"_id": ObjectId(plan_id)},
+                        {"$set": update_data},
+                        return_document=ReturnDocument.BEFORE,
+                        session=session
+                    )
+                    if before is None:
+                        return None, {}
+                    return before, rollup_delta(before, {**before, **update_data})
                 
-                if result.modified_count > 0:
+                if await self._write_plan(write) is not None:
                     # Get updated plan
-                    return self.get_plan_by_id(plan_id)
+                    updated_plan = await self.get_plan_by_id(plan_id)
+                    if updated_plan:
+                        self.plan_index.on_plan_saved(updated_plan)
+                    return updated_plan
                 return None
             except:
                 return None
         else:
             # Update in memory
-            for user_plans in self.plans.values():
-                for plan in user_plans:
-                    if plan.get("id") == plan_id:
-                        plan.update(update_data)
-                        return plan
-            return None
+            plan = self.plans.get(plan_id)
+            if plan is None:
+                return None
+            before = dict(plan)
+            self.plans.update(plan_id, update_data)
+            await self._apply_plan_rollups(rollup_delta(before, plan))
+            self.plan_index.on_plan_saved(plan)
+            return plan
     
-    def delete_plan(self, plan_id: str) -> bool:
+    async def delete_plan(self, plan_id: str) -> bool:
         """
         Delete a plan from the database
         
@@ -521,27 +934,180 @@ class Database:
         """
         if self.is_connected():
             try:
-                result = self.plans.delete_one({"_id": ObjectId(plan_id)})
-                return result.deleted_count > 0
+                async def write(session):
+                    deleted = await self.plans.find_one_and_delete({"_id": ObjectId(plan_id)}, session=session)
+                    return deleted, rollup_delta(deleted, None)
+                
+                deleted = await self._write_plan(write)
+                self.plan_index.on_plan_deleted(plan_id)
+                return deleted is not None
             except:
                 return False
         else:
             # Delete from memory
-            for user_id, user_plans in self.plans.items():
-                for i, plan in enumerate(user_plans):
-                    if plan.get("id") == plan_id:
-                        user_plans.pop(i)
-                        return True
-            return False
+            plan = self.plans.delete(plan_id)
+            if plan is None:
+                return False
+            await self._apply_plan_rollups(rollup_delta(plan, None))
+            self.plan_index.on_plan_deleted(plan_id)
+            return True
+    
+    # Plan rollup methods (app/utils/plan_rollups.py)
+    async def _write_plan(self, write) -> Any:
+        """
+        Run a plan write and apply its rollup delta
+        
+        Both happen in one transaction when the deployment supports it;
+        on a standalone server the delta is applied right after the write.
+        
+        Args:
+            write: async callable(session) -> (result, rollup deltas)
+            
+        Returns:
+            The write's result
+        """
+        if not self.supports_transactions:
+            result, deltas = await write(None)
+            await self._apply_plan_rollups(deltas)
+            return result
+        
+        async def transaction(session):
+            result, deltas = await write(session)
+            await self._apply_plan_rollups(deltas, session)
+            return result
+        
+        async with self.client.start_session() as session:
+            return await session.with_transaction(transaction)
+    
+    async def _apply_plan_rollups(self, deltas: Dict[tuple, Dict[str, int]], session=None) -> None:
+        """
+        Increment per-day plan counters
+        
+        Args:
+            deltas (dict): (user_id, day) -> counter increments (from rollup_delta)
+            session: Client session of the enclosing transaction, if any
+        """
+        for (user_id, day), delta in deltas.items():
+            if self.is_connected():
+                await self.plan_rollups.update_one(
+                    {"user_id": user_id, "date": day},
+                    {"$inc": delta, "$set": {"updated_at": datetime.now()}},
+                    upsert=True,
+                    session=session
+                )
+            else:
+                counters = self.plan_rollups.setdefault((user_id, day), dict.fromkeys(ROLLUP_COUNTERS, 0))
+                for key, value in delta.items():
+                    counters[key] += value
+    
+    async def get_plan_rollups(
+        self,
+        user_id: str,
+        start_day: Optional[str] = None,
+        end_day: Optional[str] = None
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Get a user's per-day plan counters
+        
+        Args:
+            user_id (str): User ID
+            start_day (str): First day to include, 'YYYY-MM-DD' (optional)
+            end_day (str): Last day to include, 'YYYY-MM-DD' (optional)
+            
+        Returns:
+            dict: 'YYYY-MM-DD' -> counters
+        """
+        def in_range(day: str) -> bool:
+            return (start_day is None or day >= start_day) and (end_day is None or day <= end_day)
+        
+        if self.is_connected():
+            query: Dict[str, Any] = {"user_id": user_id}
+            day_range = {}
+            if start_day is not None:
+                day_range["$gte"] = start_day
+            if end_day is not None:
+                day_range["$lte"] = end_day
+            if day_range:
+                query["date"] = day_range
+            projection = {"_id": 0, "date": 1, **{key: 1 for key in ROLLUP_COUNTERS}}
+            return {doc["date"]: doc async for doc in self.plan_rollups.find(query, projection)}
+        return {
+            day: dict(counters)
+            for (uid, day), counters in self.plan_rollups.items()
+            if uid == user_id and in_range(day)
+        }
+    
+    async def aggregate_plan_days(
+        self,
+        user_id: str,
+        start_day: Optional[str] = None,
+        end_day: Optional[str] = None
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Group a user's plans into per-day counters without rollups
+        
+        In MongoDB the grouping runs server side (calendar_pipeline), so
+        only one small document per day is returned.
+        
+        Args:
+            user_id (str): User ID
+            start_day (str): First day to include, 'YYYY-MM-DD' (optional)
+            end_day (str): Last day to include, 'YYYY-MM-DD' (optional)
+            
+        Returns:
+            dict: 'YYYY-MM-DD' -> counters
+        """
+        if self.is_connected():
+            cursor = await self.plans.aggregate(calendar_pipeline(user_id, start_day, end_day))
+            return {doc.pop("_id"): doc async for doc in cursor}
+        plans = [
+            plan for plan in self.plans.lookup("user_id", user_id)
+            if plan_day(plan)
+            and (start_day is None or plan_day(plan) >= start_day)
+            and (end_day is None or plan_day(plan) <= end_day)
+        ]
+        return {day: counters for (_, day), counters in accumulate(plans).items()}
+    
+    async def rebuild_plan_rollups(self, user_id: Optional[str] = None) -> int:
+        """
+        Recompute per-day plan counters from the plans themselves
+        
+        Args:
+            user_id (str): Only rebuild this user's rollups (optional, default all users)
+            
+        Returns:
+            int: Number of (user, day) rollups written
+        """
+        if self.is_connected():
+            query = {"user_id": user_id} if user_id else {}
+            projection = {"user_id": 1, "scheduled_date": 1, "status": 1, "duration_minutes": 1}
+            rollups = accumulate([plan async for plan in self.plans.find(query, projection)])
+            now = datetime.now()
+            await self.plan_rollups.delete_many(query)
+            if rollups:
+                await self.plan_rollups.insert_many([
+                    {"user_id": uid, "date": day, **counters, "updated_at": now}
+                    for (uid, day), counters in rollups.items()
+                ])
+        else:
+            plans = self.plans.lookup("user_id", user_id) if user_id else self.plans.values()
+            rollups = accumulate(plans)
+            for key in [key for key in self.plan_rollups if user_id is None or key[0] == user_id]:
+                del self.plan_rollups[key]
+            self.plan_rollups.update(rollups)
+        return len(rollups)
 
 # Initialize database
 db = Database()
 
 # Suggestion-related methods
-def get_suggestions_for_mood_category(self, mood: str, category: str) -> List[str]:
+async def get_suggestions_for_mood_category(self, mood: str, category: str) -> List[str]:
     """
     Get suggestions for a specific mood and category
     
+    Served from the preloaded suggestion catalog: exact mood, then similar
+    moods, then neutral, then generic suggestions.
+    
     Args:
         mood (str): The mood to get suggestions for
         category (str): The category to get suggestions for
@@ -549,67 +1115,9 @@ def get_suggestions_for_mood_category(self, mood: str, category: str) -> List[st
     Returns:
         list: List of suggestions
     """
-    try:
-        # Try to find an exact match first
-        if self.is_connected():
-            suggestion = self.suggestions.find_one({"mood": mood, "category": category})
-            if suggestion and suggestion.get("suggestions"):
-                return suggestion.get("suggestions", [])
-            
-            # If no exact match, try similar moods
-            similar_moods = {
-                "happy": ["content", "neutral"],
-                "content": ["happy", "neutral"],
-                "neutral": ["content", "happy"],
-                "sad": ["very_sad", "tired"],
-                "very_sad": ["sad", "tired"],
-                "tired": ["lazy", "neutral"],
-                "lazy": ["tired", "neutral"],
-                "stressed": ["tired", "angry"],
-                "angry": ["stressed", "neutral"]
-            }
-            
-            # Try similar moods if available
-            similar = similar_moods.get(mood, ["neutral"])
-            for similar_mood in similar:
-                suggestion = self.suggestions.find_one({"mood": similar_mood, "category": category})
-                if suggestion and suggestion.get("suggestions"):
-                    return suggestion.get("suggestions", [])
-            
-            # If still not found, return default neutral suggestions for the category
-            suggestion = self.suggestions.find_one({"mood": "neutral", "category": category})
-            if suggestion:
-                return suggestion.get("suggestions", [])
-            
-            # As a last resort, return generic suggestions
-            return ["Let's take a small step forward today.",
-                    "Break tasks into smaller, manageable parts.",
-                    "Try focusing for just 10 minutes to start.",
-                    "Remember your why - what motivates you?"]
-        else:
-            # Return from memory
-            suggestions = self.suggestions.get(mood, {}).get(category, [])
-            if suggestions:
-                return suggestions
-                
-            # Try similar moods or neutral as fallback
-            return self.suggestions.get("neutral", {}).get(category, [
-                "Let's take a small step forward today.",
-                "Break tasks into smaller, manageable parts.",
-                "Try focusing for just 10 minutes to start.",
-                "Remember your why - what motivates you?"
-            ])
-    except Exception as e:
-        print(f"Error getting suggestions: {str(e)}")
-        # Return default fallback suggestions
-        return [
-            "Let's take a small step forward today.",
-            "Break tasks into smaller, manageable parts.",
-            "Try focusing for just 10 minutes to start.",
-            "Remember your why - what motivates you?"
-        ]
+    return await self.suggestion_catalog.get(mood, category)
 
-def get_all_suggestions(self) -> Dict[str, Dict[str, List[str]]]:
+async def get_all_suggestions(self) -> Dict[str, Dict[str, List[str]]]:
     """
     Get all suggestions
     
@@ -617,7 +1125,7 @@ def get_all_suggestions(self) -> Dict[str, Dict[str, List[str]]]:
         dict: Dictionary of suggestions by mood and category
     """
     if self.is_connected():
-        suggestions = list(self.suggestions.find({}, {"_id": 0}))
+        suggestions = await self.suggestions.find({}, {"_id": 0}).to_list(None)
         result = {}
         
         for suggestion in suggestions:
@@ -635,7 +1143,7 @@ def get_all_suggestions(self) -> Dict[str, Dict[str, List[str]]]:
         # Return from memory
         return self.suggestions
 
-def update_suggestions(self, mood: str, category: str, suggestions: List[str]) -> bool:
+async def update_suggestions(self, mood: str, category: str, suggestions: List[str]) -> bool:
     """
     Update suggestions for a specific mood and category
     
@@ -648,7 +1156,7 @@ def update_suggestions(self, mood: str, category: str, suggestions: List[str]) -
         bool: True if updated successfully, False otherwise
     """
     if self.is_connected():
-        result = self.suggestions.update_one(
+        result = await self.suggestions.update_one(
             {"mood": mood, "category": category},
             {"$set": {
                 "suggestions": suggestions,
@@ -656,6 +1164,7 @@ def update_suggestions(self, mood: str, category: str, suggestions: List[str]) -
             }},
             upsert=True
         )
+        await self.suggestion_catalog.refresh()
         return result.modified_count > 0 or result.upserted_id is not None
     else:
         # Update in memory
@@ -663,13 +1172,17 @@ def update_suggestions(self, mood: str, category: str, suggestions: List[str]) -
             self.suggestions[mood] = {}
         
         self.suggestions[mood][category] = suggestions
+        await self.suggestion_catalog.refresh()
         return True
 
 # Subject-related methods
-def get_subjects_for_category(self, category: str, user_id: Optional[str] = None) -> List[str]:
+async def get_subjects_for_category(self, category: str, user_id: Optional[str] = None) -> List[str]:
     """
     Get subjects for a specific category, including user-specific subjects if user_id is provided
     
+    Served from the subject catalog: defaults first, then the user's own
+    subjects, without duplicates.
+    
     Args:
         category (str): The category to get subjects for
         user_id (str, optional): User ID to include user-specific subjects
@@ -677,39 +1190,26 @@ def get_subjects_for_category(self, category: str, user_id: Optional[str] = None
     Returns:
         list: List of subjects
     """
-    # Get default subjects
-    default_subjects = []
-    if self.is_connected():
-        subject_entry = self.subjects.find_one({"category": category})
-        if subject_entry:
-            default_subjects = subject_entry.get("subjects", [])
-    else:
-        # Return from memory
-        default_subjects = self.subjects.get(category, [])
-    
-    # If no user_id, return only default subjects
-    if not user_id:
-        return default_subjects
+    return await self.subject_catalog.get(category, user_id)
+
+async def get_user_subject_names(self, user_id: str, category: str) -> List[str]:
+    """
+    Get the names of a user's custom subjects in a category, oldest first
     
-    # Get user-specific subjects
-    user_subjects = []
-    try:
-        if self.is_connected():
-            user_subject_entries = self.user_subjects.find({"user_id": user_id, "category": category})
-            user_subjects = [entry.get("name") for entry in user_subject_entries]
-        else:
-            # From memory
-            if user_id in self.user_subjects:
-                user_subjects = [s.get("name") for s in self.user_subjects.get(user_id, []) 
-                              if s.get("category") == category]
-    except Exception as e:
-        print(f"Error getting user subjects: {str(e)}")
-    
-    # Combine default and user-specific subjects
-    all_subjects = list(set(default_subjects + user_subjects))
-    return all_subjects
-
-def get_all_subjects(self) -> Dict[str, List[str]]:
+    Args:
+        user_id (str): User ID
+        category (str): Category name
+        
+    Returns:
+        list: Subject names
+    """
+    if self.is_connected():
+        cursor = self.user_subjects.find({"user_id": user_id, "category": category}, {"name": 1}).sort("_id", 1)
+        return [entry.get("name") async for entry in cursor]
+    # From memory
+    return [s.get("name") for s in self.user_subjects.lookup("user_category", (user_id, category))]
+
+async def get_all_subjects(self) -> Dict[str, List[str]]:
     """
     Get all subjects
     
@@ -717,7 +1217,7 @@ def get_all_subjects(self) -> Dict[str, List[str]]:
         dict: Dictionary of subjects by category
     """
     if self.is_connected():
-        subjects = list(self.subjects.find({}, {"_id": 0}))
+        subjects = await self.subjects.find({}, {"_id": 0}).to_list(None)
         result = {}
         
         for subject_entry in subjects:
@@ -730,7 +1230,7 @@ def get_all_subjects(self) -> Dict[str, List[str]]:
         # Return from memory
         return self.subjects
 
-def update_subjects(self, category: str, subjects: List[str]) -> bool:
+async def update_subjects(self, category: str, subjects: List[str]) -> bool:
     """
     Update subjects for a specific category
     
@@ -742,7 +1242,7 @@ def update_subjects(self, category: str, subjects: List[str]) -> bool:
         bool: True if updated successfully, False otherwise
     """
     if self.is_connected():
-        result = self.subjects.update_one(
+        result = await self.subjects.update_one(
             {"category": category},
             {"$set": {
                 "subjects": subjects,
@@ -750,10 +1250,12 @@ def update_subjects(self, category: str, subjects: List[str]) -> bool:
             }},
             upsert=True
         )
+        await self.subject_catalog.refresh_defaults()
         return result.modified_count > 0 or result.upserted_id is not None
     else:
         # Update in memory
         self.subjects[category] = subjects
+        await self.subject_catalog.refresh_defaults()
         return True
 
 # Add these methods to the Database class
@@ -761,11 +1263,12 @@ Database.get_suggestions_for_mood_category = get_suggestions_for_mood_category
 Database.get_all_suggestions = get_all_suggestions
 Database.update_suggestions = update_suggestions
 Database.get_subjects_for_category = get_subjects_for_category
+Database.get_user_subject_names = get_user_subject_names
 Database.get_all_subjects = get_all_subjects
 Database.update_subjects = update_subjects
 
 # User Subjects CRUD operations
-def create_user_subject(self, user_subject_data: Dict[str, Any]) -> Dict[str, Any]:
+async def create_user_subject(self, user_subject_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Create a new user subject in the database
     
@@ -782,7 +1285,7 @@ def create_user_subject(self, user_subject_data: Dict[str, Any]) -> Dict[str, An
     
     if self.is_connected():
         # Insert into MongoDB
-        result = self.user_subjects.insert_one(user_subject_data)
+        result = await self.user_subjects.insert_one(user_subject_data)
         user_subject_data["id"] = str(result.inserted_id)
         if "_id" in user_subject_data:
             del user_subject_data["_id"]
@@ -791,15 +1294,12 @@ def create_user_subject(self, user_subject_data: Dict[str, Any]) -> Dict[str, An
         subject_id = str(ObjectId())
         user_subject_data["id"] = subject_id
         
-        user_id = user_subject_data.get("user_id")
-        if user_id not in self.user_subjects:
-            self.user_subjects[user_id] = []
-        
-        self.user_subjects[user_id].append(user_subject_data)
+        self.user_subjects.insert(subject_id, user_subject_data)
     
+    self.subject_catalog.invalidate(user_subject_data.get("user_id"))
     return user_subject_data
 
-def get_user_subjects_by_category(self, user_id: str, category: str) -> List[Dict[str, Any]]:
+async def get_user_subjects_by_category(self, user_id: str, category: str) -> List[Dict[str, Any]]:
     """
     Get user-specific subjects for a category
     
@@ -811,19 +1311,16 @@ def get_user_subjects_by_category(self, user_id: str, category: str) -> List[Dic
         List[dict]: List of subject data
     """
     if self.is_connected():
-        subjects = list(self.user_subjects.find({"user_id": user_id, "category": category}))
+        subjects = await self.user_subjects.find({"user_id": user_id, "category": category}).to_list(None)
         for subject in subjects:
             subject["id"] = str(subject["_id"])
             del subject["_id"]
         return subjects
     else:
         # Get from memory
-        if user_id not in self.user_subjects:
-            return []
-        
-        return [s for s in self.user_subjects.get(user_id, []) if s.get("category") == category]
+        return self.user_subjects.lookup("user_category", (user_id, category))
 
-def get_user_subject_by_id(self, subject_id: str) -> Optional[Dict[str, Any]]:
+async def get_user_subject_by_id(self, subject_id: str) -> Optional[Dict[str, Any]]:
     """
     Get a user subject by ID
     
@@ -835,7 +1332,7 @@ def get_user_subject_by_id(self, subject_id: str) -> Optional[Dict[str, Any]]:
     """
     if self.is_connected():
         try:
-            subject = self.user_subjects.find_one({"_id": ObjectId(subject_id)})
+            subject = await self.user_subjects.find_one({"_id": ObjectId(subject_id)})
             if subject:
                 subject["id"] = str(subject["_id"])
                 del subject["_id"]
@@ -844,13 +1341,9 @@ def get_user_subject_by_id(self, subject_id: str) -> Optional[Dict[str, Any]]:
             return None
     else:
         # Search in memory
-        for user_id, subjects in self.user_subjects.items():
-            for subject in subjects:
-                if subject.get("id") == subject_id:
-                    return subject
-        return None
+        return self.user_subjects.get(subject_id)
 
-def update_user_subject(self, subject_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+async def update_user_subject(self, subject_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
     Update a user subject
     
@@ -865,23 +1358,22 @@ def update_user_subject(self, subject_id: str, update_data: Dict[str, Any]) -> O
     
     if self.is_connected():
         try:
-            self.user_subjects.update_one(
+            await self.user_subjects.update_one(
                 {"_id": ObjectId(subject_id)},
                 {"$set": update_data}
             )
-            return self.get_user_subject_by_id(subject_id)
+            subject = await self.get_user_subject_by_id(subject_id)
         except:
             return None
     else:
         # Update in memory
-        subject = self.get_user_subject_by_id(subject_id)
-        if subject:
-            for key, value in update_data.items():
-                subject[key] = value
-            return subject
-        return None
+        subject = self.user_subjects.update(subject_id, update_data)
+    
+    if subject:
+        self.subject_catalog.invalidate(subject.get("user_id"))
+    return subject
 
-def delete_user_subject(self, subject_id: str) -> bool:
+async def delete_user_subject(self, subject_id: str) -> bool:
     """
     Delete a user subject
     
@@ -893,18 +1385,17 @@ def delete_user_subject(self, subject_id: str) -> bool:
     """
     if self.is_connected():
         try:
-            result = self.user_subjects.delete_one({"_id": ObjectId(subject_id)})
-            return result.deleted_count > 0
+            subject = await self.user_subjects.find_one_and_delete({"_id": ObjectId(subject_id)})
         except:
             return False
     else:
         # Delete from memory
-        for user_id, subjects in self.user_subjects.items():
-            for i, subject in enumerate(subjects):
-                if subject.get("id") == subject_id:
-                    del self.user_subjects[user_id][i]
-                    return True
+        subject = self.user_subjects.delete(subject_id)
+    
+    if subject is None:
         return False
+    self.subject_catalog.invalidate(subject.get("user_id"))
+    return True
 
 # Register methods
 Database.create_user_subject = create_user_subject
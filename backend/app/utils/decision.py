@@ -2,13 +2,22 @@
 MannMitra Decision Helper Module - Sprint 4
 Implements fuzzy logic for decision making between two options based on context and user state.
 """
-from typing import Dict, Any, Tuple, Optional
+from typing import Dict, Any, Tuple, Optional, List
+import os
 import re
 import json
+import threading
+import time
 
-# Will be enabled when scikit-fuzzy is installed
+# NumPy backs batch evaluation and the precomputed surface
 try:
     import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Will be enabled when scikit-fuzzy is installed
+try:
     import skfuzzy as fuzz
     from skfuzzy import control as ctrl
     FUZZY_AVAILABLE = True
@@ -17,71 +26,349 @@ except ImportError:
     FUZZY_AVAILABLE = False
     print("Warning: scikit-fuzzy not available, using simplified decision logic")
 
-class DecisionHelper:
+def create_fuzzy_simulation(cache: bool = True):
     """
-    Decision helper using fuzzy logic to provide advice between two options.
+    Create the fuzzy logic system with input and output variables.
     
-    Uses context factors like:
-    - Time pressure (e.g., exam proximity)
-    - Energy/fatigue level
-    - Importance/priority
+    Args:
+        cache: Whether the simulation memoizes results per input combination
     
-    And makes recommendations with confidence levels.
+    Returns:
+        ControlSystemSimulation: The fuzzy logic control system (None on failure)
     """
+    try:
+        # Define input variables
+        time_pressure = ctrl.Antecedent(np.arange(0, 11, 1), 'time_pressure')
+        fatigue = ctrl.Antecedent(np.arange(0, 11, 1), 'fatigue')
+        task_importance = ctrl.Antecedent(np.arange(0, 11, 1), 'task_importance')
+        
+        # Define output variable
+        decision = ctrl.Consequent(np.arange(0, 11, 1), 'decision')
+        
+        # Define membership functions for inputs
+        time_pressure['low'] = fuzz.trimf(time_pressure.universe, [0, 0, 5])
+        time_pressure['medium'] = fuzz.trimf(time_pressure.universe, [0, 5, 10])
+        time_pressure['high'] = fuzz.trimf(time_pressure.universe, [5, 10, 10])
+        
+        fatigue['low'] = fuzz.trimf(fatigue.universe, [0, 0, 5])
+        fatigue['medium'] = fuzz.trimf(fatigue.universe, [0, 5, 10])
+        fatigue['high'] = fuzz.trimf(fatigue.universe, [5, 10, 10])
+        
+        task_importance['low'] = fuzz.trimf(task_importance.universe, [0, 0, 5])
+        task_importance['medium'] = fuzz.trimf(task_importance.universe, [0, 5, 10])
+        task_importance['high'] = fuzz.trimf(task_importance.universe, [5, 10, 10])
+        
+        # Define membership functions for output
+        decision['option1'] = fuzz.trimf(decision.universe, [0, 0, 5])
+        decision['balanced'] = fuzz.trimf(decision.universe, [3, 5, 7])
+        decision['option2'] = fuzz.trimf(decision.universe, [5, 10, 10])
+        
+        # Define rules
+        rule1 = ctrl.Rule(time_pressure['high'] & task_importance['high'], decision['option1'])
+        rule2 = ctrl.Rule(fatigue['high'] & time_pressure['low'], decision['option2'])
+        rule3 = ctrl.Rule(fatigue['medium'] & task_importance['medium'], decision['balanced'])
+        rule4 = ctrl.Rule(time_pressure['high'] & fatigue['high'], decision['option2'])
+        rule5 = ctrl.Rule(task_importance['high'] & fatigue['low'], decision['option1'])
+        
+        # Create control system
+        decision_ctrl = ctrl.ControlSystem([rule1, rule2, rule3, rule4, rule5])
+        
+        return ctrl.ControlSystemSimulation(decision_ctrl, cache=cache)
     
-    def __init__(self):
-        """Initialize the decision helper with fuzzy logic system if available."""
-        self.fuzzy_system = self._create_fuzzy_system() if FUZZY_AVAILABLE else None
+    except Exception as e:
+        print(f"Error creating fuzzy system: {str(e)}")
+        return None
+
+
+# Bump whenever the rule base above changes so cached surfaces are rebuilt
+DECISION_RULES_VERSION = "1"
+
+# Grid resolution of the precomputed surface (inputs are 0-10 scores)
+DECISION_SURFACE_STEP = float(os.getenv("DECISION_SURFACE_STEP", "0.5"))
+
+# Where the surface is cached between restarts (defaults to backend/data)
+DECISION_SURFACE_PATH = os.getenv("DECISION_SURFACE_PATH", "")
+
+# Number of random points compared against live skfuzzy output after a build (0 disables)
+DECISION_SURFACE_VERIFY = int(os.getenv("DECISION_SURFACE_VERIFY", "0"))
+
+
+class DecisionSurface:
+    """
+    Precomputed fuzzy decision surface.
+    
+    The rule base only depends on three clamped 0-10 inputs, so its
+    defuzzified output is evaluated once over a (time_pressure, fatigue,
+    task_importance) grid. Requests are then answered by trilinear
+    interpolation. Grid points where no rule fires are stored as NaN;
+    cells touching them, and any request made before the grid is ready,
+    are answered by the live simulation.
+    
+    Args:
+        step: Grid spacing (10 must be a multiple of it, otherwise it is rounded)
+        path: .npy cache file ("" for the default location)
+    """
+    
+    def __init__(self, step: float = DECISION_SURFACE_STEP, path: str = DECISION_SURFACE_PATH):
+        self.points = max(2, int(round(10 / step)) + 1)
+        self.step = 10 / (self.points - 1)
+        self.path = path or os.path.join(
+            os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data',
+            f'decision_surface_r{DECISION_RULES_VERSION}_n{self.points}.npy'
+        )
+        self.values = None
+        self.ready = False
+        self.source = None
+        self.build_seconds = 0.0
+        self.interpolated = 0
+        self.live_evaluations = 0
+        self.verification = None
+        self._simulation = None
+        self._simulation_failed = False
+        # ControlSystemSimulation keeps per-run state and is not thread-safe
+        self._lock = threading.Lock()
+        self._build_thread = None
+    
+    @property
+    def available(self) -> bool:
+        """Whether scikit-fuzzy is installed and the rule base compiled"""
+        if not FUZZY_AVAILABLE or self._simulation_failed:
+            return False
+        if self._simulation is None:
+            with self._lock:
+                if self._simulation is None:
+                    self._simulation = create_fuzzy_simulation()
+                    self._simulation_failed = self._simulation is None
+        return self._simulation is not None
+    
+    @staticmethod
+    def _compute(simulation, time_pressure: float, fatigue: float, task_importance: float) -> Optional[float]:
+        simulation.input['time_pressure'] = min(10, max(0, time_pressure))
+        simulation.input['fatigue'] = min(10, max(0, fatigue))
+        simulation.input['task_importance'] = min(10, max(0, task_importance))
+        try:
+            simulation.compute()
+        except Exception:
+            return None
+        return simulation.output.get('decision')
     
-    def _create_fuzzy_system(self):
+    def live_score(self, time_pressure: float, fatigue: float, task_importance: float) -> Optional[float]:
         """
-        Create the fuzzy logic system with input and output variables.
+        Evaluate the rule base directly with scikit-fuzzy
         
         Returns:
-            dict: The fuzzy logic control system
+            float: Defuzzified decision score (0-10) or None if no rule fired
         """
-        try:
-            # Define input variables
-            time_pressure = ctrl.Antecedent(np.arange(0, 11, 1), 'time_pressure')
-            fatigue = ctrl.Antecedent(np.arange(0, 11, 1), 'fatigue')
-            task_importance = ctrl.Antecedent(np.arange(0, 11, 1), 'task_importance')
-            
-            # Define output variable
-            decision = ctrl.Consequent(np.arange(0, 11, 1), 'decision')
-            
-            # Define membership functions for inputs
-            time_pressure['low'] = fuzz.trimf(time_pressure.universe, [0, 0, 5])
-            time_pressure['medium'] = fuzz.trimf(time_pressure.universe, [0, 5, 10])
-            time_pressure['high'] = fuzz.trimf(time_pressure.universe, [5, 10, 10])
-            
-            fatigue['low'] = fuzz.trimf(fatigue.universe, [0, 0, 5])
-            fatigue['medium'] = fuzz.trimf(fatigue.universe, [0, 5, 10])
-            fatigue['high'] = fuzz.trimf(fatigue.universe, [5, 10, 10])
-            
-            task_importance['low'] = fuzz.trimf(task_importance.universe, [0, 0, 5])
-            task_importance['medium'] = fuzz.trimf(task_importance.universe, [0, 5, 10])
-            task_importance['high'] = fuzz.trimf(task_importance.universe, [5, 10, 10])
-            
-            # Define membership functions for output
-            decision['option1'] = fuzz.trimf(decision.universe, [0, 0, 5])
-            decision['balanced'] = fuzz.trimf(decision.universe, [3, 5, 7])
-            decision['option2'] = fuzz.trimf(decision.universe, [5, 10, 10])
-            
-            # Define rules
-            rule1 = ctrl.Rule(time_pressure['high'] & task_importance['high'], decision['option1'])
-            rule2 = ctrl.Rule(fatigue['high'] & time_pressure['low'], decision['option2'])
-            rule3 = ctrl.Rule(fatigue['medium'] & task_importance['medium'], decision['balanced'])
-            rule4 = ctrl.Rule(time_pressure['high'] & fatigue['high'], decision['option2'])
-            rule5 = ctrl.Rule(task_importance['high'] & fatigue['low'], decision['option1'])
-            
-            # Create control system
-            decision_ctrl = ctrl.ControlSystem([rule1, rule2, rule3, rule4, rule5])
+        if not self.available:
+            return None
+        with self._lock:
+            self.live_evaluations += 1
+            return self._compute(self._simulation, time_pressure, fatigue, task_importance)
+    
+    def _interpolate(self, time_pressure: float, fatigue: float, task_importance: float) -> Optional[float]:
+        values = self.values
+        last = self.points - 2
+        index = []
+        weight = []
+        for x in (time_pressure, fatigue, task_importance):
+            pos = min(10.0, max(0.0, float(x))) / self.step
+            i = min(int(pos), last)
+            index.append(i)
+            weight.append(pos - i)
+        (i, j, k), (tx, ty, tz) = index, weight
+        cube = values[i:i + 2, j:j + 2, k:k + 2]
+        if np.isnan(cube).any():
+            return None
+        plane = cube[0] * (1 - tx) + cube[1] * tx
+        line = plane[0] * (1 - ty) + plane[1] * ty
+        return float(line[0] * (1 - tz) + line[1] * tz)
+    
+    def score(self, time_pressure: float, fatigue: float, task_importance: float) -> Optional[float]:
+        """
+        Decision score for the given inputs (interpolated once the surface is ready)
+        
+        Args:
+            time_pressure: Time pressure score (0-10)
+            fatigue: Fatigue score (0-10)
+            task_importance: Task importance score (0-10)
             
-            return ctrl.ControlSystemSimulation(decision_ctrl)
+        Returns:
+            float: Decision score (0-10) or None if no rule fired
+        """
+        if self.ready:
+            result = self._interpolate(time_pressure, fatigue, task_importance)
+            if result is not None:
+                self.interpolated += 1
+                return result
+        return self.live_score(time_pressure, fatigue, task_importance)
+    
+    def score_many(self, time_pressure, fatigue, task_importance) -> "np.ndarray":
+        """
+        Vectorized score() over arrays of inputs
         
+        Args:
+            time_pressure: Array of time pressure scores (0-10)
+            fatigue: Array of fatigue scores (0-10)
+            task_importance: Array of task importance scores (0-10)
+            
+        Returns:
+            np.ndarray: Decision scores, NaN where no rule fired
+        """
+        inputs = [np.clip(np.asarray(x, dtype=float), 0, 10) for x in (time_pressure, fatigue, task_importance)]
+        scores = np.full(inputs[0].shape, np.nan)
+        if not self.available:
+            return scores
+        if self.ready:
+            values = self.values
+            index = []
+            weight = []
+            for x in inputs:
+                pos = x / self.step
+                i = np.minimum(pos.astype(int), self.points - 2)
+                index.append(i)
+                weight.append(pos - i)
+            (i, j, k), (tx, ty, tz) = index, weight
+            # Same lerp order as _interpolate so batch and single results agree bit for bit;
+            # NaN corners propagate like the scalar path's None
+            corner = lambda di, dj, dk: values[i + di, j + dj, k + dk]
+            plane = [[corner(0, dj, dk) * (1 - tx) + corner(1, dj, dk) * tx for dk in (0, 1)] for dj in (0, 1)]
+            line = [plane[0][dk] * (1 - ty) + plane[1][dk] * ty for dk in (0, 1)]
+            scores = line[0] * (1 - tz) + line[1] * tz
+            self.interpolated += int(np.count_nonzero(~np.isnan(scores)))
+        for n in np.flatnonzero(np.isnan(scores)):
+            result = self.live_score(inputs[0][n], inputs[1][n], inputs[2][n])
+            if result is not None:
+                scores[n] = result
+        return scores
+    
+    def _load(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        try:
+            values = np.load(self.path)
         except Exception as e:
-            print(f"Error creating fuzzy system: {str(e)}")
-            return None
+            print(f"Ignoring unreadable decision surface {self.path}: {e}")
+            return False
+        if values.shape != (self.points,) * 3:
+            print(f"Ignoring decision surface {self.path} with shape {values.shape}")
+            return False
+        self.values = values
+        return True
+    
+    def _save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, self.values)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Could not cache decision surface to {self.path}: {e}")
+    
+    def build(self) -> None:
+        """Load the surface from its .npy cache or evaluate it over the grid"""
+        if not self.available:
+            return
+        started = time.time()
+        if self._load():
+            self.source = 'file'
+        else:
+            # A private simulation so live requests are not blocked during the build
+            simulation = create_fuzzy_simulation(cache=False)
+            axis = np.linspace(0, 10, self.points)
+            values = np.full((self.points,) * 3, np.nan)
+            for i, tp in enumerate(axis):
+                for j, fa in enumerate(axis):
+                    for k, ti in enumerate(axis):
+                        result = self._compute(simulation, tp, fa, ti)
+                        if result is not None:
+                            values[i, j, k] = result
+            self.values = values
+            self.source = 'computed'
+            self._save()
+        self.build_seconds = time.time() - started
+        self.ready = True
+        print(f"Decision surface ready ({self.points}^3 grid, {self.source}) in {self.build_seconds:.2f} seconds")
+        if DECISION_SURFACE_VERIFY > 0:
+            self.verify(DECISION_SURFACE_VERIFY)
+    
+    def start_background_build(self) -> None:
+        """Build the surface on a daemon thread (requests use the live system meanwhile)"""
+        if self._build_thread is not None or not self.available:
+            return
+        self._build_thread = threading.Thread(target=self.build, name="decision-surface", daemon=True)
+        self._build_thread.start()
+    
+    def verify(self, samples: int = 1000, seed: int = 0) -> Dict[str, Any]:
+        """
+        Compare interpolated scores against live scikit-fuzzy output at random points
+        
+        Args:
+            samples: Number of random input triples
+            seed: RNG seed
+            
+        Returns:
+            dict: Sample count, max / mean absolute error and NaN mismatches
+        """
+        if not self.ready:
+            return {}
+        rng = np.random.default_rng(seed)
+        errors = []
+        mismatches = 0
+        for tp, fa, ti in rng.uniform(0, 10, size=(samples, 3)):
+            expected = self.live_score(tp, fa, ti)
+            actual = self._interpolate(tp, fa, ti)
+            if actual is None:
+                # Served live in production, so exact by construction
+                continue
+            if expected is None:
+                mismatches += 1
+                continue
+            errors.append(abs(actual - expected))
+        self.verification = {
+            "samples": samples,
+            "compared": len(errors),
+            "max_abs_error": float(max(errors)) if errors else 0.0,
+            "mean_abs_error": float(np.mean(errors)) if errors else 0.0,
+            "fired_mismatches": mismatches,
+        }
+        print(f"Decision surface verification: {self.verification}")
+        return self.verification
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return surface status and counters"""
+        return {
+            "available": FUZZY_AVAILABLE and not self._simulation_failed,
+            "ready": self.ready,
+            "grid_points": self.points,
+            "step": self.step,
+            "source": self.source,
+            "build_seconds": round(self.build_seconds, 3),
+            "interpolated": self.interpolated,
+            "live_evaluations": self.live_evaluations,
+            "verification": self.verification,
+        }
+
+
+# Shared surface used by every DecisionHelper
+decision_surface = DecisionSurface()
+
+
+class DecisionHelper:
+    """
+    Decision helper using fuzzy logic to provide advice between two options.
+    
+    Uses context factors like:
+    - Time pressure (e.g., exam proximity)
+    - Energy/fatigue level
+    - Importance/priority
+    
+    And makes recommendations with confidence levels.
+    """
+    
+    def __init__(self):
+        """Initialize the decision helper with the shared fuzzy decision surface if available."""
+        self.fuzzy_system = decision_surface if decision_surface.available else None
     
     def make_decision(
         self,
@@ -131,6 +418,129 @@ class DecisionHelper:
                 time_pressure, fatigue, task_importance
             )
     
+    def make_decisions_batch(
+        self,
+        items: List[Dict[str, Any]],
+        include_explanations: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Make many decisions at once (e.g. a fatigue sweep or a week of study/rest blocks).
+        
+        Factors are extracted per distinct context, then fuzzy and heuristic
+        scores and the recommendation rules are evaluated with NumPy over the
+        whole batch. Each result matches what make_decision returns for the
+        same item.
+        
+        Args:
+            items: Dicts with option1, option2, context, mood and optional
+                   time_pressure / fatigue / task_importance (0-10)
+            include_explanations: Whether to generate explanation and advice texts
+            
+        Returns:
+            list: Decision dicts in the same order as `items`
+        """
+        if not items:
+            return []
+        if not NUMPY_AVAILABLE:
+            return [
+                self.make_decision(
+                    item["option1"], item["option2"], item.get("context", ""), item.get("mood") or "neutral",
+                    item.get("time_pressure"), item.get("fatigue"), item.get("task_importance")
+                )
+                for item in items
+            ]
+        
+        # Factor extraction is string work; memoize it per distinct context / mood
+        extracted: Dict[Tuple[str, str, str], float] = {}
+        def factor(kind, item, mood):
+            value = item.get(kind)
+            if value is not None:
+                return value
+            context = item.get("context", "")
+            key = (kind, context, mood if kind == "fatigue" else "")
+            if key not in extracted:
+                if kind == "time_pressure":
+                    extracted[key] = self._extract_time_pressure(context)
+                elif kind == "fatigue":
+                    extracted[key] = self._extract_fatigue(context, mood)
+                else:
+                    extracted[key] = self._extract_importance(context)
+            return extracted[key]
+        
+        moods = [item.get("mood") or "neutral" for item in items]
+        factors = [
+            {kind: factor(kind, item, mood) for kind in ("time_pressure", "fatigue", "task_importance")}
+            for item, mood in zip(items, moods)
+        ]
+        tp = np.array([f["time_pressure"] for f in factors], dtype=float)
+        fa = np.array([f["fatigue"] for f in factors], dtype=float)
+        ti = np.array([f["task_importance"] for f in factors], dtype=float)
+        
+        # Choices: 1 = option1, 2 = option2, 0 = balanced
+        if FUZZY_AVAILABLE and self.fuzzy_system:
+            fuzzy = self.fuzzy_system.score_many(tp, fa, ti)
+        else:
+            fuzzy = np.full(len(items), np.nan)
+        use_fuzzy = ~np.isnan(fuzzy)
+        s = np.where(use_fuzzy, fuzzy, 5.0)
+        strong = (s < 4) | (s > 6)
+        f_choice = np.select([s < 4, s > 6, tp > 7, fa > 7], [1, 2, 1, 2], default=0)
+        f_confidence = np.where(strong, np.minimum(95, np.abs(s - 5) * 20), np.abs(s - 5) * 20)
+        f_option1 = np.where(s < 5, 100 - s * 10, (10 - s) * 10)
+        f_option2 = s * 10
+        f_advice = np.where(s < 5, 1, 2)
+        
+        # Same weighted sum as _heuristic_decision
+        mood_adjust = np.array([
+            1 if m in ["sad", "very_sad", "stressed", "anxious"] else -1 if m in ["happy", "motivated"] else 0
+            for m in moods
+        ])
+        h = np.clip(-tp * 0.4 + fa * 0.4 - ti * 0.2 + mood_adjust, -5, 5)
+        h_choice = np.select([h < -2, h > 2], [1, 2], default=0)
+        h_confidence = np.where(h_choice == 0, 50, np.minimum(90, np.abs(h) * 15))
+        h_option1 = np.clip(50 - h * 10, 10, 90)
+        h_option2 = np.clip(50 + h * 10, 10, 90)
+        
+        choice = np.where(use_fuzzy, f_choice, h_choice)
+        balanced = choice == 0
+        confidence = np.where(use_fuzzy, np.where(balanced, 50, f_confidence), h_confidence)
+        option1_score = np.where(use_fuzzy, np.where(balanced, 50, f_option1), h_option1)
+        option2_score = np.where(use_fuzzy, np.where(balanced, 50, f_option2), h_option2)
+        advice_choice = np.where(use_fuzzy, np.where(balanced, 0, f_advice), h_choice)
+        explanation_score = np.where(use_fuzzy, s, 5 + h)
+        
+        advice_names = {0: "balanced", 1: "option1", 2: "option2"}
+        results = []
+        for n, item in enumerate(items):
+            option1, option2 = item["option1"], item["option2"]
+            context, mood = item.get("context", ""), moods[n]
+            c = int(choice[n])
+            if c == 1:
+                recommendation = option1
+            elif c == 2:
+                recommendation = option2
+            else:
+                recommendation = f"Balance between {option1} and {option2}"
+            result = {
+                "recommendation": recommendation,
+                "confidence": round(float(confidence[n])),
+                "option1_score": round(float(option1_score[n])),
+                "option2_score": round(float(option2_score[n])),
+                "factors": factors[n],
+            }
+            if include_explanations:
+                f = factors[n]
+                if use_fuzzy[n] and c == 0:
+                    result["explanation"] = self._generate_balanced_explanation(option1, option2, context, mood)
+                else:
+                    result["explanation"] = self._generate_explanation(
+                        recommendation, option1, option2, context, mood,
+                        f["time_pressure"], f["fatigue"], f["task_importance"], float(explanation_score[n])
+                    )
+                result["advice"] = self._generate_advice(option1, option2, context, mood, advice_names[int(advice_choice[n])])
+            results.append(result)
+        return results
+    
     def _fuzzy_decision(
         self, option1, option2, context, mood, 
         time_pressure, fatigue, task_importance
@@ -151,16 +561,10 @@ class DecisionHelper:
             dict: Decision with recommendation and explanation
         """
         try:
-            # Input values to fuzzy system
-            self.fuzzy_system.input['time_pressure'] = min(10, max(0, time_pressure))
-            self.fuzzy_system.input['fatigue'] = min(10, max(0, fatigue))
-            self.fuzzy_system.input['task_importance'] = min(10, max(0, task_importance))
-            
-            # Compute result
-            self.fuzzy_system.compute()
-            
             # Get decision score (0-10 where <5 favors option1, >5 favors option2)
-            score = self.fuzzy_system.output['decision']
+            score = self.fuzzy_system.score(time_pressure, fatigue, task_importance)
+            if score is None:
+                raise ValueError("no fuzzy rule fired for these inputs")
             
             # Determine confidence level based on distance from middle point (5)
             confidence = abs(score - 5) * 20  # 0-100%
@@ -553,6 +957,17 @@ class DecisionHelper:
         return advice
 
 
+# The helper is stateless apart from the shared surface, so one instance serves all requests
+_decision_helper: Optional[DecisionHelper] = None
+
+
+def _get_decision_helper() -> DecisionHelper:
+    global _decision_helper
+    if _decision_helper is None:
+        _decision_helper = DecisionHelper()
+    return _decision_helper
+
+
 # Function to make decisions between two options
 def evaluate_decision(
     option1: str, 
@@ -572,5 +987,21 @@ def evaluate_decision(
     Returns:
         dict: Decision recommendation, confidence, and explanation
     """
-    helper = DecisionHelper()
-    return helper.make_decision(option1, option2, context, mood)
+    return _get_decision_helper().make_decision(option1, option2, context, mood)
+
+
+def evaluate_decisions_batch(
+    items: List[Dict[str, Any]],
+    include_explanations: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Evaluate many decisions at once.
+    
+    Args:
+        items: Dicts with option1, option2, context, mood and optional factor scores
+        include_explanations: Whether to generate explanation and advice texts
+        
+    Returns:
+        list: Decision recommendations in the same order as `items`
+    """
+    return _get_decision_helper().make_decisions_batch(items, include_explanations)
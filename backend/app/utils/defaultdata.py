@@ -1,4 +1,5 @@
 from typing import Dict, List, Any
+import asyncio
 import os
 import json
 from datetime import datetime, date
@@ -239,7 +240,7 @@ DEFAULT_SUBJECTS = {
     ]
 }
 
-def insert_default_quotes():
+async def insert_default_quotes():
     """
     Load quotes from the quotes.json file and insert them into the database
     """
@@ -250,14 +251,14 @@ def insert_default_quotes():
             quotes_data = json.load(file)
         
         # Save quotes to database
-        db.save_quotes(quotes_data)
+        await db.save_quotes(quotes_data)
         print("Default quotes inserted successfully")
         return True
     except Exception as e:
         print(f"Error inserting default quotes: {str(e)}")
         return False
 
-def insert_default_suggestions():
+async def insert_default_suggestions():
     """
     Insert default suggestions into the database
     """
@@ -278,9 +279,9 @@ def insert_default_suggestions():
         # Save to database
         if db.is_connected():
             # Clear existing suggestions first
-            db.db.suggestions.delete_many({})
+            await db.db.suggestions.delete_many({})
             if suggestion_entries:
-                db.db.suggestions.insert_many(suggestion_entries)
+                await db.db.suggestions.insert_many(suggestion_entries)
             print("Default suggestions inserted successfully")
         else:
             # Store in memory
@@ -293,12 +294,14 @@ def insert_default_suggestions():
                 db.suggestions[mood][category] = entry["suggestions"]
             print("Default suggestions stored in memory")
         
+        # Serve the new defaults from the preloaded catalog
+        await db.suggestion_catalog.refresh()
         return True
     except Exception as e:
         print(f"Error inserting default suggestions: {str(e)}")
         return False
 
-def insert_default_subjects():
+async def insert_default_subjects():
     """
     Insert default subjects into the database
     """
@@ -317,34 +320,35 @@ def insert_default_subjects():
         # Save to database
         if db.is_connected():
             # Clear existing subjects first
-            db.db.subjects.delete_many({})
+            await db.db.subjects.delete_many({})
             if subject_entries:
-                db.db.subjects.insert_many(subject_entries)
+                await db.db.subjects.insert_many(subject_entries)
             print("Default subjects inserted successfully")
         else:
             # Store in memory
             db.subjects = DEFAULT_SUBJECTS
             print("Default subjects stored in memory")
         
+        await db.subject_catalog.refresh_defaults()
         return True
     except Exception as e:
         print(f"Error inserting default subjects: {str(e)}")
         return False
 
-def insert_default_users():
+async def insert_default_users():
     """
     Insert default users into the database
     """
     try:
-        from app.utils.security import get_password_hash
+        from app.utils.security import password_hasher
         
         # Format for database insertion with hashed passwords
         user_entries = []
         
-        for user_data in DEFAULT_USERS:
-            # Hash the password
-            hashed_password = get_password_hash(user_data["password"])
-            
+        # Hash all passwords in parallel on the password hashing pool (off the event loop)
+        hashed_passwords = await asyncio.to_thread(password_hasher.hash_many, [u["password"] for u in DEFAULT_USERS])
+        
+        for user_data, hashed_password in zip(DEFAULT_USERS, hashed_passwords):
             # Create user entry
             user_entries.append({
                 "full_name": user_data["full_name"],
@@ -359,26 +363,19 @@ def insert_default_users():
         if db.is_connected():
             # Check if users already exist
             for user in user_entries:
-                existing_user = db.users.find_one({"email": user["email"]})
+                existing_user = await db.users.find_one({"email": user["email"]})
                 if not existing_user:
-                    db.users.insert_one(user)
+                    await db.users.insert_one(user)
             
             print("Default users inserted successfully")
         else:
             # Store in memory
             for user in user_entries:
-                email = user["email"]
                 # Check if user already exists
-                user_exists = False
-                for existing_user in db.users.values():
-                    if isinstance(existing_user, dict) and existing_user.get("email") == email:
-                        user_exists = True
-                        break
-                
-                if not user_exists:
+                if db.users.first("email", user["email"]) is None:
                     user_id = str(datetime.now().timestamp())
                     user["id"] = user_id
-                    db.users[user_id] = user
+                    db.users.insert(user_id, user)
             
             print("Default users stored in memory")
         
@@ -387,23 +384,23 @@ def insert_default_users():
         print(f"Error inserting default users: {str(e)}")
         return False
 
-def insert_all_defaults():
+async def insert_all_defaults():
     """
     Insert all default data into the database
     """
     success = True
     
     print("Inserting default data...")
-    if not insert_default_quotes():
+    if not await insert_default_quotes():
         success = False
     
-    if not insert_default_suggestions():
+    if not await insert_default_suggestions():
         success = False
     
-    if not insert_default_subjects():
+    if not await insert_default_subjects():
         success = False
     
-    if not insert_default_users():
+    if not await insert_default_users():
         success = False
     
     # Seed simple sample history and plans for quick testing
@@ -411,11 +408,11 @@ def insert_all_defaults():
         # Find a default user id (first one inserted)
         user_id = None
         if db.is_connected():
-            any_user = db.users.find_one({})
+            any_user = await db.users.find_one({})
             if any_user:
                 user_id = str(any_user.get("_id"))
         else:
-            user_id = next(iter(db.users)) if isinstance(db.users, dict) and db.users else None
+            user_id = next(iter(db.users), None)
 
         if user_id:
             # Seed mood history entries across multiple days
@@ -456,7 +453,7 @@ def insert_all_defaults():
             # Add the entries
             for m in moods:
                 m["user_id"] = user_id
-                db.save_mood(user_id, m)
+                await db.save_mood(user_id, m)
 
             # Seed plans with varied times and statuses to test features
             # We're reusing the datetime import from above
@@ -574,15 +571,17 @@ def insert_all_defaults():
             ]
             for sp in sample_plans:
                 try:
-                    db.create_plan(sp)
+                    await db.create_plan(sp)
                 except Exception:
                     pass
 
             # Seed peer pulse sample data if empty
             try:
                 if db.is_connected():
-                    peerpulse_coll = getattr(db, 'peerpulse', None) or db.db.peerpulse
-                    if peerpulse_coll.count_documents({}) == 0:
+                    peerpulse_coll = getattr(db, 'peerpulse', None)
+                    if peerpulse_coll is None:
+                        peerpulse_coll = db.db.peerpulse
+                    if await peerpulse_coll.count_documents({}) == 0:
                         from datetime import timedelta
                         now_ts = datetime.now()
                         samples = [
@@ -601,7 +600,7 @@ def insert_all_defaults():
                                 'mood': s['mood'],
                                 'created_at': now_ts - timedelta(minutes=5*i)
                             })
-                        peerpulse_coll.insert_many(docs)
+                        await peerpulse_coll.insert_many(docs)
                         db.peerpulse = peerpulse_coll
                         print("Seeded default peer pulse samples")
                 else:
@@ -630,29 +629,35 @@ def insert_all_defaults():
                 if db.is_connected():
                     cursor = db.plans.find({"scheduled_date": {"$exists": False}})
                     count = 0
-                    for doc in cursor:
+                    async for doc in cursor:
                         created = doc.get("created_at")
                         if isinstance(created, datetime):
                             sched_date = created.date().isoformat()
                         else:
                             sched_date = date.today().isoformat()
-                        db.plans.update_one({"_id": doc["_id"]}, {"$set": {"scheduled_date": sched_date}})
+                        await db.plans.update_one({"_id": doc["_id"]}, {"$set": {"scheduled_date": sched_date}})
                         count += 1
                     if count:
                         print(f"Backfilled scheduled_date on {count} legacy plan documents.")
+                    # Plans written before rollups existed (or just backfilled) need their day counters
+                    if count or (
+                        await db.plan_rollups.estimated_document_count() == 0
+                        and await db.plans.estimated_document_count() > 0
+                    ):
+                        rebuilt = await db.rebuild_plan_rollups()
+                        print(f"Rebuilt {rebuilt} daily plan rollups.")
                 else:
-                    # In-memory structure: db.plans is dict -> user_id -> list[plan]
+                    # In-memory structure: db.plans is a MemoryTable of plans by id
                     try:
                         total = 0
-                        for plist in db.plans.values():
-                            for p in plist:
-                                if 'scheduled_date' not in p:
-                                    created = p.get('created_at')
-                                    if isinstance(created, datetime):
-                                        p['scheduled_date'] = created.date().isoformat()
-                                    else:
-                                        p['scheduled_date'] = date.today().isoformat()
-                                    total += 1
+                        for p in db.plans.values():
+                            if 'scheduled_date' not in p:
+                                created = p.get('created_at')
+                                if isinstance(created, datetime):
+                                    p['scheduled_date'] = created.date().isoformat()
+                                else:
+                                    p['scheduled_date'] = date.today().isoformat()
+                                total += 1
                         if total:
                             print(f"Backfilled scheduled_date for {total} in-memory plans.")
                     except Exception:
@@ -0,0 +1,258 @@
+"""
+Declarative MongoDB index registry.
+
+Every hot query shape of the app is listed once in INDEX_REGISTRY next to
+the index that serves it. ensure_indexes() creates the indexes at startup.
+It is idempotent: create_index is a no-op for an existing index, and a
+changed TTL is applied in place with collMod. Then:
+
+    index_report()   lists registered indexes that are missing and indexes
+                     that exist but are not registered or have never been
+                     used since the server started ($indexStats)
+    check_queries()  explains every registered query shape and reports the
+                     ones whose winning plan is a collection scan
+
+MONGO_INDEX_CHECK selects what startup does with the explain results:
+"off" (default), "warn" (print them) or "strict" (fail startup).
+"""
+import os
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from pymongo.errors import OperationFailure
+
+from app.utils.pulse_counters import PEERPULSE_RETENTION_MINUTES
+from app.utils.quote_rotation import QUOTE_ROTATION_IDLE_SECONDS
+
+MONGO_ENSURE_INDEXES = os.getenv("MONGO_ENSURE_INDEXES", "true").lower() in ("1", "true", "yes")
+MONGO_INDEX_CHECK = os.getenv("MONGO_INDEX_CHECK", "off").lower()
+PEERPULSE_TTL_SECONDS = int(os.getenv("PEERPULSE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# Server error codes for an index that exists with other options / another name
+_INDEX_CONFLICT_CODES = (85, 86)
+
+
+class IndexSpec(NamedTuple):
+    """One registered index and the query shape it serves"""
+    collection: str
+    keys: Tuple[Tuple[str, int], ...]
+    unique: bool = False
+    expire_after_seconds: Optional[int] = None
+    # Representative query (filter, sort) used by the collection-scan check
+    query: Optional[Dict[str, Any]] = None
+    sort: Optional[Tuple[Tuple[str, int], ...]] = None
+
+    @property
+    def name(self) -> str:
+        """Index name as generated by the server (e.g. user_id_1_created_at_-1)"""
+        return "_".join(f"{field}_{direction}" for field, direction in self.keys)
+
+
+_SAMPLE_TIME = datetime(2000, 1, 1)
+
+INDEX_REGISTRY: List[IndexSpec] = [
+    # Login / registration lookups
+    IndexSpec("users", (("email", 1),), unique=True, query={"email": "x"}),
+    # GET /plans keyset pages; its prefixes serve the conflict index user and day loaders
+    IndexSpec(
+        "plans",
+        (("user_id", 1), ("scheduled_date", 1), ("scheduled_time", 1), ("_id", 1)),
+        query={"user_id": "x"},
+        sort=(("scheduled_date", 1), ("scheduled_time", 1), ("_id", 1)),
+    ),
+    # Auto-rescheduler queue rebuild
+    IndexSpec(
+        "plans",
+        (("status", 1), ("scheduled_date", 1), ("scheduled_time", 1)),
+        query={"status": {"$in": ["pending", "snoozed"]}},
+        sort=(("scheduled_date", 1), ("scheduled_time", 1)),
+    ),
+    # Calendar history: one rollup per user and day, read by month
+    IndexSpec(
+        "plan_daily_rollups",
+        (("user_id", 1), ("date", 1)),
+        unique=True,
+        query={"user_id": "x", "date": {"$gte": "2000-01-01", "$lte": "2000-01-31"}},
+    ),
+    # Mood history keyset pages (newest first)
+    IndexSpec(
+        "moods",
+        (("user_id", 1), ("created_at", -1), ("_id", -1)),
+        query={"user_id": "x"},
+        sort=(("created_at", -1), ("_id", -1)),
+    ),
+    IndexSpec("suggestions", (("mood", 1), ("category", 1)), query={"mood": "x", "category": "y"}),
+    IndexSpec("subjects", (("category", 1),), query={"category": "x"}),
+    IndexSpec("user_subjects", (("user_id", 1), ("category", 1)), query={"user_id": "x", "category": "y"}),
+    # Shared quote rotation state (app/utils/quote_rotation.py) expires when idle
+    IndexSpec("quote_rotation", (("updated_at", 1),), expire_after_seconds=int(QUOTE_ROTATION_IDLE_SECONDS)),
+    # Rate limit windows (app/utils/rate_limiter.py) expire once they end
+    IndexSpec("rate_limits", (("expires_at", 1),), expire_after_seconds=0),
+    # Peer pulse window stats; old pulses expire
+    IndexSpec(
+        "peerpulse",
+        (("created_at", 1),),
+        expire_after_seconds=PEERPULSE_TTL_SECONDS,
+        query={"created_at": {"$gte": _SAMPLE_TIME}},
+    ),
+    # Peer pulse per-minute counter snapshot (app/utils/pulse_counters.py)
+    IndexSpec(
+        "peerpulse_minutes",
+        (("minute", 1),),
+        unique=True,
+        expire_after_seconds=(PEERPULSE_RETENTION_MINUTES + 60) * 60,
+        query={"minute": {"$gt": _SAMPLE_TIME}},
+    ),
+]
+
+
+async def _ensure_one(database, spec: IndexSpec) -> str:
+    collection = database[spec.collection]
+    options: Dict[str, Any] = {}
+    if spec.unique:
+        options["unique"] = True
+    if spec.expire_after_seconds is not None:
+        options["expireAfterSeconds"] = spec.expire_after_seconds
+    try:
+        await collection.create_index(list(spec.keys), **options)
+        return "ok"
+    except OperationFailure as e:
+        if e.code not in _INDEX_CONFLICT_CODES or spec.expire_after_seconds is None:
+            raise
+    # Same keys with another TTL (or none): update the TTL in place
+    await database.command({
+        "collMod": spec.collection,
+        "index": {"keyPattern": dict(spec.keys), "expireAfterSeconds": spec.expire_after_seconds},
+    })
+    return "ttl updated"
+
+
+async def ensure_indexes(database, registry: List[IndexSpec] = INDEX_REGISTRY) -> Dict[str, str]:
+    """
+    Create all registered indexes (idempotent)
+
+    Args:
+        database: AsyncDatabase handle
+        registry (list): Index specs to ensure
+
+    Returns:
+        dict: "collection.index_name" -> "ok", "ttl updated" or the error
+    """
+    results = {}
+    for spec in registry:
+        key = f"{spec.collection}.{spec.name}"
+        try:
+            results[key] = await _ensure_one(database, spec)
+        except Exception as e:
+            results[key] = f"error: {e}"
+            print(f"Could not create index {key}: {e}")
+    return results
+
+
+async def index_report(database, registry: List[IndexSpec] = INDEX_REGISTRY) -> Dict[str, Any]:
+    """
+    Compare registered indexes with the server's
+
+    Args:
+        database: AsyncDatabase handle
+        registry (list): Index specs expected to exist
+
+    Returns:
+        dict: missing (registered but absent), unregistered (present but not
+        registered) and unused (zero accesses since server start)
+    """
+    by_collection: Dict[str, List[IndexSpec]] = {}
+    for spec in registry:
+        by_collection.setdefault(spec.collection, []).append(spec)
+
+    missing, unregistered, unused = [], [], []
+    for name, specs in by_collection.items():
+        collection = database[name]
+        existing = {}
+        async for index in await collection.list_indexes():
+            existing[tuple(index["key"].items())] = index["name"]
+        expected = {spec.keys for spec in specs}
+        for spec in specs:
+            if spec.keys not in existing:
+                missing.append(f"{name}.{spec.name}")
+        for keys, index_name in existing.items():
+            if index_name != "_id_" and keys not in expected:
+                unregistered.append(f"{name}.{index_name}")
+        try:
+            async for stat in await collection.aggregate([{"$indexStats": {}}]):
+                if stat["name"] != "_id_" and not stat.get("accesses", {}).get("ops"):
+                    unused.append(f"{name}.{stat['name']}")
+        except OperationFailure as e:
+            print(f"$indexStats unavailable for {name}: {e}")
+    return {"missing": missing, "unregistered": unregistered, "unused": unused}
+
+
+def _has_collscan(plan: Any) -> bool:
+    if isinstance(plan, dict):
+        if plan.get("stage") == "COLLSCAN":
+            return True
+        return any(_has_collscan(value) for value in plan.values())
+    if isinstance(plan, list):
+        return any(_has_collscan(value) for value in plan)
+    return False
+
+
+async def check_queries(database, registry: List[IndexSpec] = INDEX_REGISTRY) -> List[str]:
+    """
+    Explain every registered query shape
+
+    Args:
+        database: AsyncDatabase handle
+        registry (list): Index specs with representative queries
+
+    Returns:
+        list: Descriptions of the query shapes planned as a collection scan
+    """
+    scans = []
+    for spec in registry:
+        if spec.query is None:
+            continue
+        find: Dict[str, Any] = {"find": spec.collection, "filter": spec.query}
+        if spec.sort:
+            find["sort"] = dict(spec.sort)
+        explained = await database.command({"explain": find, "verbosity": "queryPlanner"})
+        if _has_collscan(explained.get("queryPlanner", {}).get("winningPlan")):
+            shape = f"{spec.collection} filter={list(spec.query)}"
+            if spec.sort:
+                shape += f" sort={[field for field, _ in spec.sort]}"
+            scans.append(shape)
+    return scans
+
+
+async def provision_indexes(database) -> None:
+    """
+    Startup hook: ensure indexes, report drift and run the configured check
+
+    Args:
+        database: AsyncDatabase handle
+
+    Raises:
+        RuntimeError: A query shape is a collection scan and MONGO_INDEX_CHECK=strict
+    """
+    if not MONGO_ENSURE_INDEXES:
+        return
+    results = await ensure_indexes(database)
+    failed = [key for key, result in results.items() if result.startswith("error")]
+    print(f"Ensured {len(results) - len(failed)}/{len(results)} MongoDB indexes")
+
+    try:
+        report = await index_report(database)
+        if report["missing"]:
+            print(f"Missing MongoDB indexes: {', '.join(report['missing'])}")
+        if report["unregistered"]:
+            print(f"Unregistered MongoDB indexes: {', '.join(report['unregistered'])}")
+    except Exception as e:
+        print(f"Index report failed: {e}")
+
+    if MONGO_INDEX_CHECK not in ("warn", "strict"):
+        return
+    scans = await check_queries(database)
+    for shape in scans:
+        print(f"Collection scan: {shape}")
+    if scans and MONGO_INDEX_CHECK == "strict":
+        raise RuntimeError(f"{len(scans)} query shape(s) would scan a whole collection (MONGO_INDEX_CHECK=strict)")
@@ -0,0 +1,206 @@
+"""
+Micro-batching worker for the local emotion classifier.
+
+Concurrent /moods/analyze requests are queued and collected for up to
+INFERENCE_MAX_WAIT_MS (or until INFERENCE_MAX_BATCH_SIZE texts are waiting).
+The transformers pipeline then runs once over the whole batch on a
+dedicated worker thread. This keeps the event loop free and lets the
+model vectorize across requests; every caller awaits its own future.
+
+When the local model is not in use (transformers missing, remote API
+configured or local loading disabled) requests bypass the queue and use
+analyze_with_huggingface / analyze_sentiment directly.
+
+The pipeline's fast tokenizer must not be called from two threads at
+once, so every local model call (including analyze_chunk, used by the
+batch route) runs on the single inference thread.
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.utils.sentiment import (
+    analyze_sentiment,
+    analyze_texts,
+    analyze_with_huggingface,
+    classify_emotions_batch,
+    local_model_enabled,
+    USE_REMOTE_HF,
+)
+
+INFERENCE_MAX_BATCH_SIZE = max(1, int(os.getenv("INFERENCE_MAX_BATCH_SIZE", "16")))
+INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "10"))
+
+
+class EmotionBatcher:
+    """
+    Collects concurrent classification requests into batches
+
+    Args:
+        max_batch_size (int): Maximum texts per model call
+        max_wait_ms (float): How long the first request of a batch waits for company
+    """
+
+    def __init__(self, max_batch_size: int = INFERENCE_MAX_BATCH_SIZE, max_wait_ms: float = INFERENCE_MAX_WAIT_MS):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.requests = 0
+        self.batches = 0
+        self.batched_items = 0
+        self.largest_batch = 0
+        self.fallbacks = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            # A single inference thread: the model parallelizes internally
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="emotion-infer")
+        return self._executor
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # A queue belongs to one event loop
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = None
+        if self._worker is None or self._worker.done():
+            # Restart only the task; requests already queued are still served
+            self._worker = loop.create_task(self._run())
+        return self._queue
+
+    async def analyze(self, text: str) -> Dict[str, Any]:
+        """
+        Analyze one text, batched with other concurrent callers
+
+        Args:
+            text (str): Text to analyze
+
+        Returns:
+            dict: Same shape as analyze_with_huggingface
+        """
+        self.requests += 1
+        if not local_model_enabled():
+            self.fallbacks += 1
+            if USE_REMOTE_HF:
+                # Remote API calls block on network I/O
+                return await asyncio.to_thread(analyze_with_huggingface, text)
+            return analyze_sentiment(text)
+
+        queue = self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await queue.put((text, future))
+        return await future
+
+    async def analyze_many(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Analyze a list of texts concurrently through the batcher
+
+        Args:
+            texts (list): Texts to analyze
+
+        Returns:
+            list: Results in the same order as `texts`
+        """
+        return list(await asyncio.gather(*(self.analyze(text) for text in texts)))
+
+    async def analyze_chunk(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Analyze a chunk of texts with one model call on the inference thread
+
+        Unlike analyze_many, the chunk is not split into INFERENCE_MAX_BATCH_SIZE
+        batches; it queues behind whatever the thread is already running.
+
+        Args:
+            texts (list): Texts to analyze
+
+        Returns:
+            list: Results in the same order as `texts`
+        """
+        self.requests += len(texts)
+        if not local_model_enabled():
+            self.fallbacks += len(texts)
+            return await asyncio.to_thread(analyze_texts, texts)
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(self._get_executor(), classify_emotions_batch, texts)
+        self.batches += 1
+        self.batched_items += len(texts)
+        self.largest_batch = max(self.largest_batch, len(texts))
+        return results
+
+    async def _collect(self, queue: asyncio.Queue) -> List[Tuple[str, asyncio.Future]]:
+        batch = [await queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect(queue)
+            texts = [text for text, _ in batch]
+            try:
+                try:
+                    results = await loop.run_in_executor(self._get_executor(), classify_emotions_batch, texts)
+                except Exception as e:
+                    print(f"Emotion batch failed, falling back to TextBlob: {e}")
+                    results = [analyze_sentiment(text) for text in texts]
+            except Exception as e:
+                # The fallback failed too: fail this batch and keep serving
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            except asyncio.CancelledError:
+                # Shutting down: never leave callers waiting
+                for _, future in batch:
+                    future.cancel()
+                raise
+            self.batches += 1
+            self.batched_items += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return batching counters"""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch_size": (self.batched_items / self.batches) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "fallbacks": self.fallbacks,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker task and inference thread"""
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# Process-wide batcher used by the mood analysis routes
+emotion_batcher = EmotionBatcher()
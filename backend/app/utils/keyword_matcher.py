@@ -0,0 +1,137 @@
+"""
+Multi-pattern keyword matcher (Aho-Corasick automaton).
+
+All mood keywords (every language) and the mood indicator phrases are
+compiled into one automaton. A single left-to-right pass over the text
+therefore reports every occurrence, with its position. The cost stays
+O(len(text) + matches) however large the vocabularies grow, unlike one
+substring search or regex per keyword.
+"""
+from collections import deque
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+
+
+class KeywordMatch(NamedTuple):
+    """One occurrence of a pattern in the scanned text"""
+    start: int
+    end: int
+    pattern: str
+    payload: Any
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over literal string patterns
+
+    Patterns are added with an arbitrary payload and compiled once with
+    build(); afterwards find_all() can be called from any thread.
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Indices into self._patterns ending at each node (including via fail links)
+        self._out: List[List[int]] = [[]]
+        self._patterns: List[Tuple[str, Any]] = []
+        self._built = False
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def add(self, pattern: str, payload: Any = None) -> None:
+        """
+        Add a literal pattern
+
+        Args:
+            pattern (str): Text to look for (matched exactly, case included)
+            payload: Value reported with every match of this pattern
+        """
+        if not pattern:
+            return
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(len(self._patterns))
+        self._patterns.append((pattern, payload))
+        self._built = False
+
+    def build(self) -> "KeywordAutomaton":
+        """Compute failure links (breadth-first over the trie)"""
+        queue = deque()
+        for nxt in self._goto[0].values():
+            self._fail[nxt] = 0
+            queue.append(nxt)
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+        self._built = True
+        return self
+
+    def find_all(self, text: str) -> List[KeywordMatch]:
+        """
+        Find every occurrence of every pattern in one pass
+
+        Args:
+            text (str): Text to scan
+
+        Returns:
+            list: KeywordMatch entries ordered by end position
+        """
+        if not self._built:
+            self.build()
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self._patterns
+        matches = []
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for index in out[node]:
+                pattern, payload = patterns[index]
+                matches.append(KeywordMatch(i + 1 - len(pattern), i + 1, pattern, payload))
+        return matches
+
+
+class MoodTerm(NamedTuple):
+    """Payload of a mood keyword / indicator pattern"""
+    kind: str  # "keyword" or "indicator"
+    mood: str
+    language: str  # "" for language-independent indicators
+
+
+def build_mood_automaton(
+    mood_keywords: Dict[str, Dict[str, Iterable[str]]],
+    mood_indicators: Dict[str, Iterable[str]],
+) -> KeywordAutomaton:
+    """
+    Compile mood keywords and indicator phrases into one automaton
+
+    Args:
+        mood_keywords (dict): mood -> language -> keywords
+        mood_indicators (dict): mood -> indicator phrases (any language)
+
+    Returns:
+        KeywordAutomaton: Built automaton with MoodTerm payloads
+    """
+    automaton = KeywordAutomaton()
+    for mood, lang_keywords in mood_keywords.items():
+        for language, keywords in lang_keywords.items():
+            for keyword in keywords:
+                automaton.add(keyword.lower(), MoodTerm("keyword", mood, language))
+    for mood, phrases in mood_indicators.items():
+        for phrase in phrases:
+            automaton.add(phrase.lower(), MoodTerm("indicator", mood, ""))
+    return automaton.build()
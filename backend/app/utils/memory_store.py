@@ -0,0 +1,129 @@
+"""
+Indexed tables for the in-memory storage mode.
+
+A MemoryTable keeps documents in a dict keyed by their ID, plus secondary
+indexes declared as key functions (e.g. user_id -> that user's plan IDs).
+Every index maps a key to an insertion-ordered dict of IDs, so lookups,
+inserts, updates and deletes are O(1) in the table size and lookups keep
+insertion order. Documents must be changed through update() (not mutated
+in place) when an indexed field changes, so the indexes stay consistent.
+"""
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional
+
+KeyFunc = Callable[[Dict[str, Any]], Optional[Hashable]]
+
+
+class MemoryTable:
+    """Documents by primary key with secondary indexes"""
+
+    def __init__(self, **indexes: KeyFunc):
+        """
+        Args:
+            **indexes: Index name -> function returning a document's key
+                (None leaves the document out of that index)
+        """
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._key_funcs = indexes
+        self._indexes: Dict[str, Dict[Hashable, Dict[str, None]]] = {name: {} for name in indexes}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, doc_id: object) -> bool:
+        return doc_id in self._rows
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._rows)
+
+    def values(self) -> List[Dict[str, Any]]:
+        """All documents in insertion order"""
+        return list(self._rows.values())
+
+    def get(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Document by ID (None if absent)"""
+        return self._rows.get(doc_id)
+
+    def _index(self, doc_id: str, doc: Dict[str, Any]) -> None:
+        for name, key_func in self._key_funcs.items():
+            key = key_func(doc)
+            if key is not None:
+                self._indexes[name].setdefault(key, {})[doc_id] = None
+
+    def _unindex(self, doc_id: str, doc: Dict[str, Any]) -> None:
+        for name, key_func in self._key_funcs.items():
+            key = key_func(doc)
+            ids = self._indexes[name].get(key)
+            if ids is not None:
+                ids.pop(doc_id, None)
+                if not ids:
+                    del self._indexes[name][key]
+
+    def insert(self, doc_id: str, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Store a document (replacing any document with the same ID)
+
+        Args:
+            doc_id (str): Primary key
+            doc (dict): Document
+
+        Returns:
+            dict: The stored document
+        """
+        if doc_id in self._rows:
+            self.delete(doc_id)
+        self._rows[doc_id] = doc
+        self._index(doc_id, doc)
+        return doc
+
+    def update(self, doc_id: str, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Apply changes to a document in place and reindex it
+
+        Args:
+            doc_id (str): Primary key
+            changes (dict): Fields to set
+
+        Returns:
+            dict: Updated document or None if not found
+        """
+        doc = self._rows.get(doc_id)
+        if doc is None:
+            return None
+        self._unindex(doc_id, doc)
+        doc.update(changes)
+        self._index(doc_id, doc)
+        return doc
+
+    def delete(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Remove a document
+
+        Args:
+            doc_id (str): Primary key
+
+        Returns:
+            dict: Removed document or None if not found
+        """
+        doc = self._rows.pop(doc_id, None)
+        if doc is not None:
+            self._unindex(doc_id, doc)
+        return doc
+
+    def lookup(self, index: str, key: Hashable) -> List[Dict[str, Any]]:
+        """
+        Documents with the given key in a secondary index
+
+        Args:
+            index (str): Index name
+            key: Index key
+
+        Returns:
+            list: Matching documents in insertion order
+        """
+        return [self._rows[doc_id] for doc_id in self._indexes[index].get(key, ())]
+
+    def first(self, index: str, key: Hashable) -> Optional[Dict[str, Any]]:
+        """First document with the given key in a secondary index (None if none)"""
+        for doc_id in self._indexes[index].get(key, ()):
+            return self._rows[doc_id]
+        return None
@@ -0,0 +1,201 @@
+"""
+MongoDB client configuration and connection pool monitoring.
+
+Pool sizes, timeouts, wire compression and read preference come from the
+environment (see .env.example), so they can be tuned per deployment
+without touching code:
+
+    MONGO_MAX_POOL_SIZE               connections per server (default 100)
+    MONGO_MIN_POOL_SIZE               connections kept open and warmed on startup (default 0)
+    MONGO_WAIT_QUEUE_TIMEOUT_MS       max wait for a free pooled connection (default 5000)
+    MONGO_SERVER_SELECTION_TIMEOUT_MS max wait for a usable server (default 5000)
+    MONGO_CONNECT_TIMEOUT_MS          TCP connect timeout (default 5000)
+    MONGO_COMPRESSORS                 preferred wire compressors (default "zstd,snappy,zlib")
+    MONGO_READ_PREFERENCE             e.g. primary, primaryPreferred, secondaryPreferred
+    MONGO_CONNECT_ATTEMPTS            startup connection attempts (default 1)
+    MONGO_REQUIRED                    fail startup instead of falling back to memory
+
+Compressors whose Python package is missing (zstandard for zstd,
+python-snappy for snappy) are dropped, so a preference never breaks startup.
+PoolStats is registered as a ConnectionPoolListener and counts checkouts,
+checkout waits and failures for /_admin/metrics.
+"""
+import importlib.util
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from pymongo import monitoring
+
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "zstd,snappy,zlib")
+MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primary")
+MONGO_CONNECT_ATTEMPTS = max(1, int(os.getenv("MONGO_CONNECT_ATTEMPTS", "1")))
+MONGO_REQUIRED = os.getenv("MONGO_REQUIRED", "false").lower() in ("1", "true", "yes")
+
+# Python package each wire compressor depends on (zlib ships with Python)
+_COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+
+
+def _split_compressors(preferred: str) -> Tuple[List[str], List[str], List[str]]:
+    compressors, missing, unknown = [], [], []
+    for name in (c.strip().lower() for c in preferred.split(",") if c.strip()):
+        module = _COMPRESSOR_MODULES.get(name)
+        if module is None:
+            unknown.append(name)
+        elif importlib.util.find_spec(module) is None:
+            missing.append(name)
+        elif name not in compressors:
+            compressors.append(name)
+    return compressors, missing, unknown
+
+
+def available_compressors(preferred: str = MONGO_COMPRESSORS) -> List[str]:
+    """
+    Filter a comma-separated compressor preference down to installed ones
+
+    Args:
+        preferred (str): Compressors in order of preference (e.g. "zstd,snappy,zlib")
+
+    Returns:
+        list: Usable compressor names, in the same order
+    """
+    return _split_compressors(preferred)[0]
+
+
+def compression_report(preferred: str = MONGO_COMPRESSORS) -> Optional[str]:
+    """
+    Describe compressors that were asked for but cannot be used
+
+    Args:
+        preferred (str): Compressors in order of preference
+
+    Returns:
+        str: One log line, or None if every preferred compressor is usable
+    """
+    compressors, missing, unknown = _split_compressors(preferred)
+    notes = []
+    if missing:
+        notes.append(f"{', '.join(missing)} not installed")
+    if unknown:
+        notes.append(f"unknown: {', '.join(unknown)}")
+    if not notes:
+        return None
+    return f"Mongo wire compression: {', '.join(compressors) or 'none'} ({'; '.join(notes)})"
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Counts connection pool events (checkouts, waits, failures, connections)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pools = 0
+        self.connections_open = 0
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures: Dict[str, int] = {}
+        self.total_checkout_seconds = 0.0
+        self.max_checkout_seconds = 0.0
+        self.pool_clears = 0
+
+    def pool_created(self, event):
+        with self._lock:
+            self.pools += 1
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        with self._lock:
+            self.pools = max(0, self.pools - 1)
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+            self.connections_open += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+            self.connections_open = max(0, self.connections_open - 1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            reason = str(event.reason)
+            self.checkout_failures[reason] = self.checkout_failures.get(reason, 0) + 1
+
+    def connection_checked_out(self, event):
+        duration = getattr(event, "duration", None) or 0.0
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.total_checkout_seconds += duration
+            self.max_checkout_seconds = max(self.max_checkout_seconds, duration)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool counters"""
+        with self._lock:
+            return {
+                "pools": self.pools,
+                "connections_open": self.connections_open,
+                "connections_created": self.connections_created,
+                "connections_closed": self.connections_closed,
+                "checked_out": self.checked_out,
+                "checkouts": self.checkouts,
+                "checkout_failures": dict(self.checkout_failures),
+                "avg_checkout_ms": round(self.total_checkout_seconds / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_checkout_ms": round(self.max_checkout_seconds * 1000, 3),
+                "pool_clears": self.pool_clears,
+            }
+
+
+def client_options(uri: str, pool_stats: PoolStats) -> Dict[str, Any]:
+    """
+    Build AsyncMongoClient keyword arguments from the environment
+
+    Options already given in the connection string's query are left to the
+    URI (keyword arguments would otherwise override them).
+
+    Args:
+        uri (str): MongoDB connection string
+        pool_stats (PoolStats): Listener to register for pool events
+
+    Returns:
+        dict: Client options
+    """
+    options: Dict[str, Any] = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": min(MONGO_MIN_POOL_SIZE, MONGO_MAX_POOL_SIZE) if MONGO_MAX_POOL_SIZE else MONGO_MIN_POOL_SIZE,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "readPreference": MONGO_READ_PREFERENCE,
+        "event_listeners": [pool_stats],
+    }
+    compressors = available_compressors()
+    if compressors:
+        options["compressors"] = ",".join(compressors)
+    in_uri = {key.lower() for key, _ in parse_qsl(urlsplit(uri or "").query)}
+    return {key: value for key, value in options.items() if key.lower() not in in_uri}
+
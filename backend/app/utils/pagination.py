@@ -0,0 +1,50 @@
+"""
+Opaque cursors for keyset pagination.
+
+A cursor carries the sort key of the last item of a page, encoded as
+URL-safe base64 JSON. The next page then resumes strictly after that key
+(e.g. `scheduled_date > d OR (scheduled_date == d AND ...)`), not with
+an offset. Deep pages cost the same as the first one, and inserts
+between requests do not shift items across pages.
+"""
+import base64
+import binascii
+import json
+from typing import Any, Dict
+
+
+def encode_cursor(key: Dict[str, Any]) -> str:
+    """
+    Encode a sort key as an opaque cursor
+
+    Args:
+        key (dict): JSON-serializable sort key of the last item returned
+
+    Returns:
+        str: URL-safe cursor
+    """
+    raw = json.dumps(key, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        cursor (str): Cursor from a previous page
+
+    Returns:
+        dict: Sort key
+
+    Raises:
+        ValueError: The cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw.decode("utf-8"))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if not isinstance(key, dict):
+        raise ValueError("Invalid cursor")
+    return key
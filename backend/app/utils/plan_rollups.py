@@ -0,0 +1,193 @@
+"""
+Materialized per-day plan counters for the calendar history view.
+
+Each (user_id, date) has one rollup document with the counters below.
+Database.create_plan / update_plan / delete_plan apply the difference
+between a plan's old and new contribution with $inc, in the same
+transaction as the plan write when the deployment supports transactions.
+The calendar therefore reads at most ~31 small documents per month instead
+of the user's whole plan history. scripts/rebuild_plan_rollups.py
+recomputes them from the plans collection.
+
+Deployments that prefer not to maintain rollups can set
+PLAN_CALENDAR_BACKEND=aggregation: the calendar is then grouped by day
+inside MongoDB (calendar_pipeline) and only the per-day counters cross
+the wire.
+"""
+import os
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+# "rollups" (default) or "aggregation"
+PLAN_CALENDAR_BACKEND = os.getenv("PLAN_CALENDAR_BACKEND", "rollups").lower()
+
+ROLLUP_COUNTERS = ("total", "completed", "missed", "pending", "planned_minutes", "completed_minutes")
+
+
+def plan_day(plan: Dict[str, Any]) -> Optional[str]:
+    """Return a plan's scheduled_date as an ISO day string (None if missing)"""
+    value = plan.get("scheduled_date")
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()[:10]
+    if isinstance(value, str) and value:
+        return value[:10]
+    return None
+
+
+def plan_contribution(plan: Optional[Dict[str, Any]]) -> Optional[tuple]:
+    """
+    Counters a single plan adds to its day's rollup
+
+    Args:
+        plan (dict): Plan data (None for no plan)
+
+    Returns:
+        tuple: (user_id, day, counters) or None if the plan is not on the calendar
+    """
+    if not plan:
+        return None
+    day = plan_day(plan)
+    user_id = plan.get("user_id")
+    if not day or not user_id:
+        return None
+    status = plan.get("status")
+    if hasattr(status, "value"):
+        status = status.value
+    minutes = int(plan.get("duration_minutes") or 0)
+    counters = dict.fromkeys(ROLLUP_COUNTERS, 0)
+    counters["total"] = 1
+    counters["planned_minutes"] = minutes
+    if status == "completed":
+        counters["completed"] = 1
+        counters["completed_minutes"] = minutes
+    elif status == "missed":
+        counters["missed"] = 1
+    else:
+        counters["pending"] = 1
+    return user_id, day, counters
+
+
+def rollup_delta(
+    before: Optional[Dict[str, Any]],
+    after: Optional[Dict[str, Any]]
+) -> Dict[tuple, Dict[str, int]]:
+    """
+    Counter changes caused by a plan going from `before` to `after`
+
+    Args:
+        before (dict): Plan before the write (None on create)
+        after (dict): Plan after the write (None on delete)
+
+    Returns:
+        dict: (user_id, day) -> non-zero counter increments
+    """
+    deltas: Dict[tuple, Dict[str, int]] = {}
+    for plan, sign in ((before, -1), (after, 1)):
+        contribution = plan_contribution(plan)
+        if contribution is None:
+            continue
+        user_id, day, counters = contribution
+        delta = deltas.setdefault((user_id, day), dict.fromkeys(ROLLUP_COUNTERS, 0))
+        for key, value in counters.items():
+            delta[key] += sign * value
+    return {
+        key: {k: v for k, v in delta.items() if v}
+        for key, delta in deltas.items()
+        if any(delta.values())
+    }
+
+
+def accumulate(plans: Iterable[Dict[str, Any]]) -> Dict[tuple, Dict[str, int]]:
+    """
+    Compute rollups from scratch
+
+    Args:
+        plans (iterable): Plan data
+
+    Returns:
+        dict: (user_id, day) -> counters
+    """
+    rollups: Dict[tuple, Dict[str, int]] = {}
+    for plan in plans:
+        contribution = plan_contribution(plan)
+        if contribution is None:
+            continue
+        user_id, day, counters = contribution
+        total = rollups.setdefault((user_id, day), dict.fromkeys(ROLLUP_COUNTERS, 0))
+        for key, value in counters.items():
+            total[key] += value
+    return rollups
+
+
+def calendar_pipeline(
+    user_id: str,
+    start_day: Optional[str] = None,
+    end_day: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Aggregation pipeline grouping a user's plans into per-day counters
+
+    Args:
+        user_id (str): User ID
+        start_day (str): First day to include, 'YYYY-MM-DD' (optional)
+        end_day (str): Last day to include, 'YYYY-MM-DD' (optional)
+
+    Returns:
+        list: Pipeline stages; each output document is {"_id": day, counters...}
+    """
+    day_filter: Dict[str, Any] = {"$type": "string", "$ne": ""}
+    if start_day is not None:
+        day_filter["$gte"] = start_day
+    if end_day is not None:
+        day_filter["$lte"] = end_day
+    minutes = {"$ifNull": ["$duration_minutes", 0]}
+    is_completed = {"$eq": ["$status", "completed"]}
+    is_missed = {"$eq": ["$status", "missed"]}
+    return [
+        {"$match": {"user_id": user_id, "scheduled_date": day_filter}},
+        {"$group": {
+            "_id": "$scheduled_date",
+            "total": {"$sum": 1},
+            "completed": {"$sum": {"$cond": [is_completed, 1, 0]}},
+            "missed": {"$sum": {"$cond": [is_missed, 1, 0]}},
+            "pending": {"$sum": {"$cond": [{"$or": [is_completed, is_missed]}, 0, 1]}},
+            "planned_minutes": {"$sum": minutes},
+            "completed_minutes": {"$sum": {"$cond": [is_completed, minutes, 0]}},
+        }},
+    ]
+
+
+def finalize_calendar(days: Dict[str, Dict[str, int]]) -> Dict[str, Any]:
+    """
+    Add completion rates and the overall summary to per-day counters
+
+    Args:
+        days (dict): 'YYYY-MM-DD' -> counters (days without plans omitted)
+
+    Returns:
+        dict: {"days": {...}, "summary": {...}} as served by /plans/history/calendar
+    """
+    days = {
+        d: {key: int(v.get(key, 0)) for key in ROLLUP_COUNTERS}
+        for d, v in sorted(days.items())
+        if v.get("total", 0) > 0
+    }
+    # compute per-day completion rate
+    for d, v in days.items():
+        v['completion_rate'] = (v['completed']/v['total']*100) if v['total'] else 0
+        v['minutes_completion_rate'] = (v['completed_minutes']/v['planned_minutes']*100) if v['planned_minutes'] else 0
+    # overall summary
+    total = sum(v['total'] for v in days.values()) or 0
+    completed = sum(v['completed'] for v in days.values())
+    total_planned = sum(v['planned_minutes'] for v in days.values()) or 0
+    total_completed_minutes = sum(v['completed_minutes'] for v in days.values()) or 0
+    summary = {
+        'days_count': len(days),
+        'total_tasks': total,
+        'completed': completed,
+        'overall_completion_rate': (completed/total*100) if total else 0,
+        'total_planned_minutes': total_planned,
+        'completed_minutes': total_completed_minutes,
+        'overall_minutes_completion_rate': (total_completed_minutes/total_planned*100) if total_planned else 0
+    }
+    return {"days": days, "summary": summary}
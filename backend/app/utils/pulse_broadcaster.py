@@ -0,0 +1,154 @@
+"""
+In-process fan-out of live PeerPulse statistics to server-sent event streams.
+
+Every /peerpulse/stream connection subscribes with its window_minutes.
+One background task recomputes the stats once per tick
+(PEERPULSE_STREAM_TICK_SECONDS), or sooner when a pulse is submitted. It
+does this once per distinct window, not once per client, and serializes
+each payload a single time. Unchanged payloads are not re-sent. The
+/stream route rounds windows up to a small fixed set, so the work per tick
+does not grow with the number of clients.
+
+Each subscriber has a one-slot queue. A client that has not read the
+previous payload yet has it replaced by the newer one (latest wins), so a
+slow connection never buffers more than one message and never delays the
+others. Replaced payloads are counted as dropped.
+"""
+import asyncio
+import os
+from typing import Any, Callable, Dict, Optional, Set
+
+PEERPULSE_STREAM_TICK_SECONDS = float(os.getenv("PEERPULSE_STREAM_TICK_SECONDS", "5"))
+PEERPULSE_STREAM_MAX_SUBSCRIBERS = int(os.getenv("PEERPULSE_STREAM_MAX_SUBSCRIBERS", "10000"))
+
+
+class PulseBroadcaster:
+    """
+    Recomputes a payload per window and fans it out to subscribers
+
+    Args:
+        compute: callable(window_minutes) returning the serialized payload
+        tick_seconds (float): Longest time between two recomputations
+        max_subscribers (int): Maximum concurrent subscribers
+    """
+
+    def __init__(
+        self,
+        compute: Callable[[int], str],
+        tick_seconds: float = PEERPULSE_STREAM_TICK_SECONDS,
+        max_subscribers: int = PEERPULSE_STREAM_MAX_SUBSCRIBERS
+    ):
+        self._compute = compute
+        self.tick_seconds = tick_seconds
+        self.max_subscribers = max_subscribers
+        # window_minutes -> subscriber queues
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        # window_minutes -> last payload sent
+        self._latest: Dict[int, str] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.ticks = 0
+        self.computations = 0
+        self.messages = 0
+        self.dropped = 0
+        self.rejected = 0
+
+    def __len__(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def subscribe(self, window_minutes: int) -> Optional[asyncio.Queue]:
+        """
+        Register a subscriber; its queue starts with the current payload
+
+        Args:
+            window_minutes (int): Stats window the subscriber wants
+
+        Returns:
+            asyncio.Queue: Queue of serialized payloads, or None if the subscriber limit is reached
+        """
+        if len(self) >= self.max_subscribers:
+            self.rejected += 1
+            return None
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        if window_minutes not in self._latest:
+            self._latest[window_minutes] = self._compute(window_minutes)
+            self.computations += 1
+        queue.put_nowait(self._latest[window_minutes])
+        self._subscribers.setdefault(window_minutes, set()).add(queue)
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, window_minutes: int, queue: asyncio.Queue) -> None:
+        """
+        Remove a subscriber
+
+        Args:
+            window_minutes (int): Window it subscribed with
+            queue (asyncio.Queue): Queue returned by subscribe()
+        """
+        queues = self._subscribers.get(window_minutes)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[window_minutes]
+            self._latest.pop(window_minutes, None)
+
+    def notify(self) -> None:
+        """Recompute now (e.g. after a pulse was submitted)"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _publish(self, window_minutes: int, payload: str) -> None:
+        for queue in list(self._subscribers.get(window_minutes, ())):
+            if queue.full():
+                # Latest wins: replace the payload the client has not read yet
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(payload)
+            self.messages += 1
+
+    async def _run(self) -> None:
+        """Background loop; exits once the last subscriber is gone"""
+        while self._subscribers:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.tick_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            self.ticks += 1
+            for window_minutes in list(self._subscribers):
+                try:
+                    payload = self._compute(window_minutes)
+                except Exception as e:
+                    print(f"Peer pulse stream update failed: {e}")
+                    continue
+                self.computations += 1
+                if payload != self._latest.get(window_minutes):
+                    self._latest[window_minutes] = payload
+                    self._publish(window_minutes, payload)
+
+    async def close(self) -> None:
+        """Stop the background loop"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Return subscriber and fan-out counters"""
+        return {
+            "subscribers": len(self),
+            "windows": len(self._subscribers),
+            "max_subscribers": self.max_subscribers,
+            "tick_seconds": self.tick_seconds,
+            "ticks": self.ticks,
+            "computations": self.computations,
+            "messages": self.messages,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,229 @@
+"""
+Sliding-window counters for PeerPulse statistics.
+
+Every submitted pulse increments a per-minute bucket (total, activity and
+normalized mood counts) in a ring that keeps the last
+PEERPULSE_RETENTION_MINUTES minutes. GET /peerpulse merges the buckets of
+the requested window, so a stats read costs O(window / 1 minute) no
+matter how many pulses were submitted. The window is counted in whole
+minutes, starting with the minute the cutoff falls in, and cannot be
+longer than the retention. Expired buckets are dropped when a new minute
+starts and when the ring is reloaded, never on a read.
+
+With MongoDB, the increments not flushed yet are written every
+PEERPULSE_FLUSH_SECONDS to the peerpulse_minutes collection ($inc per
+minute). The ring is then reloaded from it, so a restarted worker gets
+its counters back and each worker sees pulses submitted to the others.
+If no snapshot exists yet (first start, or pulses seeded directly), the
+buckets are rebuilt once from the raw pulses. Workers that start together
+may all rebuild it; the first insert of each minute wins and the others
+are skipped.
+"""
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional
+
+from pymongo.errors import BulkWriteError
+
+from app.utils.database import db
+
+PEERPULSE_RETENTION_MINUTES = int(os.getenv("PEERPULSE_RETENTION_MINUTES", str(24 * 60)))
+PEERPULSE_FLUSH_SECONDS = float(os.getenv("PEERPULSE_FLUSH_SECONDS", "10"))
+
+# Longest mood word kept as its own counter (moods are free text)
+MAX_MOOD_LENGTH = 40
+
+
+def minute_of(moment: datetime) -> datetime:
+    """Start of the minute a timestamp falls in"""
+    return moment.replace(second=0, microsecond=0)
+
+
+def normalize_mood(mood: Optional[str]) -> str:
+    """Lowercase, trimmed mood usable as a counter key ('' for no mood)"""
+    mood = (mood or "").strip().lower().replace(".", "").replace("$", "")
+    return mood[:MAX_MOOD_LENGTH]
+
+
+def _new_bucket() -> Dict[str, Any]:
+    return {"total": 0, "activity": {}, "mood": {}}
+
+
+def _increment(activity: str, mood: Optional[str]) -> Dict[str, Any]:
+    """Counters of a single pulse"""
+    mood = normalize_mood(mood)
+    return {"total": 1, "activity": {activity: 1}, "mood": {mood: 1} if mood else {}}
+
+
+def _add(bucket: Dict[str, Any], other: Dict[str, Any]) -> None:
+    bucket["total"] += other.get("total", 0)
+    for field in ("activity", "mood"):
+        counts = bucket[field]
+        for key, value in (other.get(field) or {}).items():
+            counts[key] = counts.get(key, 0) + value
+
+
+class PulseCounters:
+    """Ring of per-minute pulse counters with a MongoDB snapshot"""
+
+    def __init__(self, retention_minutes: int = PEERPULSE_RETENTION_MINUTES):
+        self.retention_minutes = retention_minutes
+        self._buckets: Dict[datetime, Dict[str, Any]] = {}
+        # Increments not yet written to peerpulse_minutes
+        self._pending: Dict[datetime, Dict[str, Any]] = {}
+        self.recorded = 0
+        self.flushes = 0
+        self.flush_errors = 0
+
+    def _prune(self, now: datetime) -> None:
+        oldest = minute_of(now) - timedelta(minutes=self.retention_minutes)
+        for minute in [m for m in self._buckets if m <= oldest]:
+            del self._buckets[minute]
+
+    def record(self, activity: str, mood: Optional[str], at: datetime) -> None:
+        """
+        Count one pulse
+
+        Args:
+            activity (str): Bucketed activity
+            mood (str): Optional mood word
+            at (datetime): Submission time (UTC)
+        """
+        increment = _increment(activity, mood)
+        minute = minute_of(at)
+        if minute not in self._buckets:
+            # Once per minute: drop the buckets that left the retention
+            self._prune(at)
+            self._buckets[minute] = _new_bucket()
+        _add(self._buckets[minute], increment)
+        if db.is_connected():
+            _add(self._pending.setdefault(minute, _new_bucket()), increment)
+        self.recorded += 1
+
+    def window(self, window_minutes: int, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Merge the buckets of the last `window_minutes` minutes
+
+        Args:
+            window_minutes (int): Window length (at most the retention)
+            now (datetime): End of the window (default: current UTC time)
+
+        Returns:
+            dict: {"total": n, "activity": {...}, "mood": {...}}
+        """
+        now = now or datetime.utcnow()
+        merged = _new_bucket()
+        current = minute_of(now)
+        # Buckets at or past the retention may not be pruned yet; never read them
+        for offset in range(min(window_minutes + 1, self.retention_minutes)):
+            bucket = self._buckets.get(current - timedelta(minutes=offset))
+            if bucket is not None:
+                _add(merged, bucket)
+        return merged
+
+    def _load(self, buckets: Iterable[Dict[str, Any]]) -> None:
+        self._buckets = {}
+        for doc in buckets:
+            _add(self._buckets.setdefault(doc["minute"], _new_bucket()), doc)
+        # Increments that are not in the snapshot yet
+        for minute, bucket in self._pending.items():
+            _add(self._buckets.setdefault(minute, _new_bucket()), bucket)
+
+    async def rebuild(self) -> int:
+        """
+        Load the counters from storage
+
+        Reads the peerpulse_minutes snapshot; rebuilds it from the raw
+        pulses when it is empty. In-memory mode counts db.peerpulse_mem.
+
+        Returns:
+            int: Number of minute buckets loaded
+        """
+        now = datetime.utcnow()
+        oldest = minute_of(now) - timedelta(minutes=self.retention_minutes)
+        if not db.is_connected():
+            self._buckets = {}
+            for pulse in getattr(db, "peerpulse_mem", []):
+                if pulse["created_at"] > oldest:
+                    bucket = self._buckets.setdefault(minute_of(pulse["created_at"]), _new_bucket())
+                    _add(bucket, _increment(pulse.get("activity", "chilling"), pulse.get("mood")))
+            return len(self._buckets)
+
+        minutes = db.db.peerpulse_minutes
+        if await minutes.estimated_document_count() == 0:
+            rebuilt: Dict[datetime, Dict[str, Any]] = {}
+            cursor = db.db.peerpulse.find(
+                {"created_at": {"$gt": oldest}},
+                {"activity": 1, "mood": 1, "created_at": 1},
+            )
+            async for pulse in cursor:
+                bucket = rebuilt.setdefault(minute_of(pulse["created_at"]), _new_bucket())
+                _add(bucket, _increment(pulse.get("activity", "chilling"), pulse.get("mood")))
+            if rebuilt:
+                docs = [{"minute": m, **bucket} for m, bucket in rebuilt.items()]
+                try:
+                    await minutes.insert_many(docs, ordered=False)
+                except BulkWriteError as e:
+                    # Another worker seeded these minutes first (unique minute index)
+                    if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                        raise
+                print(f"Rebuilt {len(rebuilt)} peer pulse minute buckets from raw pulses")
+
+        self._load(await minutes.find({"minute": {"$gt": oldest}}, {"_id": 0}).to_list(None))
+        return len(self._buckets)
+
+    async def flush(self) -> int:
+        """
+        Write pending increments to peerpulse_minutes and reload the ring
+
+        Returns:
+            int: Number of minute buckets written
+        """
+        if not db.is_connected():
+            return 0
+        pending, self._pending = self._pending, {}
+        minutes = db.db.peerpulse_minutes
+        written = 0
+        try:
+            for minute, bucket in pending.items():
+                increments = {"total": bucket["total"]}
+                for field in ("activity", "mood"):
+                    for key, value in bucket[field].items():
+                        increments[f"{field}.{key}"] = value
+                await minutes.update_one({"minute": minute}, {"$inc": increments}, upsert=True)
+                written += 1
+        except Exception:
+            # Keep what was not written for the next flush
+            for minute, bucket in list(pending.items())[written:]:
+                _add(self._pending.setdefault(minute, _new_bucket()), bucket)
+            self.flush_errors += 1
+            raise
+        oldest = minute_of(datetime.utcnow()) - timedelta(minutes=self.retention_minutes)
+        self._load(await minutes.find({"minute": {"$gt": oldest}}, {"_id": 0}).to_list(None))
+        self.flushes += 1
+        return written
+
+    async def run(self) -> None:
+        """Background loop: flush to MongoDB every PEERPULSE_FLUSH_SECONDS"""
+        while True:
+            await asyncio.sleep(PEERPULSE_FLUSH_SECONDS)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Peer pulse counter flush failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return ring counters"""
+        return {
+            "buckets": len(self._buckets),
+            "pending_buckets": len(self._pending),
+            "retention_minutes": self.retention_minutes,
+            "recorded": self.recorded,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+        }
+
+
+# Process-wide counters used by the peer pulse routes
+pulse_counters = PulseCounters()
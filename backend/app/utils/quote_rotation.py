@@ -0,0 +1,177 @@
+"""
+Per-user no-repeat rotation of motivational quotes.
+
+Each (user, mood, language) deals quotes from its own shuffled permutation
+of the candidate list: a draw is O(1), and nothing repeats until the list
+is exhausted (the next round is reshuffled so it does not start with the
+quote that ended the previous one).
+
+Rotation state is kept in an LRU bounded by QUOTE_ROTATION_MAX_ENTRIES;
+entries idle for QUOTE_ROTATION_IDLE_SECONDS are dropped. With
+QUOTE_ROTATION_BACKEND=mongo (and MongoDB connected) the state is instead
+stored as {seed, size, pos} documents so every worker shares it; the
+permutation is re-derived from the seed and idle documents expire via a
+TTL index.
+"""
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pymongo import ReturnDocument
+
+from app.utils.database import db
+
+QUOTE_ROTATION_MAX_ENTRIES = int(os.getenv("QUOTE_ROTATION_MAX_ENTRIES", "50000"))
+QUOTE_ROTATION_IDLE_SECONDS = float(os.getenv("QUOTE_ROTATION_IDLE_SECONDS", "3600"))
+QUOTE_ROTATION_BACKEND = os.getenv("QUOTE_ROTATION_BACKEND", "memory").lower()
+
+
+@lru_cache(maxsize=4096)
+def _permutation(seed: int, size: int) -> Tuple[int, ...]:
+    """Deterministic shuffle of range(size) (shared by all workers for a seed)"""
+    order = list(range(size))
+    random.Random(seed).shuffle(order)
+    return tuple(order)
+
+
+class _Rotation:
+    __slots__ = ("order", "pos", "last", "touched")
+
+    def __init__(self, size: int, last: Optional[int] = None):
+        self.order: List[int] = random.sample(range(size), size)
+        # Avoid dealing the previous round's last quote twice in a row
+        if size > 1 and self.order[0] == last:
+            swap = random.randrange(1, size)
+            self.order[0], self.order[swap] = self.order[swap], self.order[0]
+        self.pos = 0
+        self.last = last
+        self.touched = time.monotonic()
+
+
+class QuoteRotation:
+    """
+    Deals quotes per (user, mood, language) without repeats until exhaustion
+
+    Args:
+        max_entries (int): Maximum rotation states kept in memory
+        idle_seconds (float): Idle time after which a state is dropped
+        backend (str): "memory" or "mongo"
+    """
+
+    def __init__(
+        self,
+        max_entries: int = QUOTE_ROTATION_MAX_ENTRIES,
+        idle_seconds: float = QUOTE_ROTATION_IDLE_SECONDS,
+        backend: str = QUOTE_ROTATION_BACKEND
+    ):
+        self.max_entries = max(1, max_entries)
+        self.idle_seconds = idle_seconds
+        self.backend = backend
+        self._entries: "OrderedDict[Tuple[str, str, str], _Rotation]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._collection = None
+        self.draws = 0
+        self.reshuffles = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _uses_mongo(self) -> bool:
+        return self.backend == "mongo" and db.is_connected()
+
+    async def _mongo(self):
+        # Its TTL index on updated_at is in the index registry (app/utils/indexes.py)
+        if not self._uses_mongo():
+            return None
+        if self._collection is None:
+            self._collection = db.db.quote_rotation
+        return self._collection
+
+    def _evict(self, now: float) -> None:
+        # Caller holds the lock; the front of the LRU is the least recently used
+        while self._entries:
+            key, state = next(iter(self._entries.items()))
+            if len(self._entries) > self.max_entries:
+                self.evictions += 1
+            elif now - state.touched > self.idle_seconds:
+                self.expirations += 1
+            else:
+                break
+            del self._entries[key]
+
+    async def draw(self, user_key: str, mood: str, language: str, quotes: Sequence[str]) -> str:
+        """
+        Deal the next quote of this user's rotation
+
+        Args:
+            user_key (str): User ID or client identifier
+            mood (str): Mood the quotes are for
+            language (str): Language the quotes are in
+            quotes (sequence): Candidate quotes (from the quote catalog)
+
+        Returns:
+            str: The next quote
+        """
+        size = len(quotes)
+        if size == 0:
+            raise IndexError("No quotes available")
+        self.draws += 1
+        collection = await self._mongo()
+        if collection is not None:
+            return quotes[await self._draw_mongo(collection, f"{user_key}|{mood}|{language}", size)]
+
+        key = (user_key, mood, language)
+        now = time.monotonic()
+        with self._lock:
+            state = self._entries.get(key)
+            if state is None or len(state.order) != size or state.pos >= size:
+                if state is not None:
+                    self.reshuffles += 1
+                last = state.order[state.pos - 1] if state is not None and state.pos and len(state.order) == size else None
+                state = _Rotation(size, last)
+                self._entries[key] = state
+            index = state.order[state.pos]
+            state.pos += 1
+            state.touched = now
+            self._entries.move_to_end(key)
+            self._evict(now)
+        return quotes[index]
+
+    async def _draw_mongo(self, collection, key: str, size: int) -> int:
+        now = datetime.utcnow()
+        doc = await collection.find_one_and_update(
+            {"_id": key, "size": size, "pos": {"$lt": size}},
+            {"$inc": {"pos": 1}, "$set": {"updated_at": now}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc is None:
+            # New user, exhausted round or changed catalog: start a fresh permutation
+            self.reshuffles += 1
+            doc = await collection.find_one_and_update(
+                {"_id": key},
+                {"$set": {"seed": random.getrandbits(32), "size": size, "pos": 1, "updated_at": now}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        return _permutation(doc["seed"], size)[doc["pos"] - 1]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return rotation counters"""
+        return {
+            "backend": "mongo" if self._uses_mongo() else "memory",
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "idle_seconds": self.idle_seconds,
+            "draws": self.draws,
+            "reshuffles": self.reshuffles,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+# Process-wide rotation used by get_quote
+quote_rotation = QuoteRotation()
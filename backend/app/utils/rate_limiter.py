@@ -0,0 +1,143 @@
+"""
+Fixed-window "one action per key every N seconds" rate limiting.
+
+hit() checks and records an attempt in one O(1) step. The memory backend
+keeps each key's expiry in an insertion-ordered dict, so expired keys are
+dropped from its front and memory stays bounded by the keys active within
+one window (plus a hard RATE_LIMIT_MAX_KEYS cap). The mongo backend
+(RATE_LIMIT_BACKEND=mongo, the default, used while MongoDB is connected)
+shares the limit across workers. It does a single conditional upsert
+into the rate_limits collection: a key whose window has not expired
+fails with a duplicate key error. A TTL index removes expired keys.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+from pymongo.errors import DuplicateKeyError
+
+from app.utils.database import db
+
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "mongo").lower()
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+
+class RateLimiter:
+    """
+    Allows one hit per key every `window_seconds`
+
+    Args:
+        name (str): Limit name (namespaces the keys in the shared backend)
+        window_seconds (float): Minimum time between two allowed hits of a key
+        max_keys (int): Maximum keys tracked in memory
+        backend (str): "memory" or "mongo"
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float,
+        max_keys: int = RATE_LIMIT_MAX_KEYS,
+        backend: str = RATE_LIMIT_BACKEND
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.max_keys = max(1, max_keys)
+        self.backend = backend
+        # key -> monotonic time its window ends, oldest first
+        self._expiry: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.limited = 0
+        self.evictions = 0
+        self.released = 0
+
+    def _uses_mongo(self) -> bool:
+        return self.backend == "mongo" and db.is_connected()
+
+    def _prune(self, now: float) -> None:
+        # Caller holds the lock; every window has the same length, so the front expires first
+        while self._expiry:
+            key, expires = next(iter(self._expiry.items()))
+            if expires > now and len(self._expiry) <= self.max_keys:
+                break
+            if expires > now:
+                self.evictions += 1
+            del self._expiry[key]
+
+    async def hit(self, key: str) -> float:
+        """
+        Record an attempt if the key is not limited
+
+        Args:
+            key (str): Key to limit (e.g. a user hash)
+
+        Returns:
+            float: 0.0 if the attempt is allowed, else seconds until the next allowed one
+        """
+        if self._uses_mongo():
+            retry_after = await self._hit_mongo(key)
+        else:
+            now = time.monotonic()
+            with self._lock:
+                expires = self._expiry.get(key)
+                if expires is not None and expires > now:
+                    retry_after = expires - now
+                else:
+                    self._expiry.pop(key, None)
+                    self._expiry[key] = now + self.window_seconds
+                    retry_after = 0.0
+                self._prune(now)
+        if retry_after:
+            self.limited += 1
+        else:
+            self.allowed += 1
+        return retry_after
+
+    async def release(self, key: str) -> None:
+        """
+        Forget a key's current window (e.g. when the limited action failed)
+
+        Args:
+            key (str): Key passed to hit()
+        """
+        if self._uses_mongo():
+            await db.db.rate_limits.delete_one({"_id": f"{self.name}:{key}"})
+        else:
+            with self._lock:
+                self._expiry.pop(key, None)
+        self.released += 1
+
+    async def _hit_mongo(self, key: str) -> float:
+        collection = db.db.rate_limits
+        doc_id = f"{self.name}:{key}"
+        now = datetime.utcnow()
+        try:
+            # Matches only an expired window; otherwise the upsert collides on _id
+            await collection.update_one(
+                {"_id": doc_id, "expires_at": {"$lte": now}},
+                {"$set": {"expires_at": now + timedelta(seconds=self.window_seconds)}},
+                upsert=True,
+            )
+            return 0.0
+        except DuplicateKeyError:
+            doc = await collection.find_one({"_id": doc_id})
+            if doc is None:
+                return self.window_seconds
+            return max((doc["expires_at"] - now).total_seconds(), 0.001)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return limiter counters"""
+        return {
+            "backend": "mongo" if self._uses_mongo() else "memory",
+            "window_seconds": self.window_seconds,
+            "keys": len(self._expiry),
+            "max_keys": self.max_keys,
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "evictions": self.evictions,
+            "released": self.released,
+        }
@@ -1,13 +1,163 @@
-import random
 import json
 import os
-from typing import Dict, List
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.utils.quote_rotation import quote_rotation
 
 # Path to the quotes file
 QUOTES_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data', 'quotes.json')
 
-# Memory to prevent repeating quotes in the same session
-quote_memory = set()
+# How often (at most) the quotes file is stat()ed for changes
+QUOTES_RELOAD_INTERVAL_SECONDS = float(os.getenv("QUOTES_RELOAD_INTERVAL_SECONDS", "5"))
+
+
+class _QuoteIndex:
+    """Immutable snapshot of the catalog with fallbacks already resolved"""
+
+    def __init__(self, quotes: Dict[str, Dict[str, List[str]]]):
+        self.quotes = quotes
+        languages = {language for by_language in quotes.values() for language in by_language}
+        neutral = quotes.get('neutral', {})
+        # (mood, language) -> quotes for every known mood and language
+        self.by_key: Dict[Tuple[str, str], Tuple[str, ...]] = {}
+        for mood, by_language in quotes.items():
+            for language in languages:
+                resolved = by_language[language] if language in by_language else by_language.get('english')
+                if resolved is not None:
+                    self.by_key[(mood, language)] = tuple(resolved)
+        # Unknown mood -> neutral in the requested language (else English)
+        self.unknown_mood = {
+            language: tuple(neutral[language] if language in neutral else neutral['english'])
+            for language in languages if language in neutral or 'english' in neutral
+        }
+        # Unknown language -> English of the (possibly neutral) mood
+        self.default_language = {mood: tuple(by_language['english']) for mood, by_language in quotes.items() if 'english' in by_language}
+        self.count = sum(len(v) for by_language in quotes.values() for v in by_language.values())
+
+    def lookup(self, mood: str, language: str) -> Tuple[str, ...]:
+        found = self.by_key.get((mood, language))
+        if found is not None:
+            return found
+        if mood in self.quotes:
+            return self.default_language[mood]
+        found = self.unknown_mood.get(language)
+        if found is not None:
+            return found
+        return self.default_language['neutral']
+
+
+class QuoteCatalog:
+    """
+    Quotes loaded once and hot-reloaded when the quotes file changes
+
+    The file's (mtime, size) is checked at most every `check_interval`
+    seconds; the JSON is only parsed again when it changed. Lookups are
+    served from a pre-built (mood, language) index.
+
+    Args:
+        path (str): Path to quotes.json
+        check_interval (float): Minimum seconds between change checks
+    """
+
+    def __init__(self, path: str = QUOTES_FILE, check_interval: float = QUOTES_RELOAD_INTERVAL_SECONDS):
+        self.path = path
+        self.check_interval = check_interval
+        self._index: Optional[_QuoteIndex] = None
+        self._signature = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.source = None
+        self.loads = 0
+        self.load_errors = 0
+        self.checks = 0
+        self.last_parse_ms = 0.0
+        self.total_parse_ms = 0.0
+        self.loaded_at = None
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _reload(self, signature) -> None:
+        started = time.perf_counter()
+        try:
+            if signature is None:
+                # Return default quotes if file doesn't exist
+                quotes, source = get_default_quotes(), 'defaults'
+            else:
+                with open(self.path, 'r', encoding='utf-8') as file:
+                    quotes, source = json.load(file), 'file'
+            index = _QuoteIndex(quotes)
+        except Exception as e:
+            print(f"Error loading quotes: {e}")
+            self.load_errors += 1
+            if self._index is not None:
+                # Keep serving the last good catalog until the file is fixed
+                self._signature = signature
+                return
+            quotes, source = get_default_quotes(), 'defaults'
+            index = _QuoteIndex(quotes)
+        parse_ms = (time.perf_counter() - started) * 1000
+        self._index = index
+        self._signature = signature
+        self.source = source
+        self.loads += 1
+        self.last_parse_ms = parse_ms
+        self.total_parse_ms += parse_ms
+        self.loaded_at = time.time()
+        print(f"Quote catalog loaded from {source} ({index.count} quotes, {parse_ms:.1f} ms)")
+
+    def _current(self) -> _QuoteIndex:
+        now = time.monotonic()
+        if self._index is not None and now - self._checked_at < self.check_interval:
+            return self._index
+        with self._lock:
+            if self._index is None or now - self._checked_at >= self.check_interval:
+                self._checked_at = now
+                self.checks += 1
+                signature = self._stat()
+                if self._index is None or signature != self._signature:
+                    self._reload(signature)
+        return self._index
+
+    @property
+    def quotes(self) -> Dict[str, Dict[str, List[str]]]:
+        """Raw catalog (mood -> language -> quotes)"""
+        return self._current().quotes
+
+    def get_quotes(self, mood: str, language: str = 'english') -> Tuple[str, ...]:
+        """
+        Quotes for a mood and language, falling back to neutral / English
+
+        Args:
+            mood (str): Mood to get quotes for
+            language (str): Preferred language
+
+        Returns:
+            tuple: Candidate quotes
+        """
+        return self._current().lookup(mood, language)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return load counters"""
+        index = self._index
+        return {
+            "source": self.source,
+            "quotes": index.count if index is not None else 0,
+            "loads": self.loads,
+            "load_errors": self.load_errors,
+            "checks": self.checks,
+            "check_interval_seconds": self.check_interval,
+            "last_parse_ms": round(self.last_parse_ms, 3),
+            "avg_parse_ms": round(self.total_parse_ms / self.loads, 3) if self.loads else 0.0,
+            "loaded_at": self.loaded_at,
+        }
+
 
 def load_quotes():
     """
@@ -16,16 +166,7 @@ def load_quotes():
     Returns:
         dict: Dictionary of quotes by mood and language
     """
-    try:
-        if os.path.exists(QUOTES_FILE):
-            with open(QUOTES_FILE, 'r', encoding='utf-8') as file:
-                return json.load(file)
-        else:
-            # Return default quotes if file doesn't exist
-            return get_default_quotes()
-    except Exception as e:
-        print(f"Error loading quotes: {e}")
-        return get_default_quotes()
+    return quote_catalog.quotes
 
 def get_default_quotes():
     """
@@ -244,45 +385,25 @@ def get_default_quotes():
         }
     }
 
-def get_quote(mood, language='english'):
+async def get_quote(mood, language='english', user_key='anonymous'):
     """
     Get a quote based on mood and language
     
+    Quotes are dealt from a per-(user, mood, language) shuffled rotation,
+    so a user sees every quote once before any repeats.
+    
     Args:
         mood (str): The mood to get a quote for
         language (str): The language to get a quote in
+        user_key (str): User ID or client identifier owning the rotation
         
     Returns:
         str: A motivational quote
     """
-    quotes = load_quotes()
-    
-    # If mood not found, default to neutral
-    if mood not in quotes:
-        mood = 'neutral'
-    
-    # If language not found, default to English
-    if language not in quotes[mood]:
-        language = 'english'
-    
-    # Get quotes for the specified mood and language
-    mood_quotes = quotes[mood][language]
-    
-    # If all quotes have been seen, reset memory
-    if len(quote_memory) >= len(mood_quotes):
-        quote_memory.clear()
-    
-    # Find quotes that haven't been seen
-    available_quotes = [q for q in mood_quotes if q not in quote_memory]
-    
-    # If no available quotes, use any quote
-    if not available_quotes:
-        available_quotes = mood_quotes
-    
-    # Select a random quote
-    quote = random.choice(available_quotes)
-    
-    # Add to memory
-    quote_memory.add(quote)
-    
-    return quote
+    # Unknown moods fall back to neutral and unknown languages to English
+    mood_quotes = quote_catalog.get_quotes(mood, language)
+    return await quote_rotation.draw(user_key, mood, language, mood_quotes)
+
+
+# Process-wide catalog used by /quote
+quote_catalog = QuoteCatalog()
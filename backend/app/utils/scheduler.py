@@ -0,0 +1,255 @@
+"""
+Plan auto-rescheduler backed by a due-time priority queue.
+
+Keeps a min-heap of the next due (scheduled_date + scheduled_time) of every
+plan that can still be missed, so the background loop only wakes up when a
+plan actually becomes overdue instead of scanning every plan periodically.
+The heap is rebuilt from storage once on startup and afterwards kept up to
+date by the plan routes through schedule() / unschedule().
+"""
+import asyncio
+import heapq
+import itertools
+import os
+from datetime import datetime, date, time, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.utils.database import db
+
+# Only these statuses are auto-rescheduled once their start time has passed
+RESCHEDULABLE_STATUSES = ("pending", "snoozed")
+
+# A plan counts as missed once its start minute is over
+MISSED_GRACE_SECONDS = int(os.getenv("AUTO_RESCHEDULE_GRACE_SECONDS", "60"))
+
+# Upper bound for a single sleep of the loop (guards against clock jumps)
+MAX_IDLE_SECONDS = 300
+
+
+def _parse_scheduled_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str) and value:
+        try:
+            return date.fromisoformat(value[:10])
+        except ValueError:
+            pass
+    # Legacy plans without a date are treated as scheduled for today
+    return date.today()
+
+
+def _parse_scheduled_time(value) -> Optional[time]:
+    if isinstance(value, time):
+        return value
+    if isinstance(value, str) and value:
+        try:
+            hh, mm = value.split(":")[:2]
+            return time(hour=int(hh), minute=int(mm))
+        except (ValueError, TypeError):
+            return None
+    return None
+
+
+def plan_due_at(plan: Dict[str, Any]) -> Optional[datetime]:
+    """
+    Return the datetime at which a plan is due to start
+
+    Args:
+        plan (dict): Plan data
+
+    Returns:
+        datetime: Due datetime or None if the plan has no scheduled_time
+    """
+    st = _parse_scheduled_time(plan.get("scheduled_time"))
+    if st is None:
+        return None
+    return datetime.combine(_parse_scheduled_date(plan.get("scheduled_date")), st)
+
+
+def _plan_id(plan: Dict[str, Any]) -> Optional[str]:
+    if plan.get("id"):
+        return str(plan["id"])
+    if plan.get("_id"):
+        return str(plan["_id"])
+    return None
+
+
+class PlanScheduler:
+    """
+    In-process min-heap of plan due times.
+
+    Entries are invalidated lazily: every plan id maps to the (due_at, seq)
+    of its live heap entry and stale entries are skipped when popped.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, int, str]] = []
+        self._entries: Dict[str, Tuple[datetime, int]] = {}
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self.fired_count = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def schedule(self, plan: Dict[str, Any]) -> None:
+        """
+        Add or move a plan in the queue (removes it if it can no longer be missed)
+
+        Args:
+            plan (dict): Plan data as stored / returned by the database
+        """
+        plan_id = _plan_id(plan)
+        if not plan_id:
+            return
+        status = plan.get("status")
+        if hasattr(status, "value"):
+            status = status.value
+        due_at = plan_due_at(plan) if status in RESCHEDULABLE_STATUSES else None
+        if due_at is None:
+            self.unschedule(plan_id)
+            return
+
+        seq = next(self._seq)
+        self._entries[plan_id] = (due_at, seq)
+        heapq.heappush(self._heap, (due_at, seq, plan_id))
+        # Wake the loop if this plan is now the earliest one
+        if self._heap[0][1] == seq and self._wakeup is not None:
+            self._wakeup.set()
+
+    def unschedule(self, plan_id: str) -> None:
+        """
+        Drop a plan from the queue
+
+        Args:
+            plan_id (str): Plan ID
+        """
+        self._entries.pop(str(plan_id), None)
+
+    def next_due(self) -> Optional[datetime]:
+        """Return the earliest live due datetime, discarding stale heap entries"""
+        while self._heap:
+            due_at, seq, plan_id = self._heap[0]
+            if self._entries.get(plan_id) == (due_at, seq):
+                return due_at
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_overdue(self, now: datetime) -> List[str]:
+        """
+        Remove and return the ids of all plans that are overdue at `now`
+
+        Args:
+            now (datetime): Reference time
+
+        Returns:
+            list: Plan IDs that became missed
+        """
+        cutoff = now - timedelta(seconds=MISSED_GRACE_SECONDS)
+        overdue = []
+        while True:
+            due_at = self.next_due()
+            if due_at is None or due_at > cutoff:
+                break
+            _, _, plan_id = heapq.heappop(self._heap)
+            self._entries.pop(plan_id, None)
+            overdue.append(plan_id)
+        return overdue
+
+    async def rebuild(self) -> int:
+        """
+        Rebuild the queue from storage (startup only)
+
+        Returns:
+            int: Number of plans queued
+        """
+        self._heap = []
+        self._entries = {}
+        status_filter = list(RESCHEDULABLE_STATUSES)
+        if db.is_connected():
+            cursor = db.plans.find(
+                {"status": {"$in": status_filter}},
+                {"status": 1, "scheduled_date": 1, "scheduled_time": 1},
+            ).sort([("scheduled_date", 1), ("scheduled_time", 1)])
+            plans = await cursor.to_list(None)
+        else:
+            plans = [p for p in db.plans.values() if p.get("status") in status_filter]
+
+        for plan in plans:
+            self.schedule(plan)
+        print(f"Auto-rescheduler queue rebuilt with {len(self)} plans")
+        return len(self)
+
+    async def run(self) -> None:
+        """Background loop: sleep until the next plan is due, then reschedule it"""
+        self._wakeup = asyncio.Event()
+        while True:
+            try:
+                now = datetime.now()
+                for plan_id in self.pop_overdue(now):
+                    try:
+                        await self._reschedule_missed(plan_id, now)
+                    except Exception as e:
+                        print(f"Auto-reschedule failed for plan {plan_id}: {e}")
+            except Exception as e:
+                print(f"Auto-rescheduler error: {e}")
+
+            timeout = MAX_IDLE_SECONDS
+            next_due = self.next_due()
+            if next_due is not None:
+                fire_at = next_due + timedelta(seconds=MISSED_GRACE_SECONDS)
+                timeout = min(MAX_IDLE_SECONDS, max(0.0, (fire_at - datetime.now()).total_seconds()))
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _reschedule_missed(self, plan_id: str, now: datetime) -> None:
+        """Move a missed plan roughly an hour ahead, shorter and clear of conflicts"""
+        p = await db.get_plan_by_id(plan_id)
+        if not p or p.get("status") not in RESCHEDULABLE_STATUSES:
+            return
+        due_at = plan_due_at(p)
+        if due_at is None:
+            return
+        if due_at > now - timedelta(seconds=MISSED_GRACE_SECONDS):
+            # Plan was moved since it was queued
+            self.schedule(p)
+            return
+
+        new_duration = max(10, int((p.get('duration_minutes') or 20) * 0.75))
+        # Move to 60 minutes from now (rounded up to the next 5-minute boundary)
+        new_dt = (now + timedelta(minutes=60)).replace(second=0, microsecond=0)
+        new_dt += timedelta(minutes=(-new_dt.minute) % 5)
+
+        # Push forward to the next free slot of the same user (5 min buffer after blockers)
+        conflict_found = False
+        user_id = p.get('user_id')
+        if user_id:
+            day = new_dt.date()
+            new_start = new_dt.hour * 60 + new_dt.minute
+            slot = await db.plan_index.next_free_slot(user_id, day, new_start, new_duration, gap=5, ignore_plan_id=plan_id)
+            if slot != new_start:
+                conflict_found = True
+                new_dt = datetime.combine(day, time()) + timedelta(minutes=slot)
+
+        # Update existing plan instead of creating a new one (avoids duplicates)
+        update = {
+            'status': 'pending',
+            'scheduled_time': f"{new_dt.hour:02d}:{new_dt.minute:02d}",
+            'scheduled_date': new_dt.date().isoformat(),
+            'duration_minutes': new_duration,
+            'auto_rescheduled': True,
+            'conflict_resolved': conflict_found,  # Mark if we had to resolve conflicts
+        }
+        updated = await db.update_plan(plan_id, update)
+        self.fired_count += 1
+        if updated:
+            self.schedule(updated)
+
+
+# Process-wide scheduler instance
+plan_scheduler = PlanScheduler()
@@ -1,13 +1,17 @@
 from passlib.context import CryptContext
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
 from jose import jwt, JWTError
 from jose.exceptions import ExpiredSignatureError
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, List, Dict, Any
 from pydantic import EmailStr
 
 from app.models.token import TokenData
 from app.models.user import User
 import os
+import asyncio
+import threading
+import time
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -56,6 +60,127 @@ def get_password_hash(password: str) -> str:
     """
     return pwd_context.hash(password)
 
+# Password hashing executor configuration
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread").lower()  # thread | process
+PASSWORD_HASH_WORKERS = max(1, int(os.getenv("PASSWORD_HASH_WORKERS", "2")))
+PASSWORD_HASH_MAX_PENDING = max(1, int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32")))
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many password hashing jobs are already pending"""
+
+class PasswordHasher:
+    """
+    Bounded executor for bcrypt hashing and verification.
+
+    bcrypt deliberately takes hundreds of milliseconds, so running it inside
+    an async handler blocks the whole event loop. Jobs run on a dedicated
+    pool of PASSWORD_HASH_WORKERS threads (or processes) instead, and new jobs
+    are rejected once PASSWORD_HASH_MAX_PENDING are running or queued.
+    """
+
+    def __init__(self, kind: str = PASSWORD_HASH_EXECUTOR, workers: int = PASSWORD_HASH_WORKERS,
+                 max_pending: int = PASSWORD_HASH_MAX_PENDING):
+        self.kind = "process" if kind == "process" else "thread"
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self._busy_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pwd-hash")
+        return self._executor
+
+    def _acquire(self, count: int = 1, enforce_limit: bool = True) -> None:
+        with self._lock:
+            if enforce_limit and self._pending + count > self.max_pending:
+                self.rejected += count
+                raise PasswordHasherBusy("Password hashing queue is full")
+            self._pending += count
+
+    def _release(self, count: int, started: float) -> None:
+        with self._lock:
+            self._pending -= count
+            self.completed += count
+            self._busy_seconds += time.perf_counter() - started
+
+    async def _run(self, fn, *args):
+        self._acquire()
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._release(1, started)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        Awaitable verify_password
+
+        Raises:
+            PasswordHasherBusy: If the hashing queue is saturated
+        """
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        """
+        Awaitable get_password_hash
+
+        Raises:
+            PasswordHasherBusy: If the hashing queue is saturated
+        """
+        return await self._run(get_password_hash, password)
+
+    def hash_many(self, passwords: List[str]) -> List[str]:
+        """
+        Hash several passwords in parallel on the pool (blocking, for startup code)
+
+        Seeding must not fail because logins filled the queue, so these jobs
+        are counted as pending but never rejected by PASSWORD_HASH_MAX_PENDING.
+
+        Args:
+            passwords: Passwords to hash
+
+        Returns:
+            list: Hashes in the same order
+        """
+        self._acquire(len(passwords), enforce_limit=False)
+        started = time.perf_counter()
+        try:
+            return list(self._get_executor().map(get_password_hash, passwords))
+        finally:
+            self._release(len(passwords), started)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return executor and queue-depth metrics"""
+        pending = self._pending
+        return {
+            "executor": self.kind,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": min(pending, self.workers),
+            "queued": max(0, pending - self.workers),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_seconds": (self._busy_seconds / self.completed) if self.completed else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+# Process-wide password hasher
+password_hasher = PasswordHasher()
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token
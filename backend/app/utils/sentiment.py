@@ -1,11 +1,15 @@
 from textblob import TextBlob
-import re
 from typing import Dict, Any, Optional, List, Tuple
 import json
 import os
+import threading
 import time
 from functools import lru_cache
 import requests
+from importlib import metadata
+
+from app.utils.sentiment_cache import sentiment_cache, cache_key
+from app.utils.keyword_matcher import build_mood_automaton
 
 # ---------------------------------------------------------------------------
 # Remote Hugging Face Inference API configuration (to avoid local heavy model)
@@ -27,6 +31,15 @@ except ImportError:
     print("Warning: Hugging Face transformers not available. Using fallback sentiment analysis.")
     HUGGINGFACE_AVAILABLE = False
 
+# Bump whenever MOOD_KEYWORDS / the indicator rules change so cached results are recomputed
+SENTIMENT_RULES_VERSION = "1"
+try:
+    _TEXTBLOB_VERSION = metadata.version("textblob")
+except metadata.PackageNotFoundError:
+    _TEXTBLOB_VERSION = "unknown"
+TEXTBLOB_CACHE_MODEL = f"textblob:{_TEXTBLOB_VERSION}/rules:{SENTIMENT_RULES_VERSION}"
+HF_CACHE_MODEL = f"hf:{HF_MODEL_NAME}"
+
 # Define mood categories and their thresholds
 MOOD_CATEGORIES = {
     # Polarity ranges from -1 (negative) to 1 (positive)
@@ -87,10 +100,71 @@ MOOD_KEYWORDS = {
     }
 }
 
+# Phrases that override the TextBlob polarity mood when no keyword matched
+MOOD_INDICATORS = {
+    'tired': ['tired', 'exhausted', 'no energy', 'sleepy', 'थका', 'थकान', 'नींद'],
+    'lazy': ['lazy', 'procrastinating', "can't focus", 'distracted', 'आलसी', 'सुस्त', 'मन नहीं'],
+    'stressed': ['stress', 'anxious', 'worried', 'tension', 'pressure', 'exam', 'deadline',
+                 'तनाव', 'चिंता', 'परेशान'],
+}
+
+# When several moods' keywords occur in the text, the earliest mood in this list wins
+KEYWORD_MOOD_PRECEDENCE = ['happy', 'content', 'neutral', 'tired', 'lazy', 'stressed', 'sad', 'very_sad', 'angry']
+
+# When several indicators occur, the earliest mood in this list wins
+INDICATOR_MOOD_PRECEDENCE = ['stressed', 'lazy', 'tired']
+
+_KEYWORD_RANK = {mood: rank for rank, mood in enumerate(KEYWORD_MOOD_PRECEDENCE)}
+_INDICATOR_RANK = {mood: rank for rank, mood in enumerate(INDICATOR_MOOD_PRECEDENCE)}
+
+# Polarity reported for a keyword match
+KEYWORD_MOOD_POLARITY = {
+    'happy': 0.7, 'content': 0.7,
+    'sad': -0.7, 'very_sad': -0.7,
+    'angry': -0.5, 'stressed': -0.5,
+    'tired': -0.3, 'lazy': -0.3,
+}
+
+# Compiled once: every keyword of every language plus all indicator phrases
+MOOD_AUTOMATON = build_mood_automaton(MOOD_KEYWORDS, MOOD_INDICATORS)
+
+
+def match_mood_terms(text: str, language: str = 'english') -> Dict[str, Any]:
+    """
+    Scan text once for mood keywords and indicator phrases
+    
+    Args:
+        text (str): Lowercased text
+        language (str): Only keywords of this language are considered
+        
+    Returns:
+        dict: 'keyword_mood' / 'indicator_mood' (winning mood or None) and
+              'matches' (every hit with mood, kind and position)
+    """
+    keyword_mood = None
+    indicator_mood = None
+    matches = []
+    for match in MOOD_AUTOMATON.find_all(text):
+        term = match.payload
+        if term.kind == 'keyword':
+            if term.language != language:
+                continue
+            if keyword_mood is None or _KEYWORD_RANK.get(term.mood, len(_KEYWORD_RANK)) < _KEYWORD_RANK.get(keyword_mood, len(_KEYWORD_RANK)):
+                keyword_mood = term.mood
+        elif indicator_mood is None or _INDICATOR_RANK[term.mood] < _INDICATOR_RANK[indicator_mood]:
+            indicator_mood = term.mood
+        matches.append({'mood': term.mood, 'kind': term.kind, 'term': match.pattern,
+                        'start': match.start, 'end': match.end})
+    return {'keyword_mood': keyword_mood, 'indicator_mood': indicator_mood, 'matches': matches}
+
+
 def analyze_sentiment(text, language='english'):
     """
     Analyze the sentiment of the given text and return the mood.
     
+    Results are cached by normalized text and language; repeated phrases
+    are returned with `cached: True`.
+    
     Args:
         text (str): The text to analyze
         language (str): The language of the text (default: 'english')
@@ -98,32 +172,32 @@ def analyze_sentiment(text, language='english'):
     Returns:
         dict: Mood information with mood type, polarity, and subjectivity
     """
+    key = cache_key(text, language, TEXTBLOB_CACHE_MODEL)
+    cached = sentiment_cache.get(key)
+    if cached is not None:
+        return cached
+    result = _analyze_sentiment_uncached(text, language)
+    sentiment_cache.put(key, result)
+    return dict(result, cached=False)
+
+
+def _analyze_sentiment_uncached(text, language='english'):
+    """Keyword / TextBlob analysis behind analyze_sentiment"""
     # Convert to lowercase
     text = text.lower()
     
+    # One pass over the text finds keyword and indicator hits
+    terms = match_mood_terms(text, language)
+    
     # Check for direct keyword matches first
-    for mood, lang_keywords in MOOD_KEYWORDS.items():
-        if language in lang_keywords:
-            for keyword in lang_keywords[language]:
-                if keyword in text:
-                    # Provide default values for polarity and subjectivity based on mood
-                    if mood in ['happy', 'content']:
-                        default_polarity = 0.7
-                    elif mood in ['sad', 'very_sad']:
-                        default_polarity = -0.7
-                    elif mood in ['angry', 'stressed']:
-                        default_polarity = -0.5
-                    elif mood in ['tired', 'lazy']:
-                        default_polarity = -0.3
-                    else:
-                        default_polarity = 0.0
-                        
-                    return {
-                        'mood': mood,
-                        'polarity': default_polarity,
-                        'subjectivity': 0.5,  # Default middle value
-                        'source': 'keyword'
-                    }
+    mood = terms['keyword_mood']
+    if mood is not None:
+        return {
+            'mood': mood,
+            'polarity': KEYWORD_MOOD_POLARITY.get(mood, 0.0),
+            'subjectivity': 0.5,  # Default middle value
+            'source': 'keyword'
+        }
     
     # If no keyword match, use TextBlob for sentiment analysis (works best for English)
     blob = TextBlob(text)
@@ -138,22 +212,9 @@ def analyze_sentiment(text, language='english'):
             break
     
     # Additional rules for specific moods that aren't well-captured by polarity
-    
-    # Check for tired indicators
-    tired_patterns = [r'tired', r'exhausted', r'no energy', r'sleepy', r'थका', r'थकान', r'नींद']
-    if any(re.search(pattern, text) for pattern in tired_patterns):
-        detected_mood = 'tired'
-    
-    # Check for lazy indicators
-    lazy_patterns = [r'lazy', r'procrastinating', r'can\'t focus', r'distracted', r'आलसी', r'सुस्त', r'मन नहीं']
-    if any(re.search(pattern, text) for pattern in lazy_patterns):
-        detected_mood = 'lazy'
-    
-    # Check for stressed indicators
-    stressed_patterns = [r'stress', r'anxious', r'worried', r'tension', r'pressure', r'exam', r'deadline', 
-                        r'तनाव', r'चिंता', r'परेशान']
-    if any(re.search(pattern, text) for pattern in stressed_patterns):
-        detected_mood = 'stressed'
+    # (stressed > lazy > tired indicators, see INDICATOR_MOOD_PRECEDENCE)
+    if terms['indicator_mood'] is not None:
+        detected_mood = terms['indicator_mood']
     
     return {
         'mood': detected_mood,
@@ -179,14 +240,23 @@ EMOTION_TO_MOOD_MAPPING = {
     'neutral': 'neutral'
 }
 
-# Use LRU cache to avoid loading the model repeatedly
-@lru_cache(maxsize=1)
+# Serializes the first load: lru_cache alone lets two threads both load the model
+_classifier_lock = threading.Lock()
+
+
 def get_emotion_classifier():
     """Return a local transformers pipeline unless remote API is configured.
 
     If a Hugging Face API token is provided (or local loading disabled), we skip
     creating the heavy local model to avoid freezing low-resource machines.
     """
+    with _classifier_lock:
+        return _load_emotion_classifier()
+
+
+# Use LRU cache to avoid loading the model repeatedly
+@lru_cache(maxsize=1)
+def _load_emotion_classifier():
     # Prefer remote inference if configured
     if USE_REMOTE_HF or DISABLE_LOCAL_HF:
         if USE_REMOTE_HF:
@@ -258,23 +328,30 @@ def analyze_with_huggingface(text: str, use_huggingface: bool = True) -> Dict[st
     Returns:
         dict: Analysis results with mood, emotion scores, etc.
     """
+    if not use_huggingface or not (USE_REMOTE_HF or local_model_enabled()):
+        return analyze_sentiment(text)
+
+    # The model is case-sensitive, so only whitespace is normalized for its key
+    key = cache_key(text, "", HF_CACHE_MODEL, casefold=False)
+    cached = sentiment_cache.get(key)
+    if cached is not None:
+        return cached
+    result = _analyze_with_huggingface_uncached(text, use_huggingface)
+    # Only model output is cached under the model key; fallbacks are cached by analyze_sentiment
+    if str(result.get('source', '')).startswith('huggingface'):
+        sentiment_cache.put(key, result)
+        result = dict(result, cached=False)
+    return result
+
+
+def _analyze_with_huggingface_uncached(text: str, use_huggingface: bool = True) -> Dict[str, Any]:
+    """Remote / local model inference behind analyze_with_huggingface"""
     # Attempt remote first if configured
     if use_huggingface and USE_REMOTE_HF:
         remote_scores = _remote_emotion_inference(text)
         if remote_scores:
             # remote_scores is list of {label, score}
-            emotion_scores = remote_scores
-            top_emotion = max(emotion_scores, key=lambda x: x['score'])
-            emotion_label = top_emotion['label']
-            mapped_mood, polarity = _map_emotion_to_mood_and_polarity(emotion_label)
-            return {
-                'mood': mapped_mood,
-                'polarity': polarity,
-                'emotion': emotion_label,
-                'emotion_score': top_emotion['score'],
-                'all_emotions': {item['label']: item['score'] for item in emotion_scores},
-                'source': 'huggingface_remote'
-            }
+            return _build_emotion_result(remote_scores, 'huggingface_remote')
         # If remote failed, continue to possible local fallback
 
     # If HuggingFace not enabled OR disabled OR missing dependencies -> fallback
@@ -288,22 +365,88 @@ def analyze_with_huggingface(text: str, use_huggingface: bool = True) -> Dict[st
             return analyze_sentiment(text)
 
         emotion_scores = classifier(text)[0]
-        top_emotion = max(emotion_scores, key=lambda x: x['score'])
-        emotion_label = top_emotion['label']
-        mapped_mood, polarity = _map_emotion_to_mood_and_polarity(emotion_label)
-        return {
-            'mood': mapped_mood,
-            'polarity': polarity,
-            'emotion': emotion_label,
-            'emotion_score': top_emotion['score'],
-            'all_emotions': {item['label']: item['score'] for item in emotion_scores},
-            'source': 'huggingface_local'
-        }
+        return _build_emotion_result(emotion_scores, 'huggingface_local')
     except Exception as e:
         print(f"HuggingFace processing error: {e}")
         return analyze_sentiment(text)
 
 
+def local_model_enabled() -> bool:
+    """Whether emotion classification runs on the local transformers pipeline"""
+    return HUGGINGFACE_AVAILABLE and not USE_REMOTE_HF and not DISABLE_LOCAL_HF
+
+
+def classify_emotions_batch(texts: List[str]) -> List[Dict[str, Any]]:
+    """
+    Run the local emotion classifier once over a batch of texts
+    
+    Texts already in the sentiment cache are answered from it; only the
+    misses are sent to the model. Falls back to analyze_sentiment per text
+    when the model is unavailable or the batch fails.
+    
+    Args:
+        texts (list): Texts to analyze
+        
+    Returns:
+        list: Analysis results in the same order as `texts`
+    """
+    classifier = get_emotion_classifier() if local_model_enabled() else None
+    if classifier is None:
+        return [analyze_sentiment(text) for text in texts]
+
+    keys = [cache_key(text, "", HF_CACHE_MODEL, casefold=False) for text in texts]
+    results: List[Optional[Dict[str, Any]]] = [sentiment_cache.get(key) for key in keys]
+    pending = [i for i, result in enumerate(results) if result is None]
+    if not pending:
+        return results
+    try:
+        outputs = classifier([texts[i] for i in pending], batch_size=len(pending))
+        for i, emotion_scores in zip(pending, outputs):
+            if isinstance(emotion_scores, dict):
+                emotion_scores = [emotion_scores]
+            result = _build_emotion_result(emotion_scores, 'huggingface_local')
+            sentiment_cache.put(keys[i], result)
+            results[i] = dict(result, cached=False)
+    except Exception as e:
+        print(f"HuggingFace batch processing error: {e}")
+        for i in pending:
+            results[i] = analyze_sentiment(texts[i])
+    return results
+
+
+def analyze_texts(texts: List[str]) -> List[Dict[str, Any]]:
+    """
+    Analyze a chunk of texts with the same backend as analyze_with_huggingface
+    
+    Uses one batched model call when the local model is loaded, otherwise
+    the remote API / TextBlob per text (both behind the sentiment cache).
+    
+    Args:
+        texts (list): Texts to analyze
+        
+    Returns:
+        list: Analysis results in the same order as `texts`
+    """
+    if local_model_enabled():
+        return classify_emotions_batch(texts)
+    return [analyze_with_huggingface(text) for text in texts]
+
+
+def _build_emotion_result(emotion_scores: List[Dict[str, Any]], source: str) -> Dict[str, Any]:
+    """Turn a list of {label, score} classifier outputs into a mood result."""
+    top_emotion = max(emotion_scores, key=lambda x: x['score'])
+    emotion_label = top_emotion['label']
+    mapped_mood, polarity = _map_emotion_to_mood_and_polarity(emotion_label)
+    return {
+        'mood': mapped_mood,
+        'polarity': polarity,
+        'emotion': emotion_label,
+        'emotion_score': top_emotion['score'],
+        'all_emotions': {item['label']: item['score'] for item in emotion_scores},
+        'source': source
+    }
+
+
 def _map_emotion_to_mood_and_polarity(emotion_label: str) -> Tuple[str, float]:
     """Helper to map an emotion label to (mood, polarity)."""
     mapped_mood = EMOTION_TO_MOOD_MAPPING.get(emotion_label, 'neutral')
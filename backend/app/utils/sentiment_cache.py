@@ -0,0 +1,312 @@
+"""
+Content-addressed cache for sentiment / emotion analysis results.
+
+Users submit the same short phrases ("tired", "so stressed about exam
+tomorrow") over and over. Results are keyed on a SHA-256 of the
+normalized text, language and the analyzer name/version. A
+repeated phrase then skips the transformer or TextBlob pass, and a
+model or rules upgrade naturally misses the old entries.
+
+Entries live in an in-process LRU bounded by SENTIMENT_CACHE_MAX_BYTES
+(approximate serialized size). If SENTIMENT_CACHE_PATH is set, results are
+also written to a local SQLite file so warm entries survive restarts:
+the most recently used rows that fit the byte budget are preloaded when
+the cache opens, and lookups never touch the disk. Writes are queued to a
+background writer thread, which commits them in batches and prunes the
+file every SENTIMENT_CACHE_PRUNE_INTERVAL_SECONDS: rows older than
+SENTIMENT_CACHE_MAX_AGE_DAYS go first, then the least recently used rows
+beyond SENTIMENT_CACHE_MAX_ROWS. A hit re-queues its row with a fresh
+updated_at (at most once per TOUCH_INTERVAL_SECONDS), so the file is
+pruned in LRU order. Hits are returned with `cached: True`.
+"""
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+SENTIMENT_CACHE_MAX_BYTES = int(os.getenv("SENTIMENT_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+SENTIMENT_CACHE_PATH = os.getenv("SENTIMENT_CACHE_PATH", "")
+SENTIMENT_CACHE_MAX_ROWS = int(os.getenv("SENTIMENT_CACHE_MAX_ROWS", "200000"))
+SENTIMENT_CACHE_MAX_AGE_DAYS = float(os.getenv("SENTIMENT_CACHE_MAX_AGE_DAYS", "30"))
+SENTIMENT_CACHE_PRUNE_INTERVAL_SECONDS = float(os.getenv("SENTIMENT_CACHE_PRUNE_INTERVAL_SECONDS", "300"))
+
+# Pending writes kept for the writer thread; more are dropped (memory still caches them)
+WRITE_QUEUE_SIZE = 10000
+# Most rows committed in one transaction
+WRITE_BATCH_SIZE = 500
+# Least time between two updated_at refreshes of a row that keeps being hit
+TOUCH_INTERVAL_SECONDS = 3600
+
+
+def normalize_text(text: str, casefold: bool = True) -> str:
+    """
+    Normalize text for cache keying (collapse whitespace, optionally casefold)
+
+    Args:
+        text (str): Raw text
+        casefold (bool): Whether case is irrelevant to the analyzer
+
+    Returns:
+        str: Normalized text
+    """
+    text = " ".join((text or "").split())
+    return text.casefold() if casefold else text
+
+
+def cache_key(text: str, language: str, model: str, casefold: bool = True) -> str:
+    """
+    Build the content address of an analysis result
+
+    Args:
+        text (str): Text analyzed
+        language (str): Language hint passed to the analyzer
+        model (str): Analyzer name and version (e.g. "textblob:0.19.0/rules:1")
+        casefold (bool): Whether case is irrelevant to the analyzer
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    payload = "\x00".join((model, language or "", normalize_text(text, casefold)))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SentimentCache:
+    """
+    Byte-bounded LRU of analysis results with an optional bounded SQLite store
+
+    Args:
+        max_bytes (int): Budget for cached values in memory (0 disables the cache)
+        path (str): SQLite file for persistence (empty for memory only)
+        max_rows (int): Most rows kept in the SQLite file
+        max_age_days (float): Age after which rows are deleted from the SQLite file
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = SENTIMENT_CACHE_MAX_BYTES,
+        path: str = SENTIMENT_CACHE_PATH,
+        max_rows: int = SENTIMENT_CACHE_MAX_ROWS,
+        max_age_days: float = SENTIMENT_CACHE_MAX_AGE_DAYS
+    ):
+        self.max_bytes = max_bytes
+        self.path = path
+        self.max_rows = max_rows
+        self.max_age_days = max_age_days
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._writes: "queue.Queue" = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        self._writer: Optional[threading.Thread] = None
+        self.hits = 0
+        self.preloaded = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_writes = 0
+        self.dropped_writes = 0
+        self.pruned_rows = 0
+        if path and max_bytes > 0:
+            self._open(path)
+
+    def _open(self, path: str) -> None:
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(path, isolation_level=None)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS sentiment_cache ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS sentiment_cache_updated_at ON sentiment_cache (updated_at)")
+                self._preload(conn)
+            finally:
+                conn.close()
+            print(f"Sentiment cache persisted to {path} ({self.preloaded} entries preloaded)")
+        except sqlite3.Error as e:
+            print(f"Sentiment cache persistence disabled ({path}): {e}")
+            return
+        self._writer = threading.Thread(target=self._write_loop, args=(path,), name="sentiment-cache-writer", daemon=True)
+        self._writer.start()
+
+    def _preload(self, conn: sqlite3.Connection) -> None:
+        """Load the most recently used rows that fit in max_bytes"""
+        rows, size = [], 0
+        cursor = conn.execute("SELECT key, value, updated_at FROM sentiment_cache ORDER BY updated_at DESC")
+        for key, encoded, updated_at in cursor:
+            size += len(key) + len(encoded)
+            if size > self.max_bytes:
+                break
+            rows.append((key, encoded, updated_at))
+        with self._lock:
+            # Oldest first, so the most recent rows end up most recently used
+            for key, encoded, updated_at in reversed(rows):
+                try:
+                    value = json.loads(encoded)
+                except ValueError:
+                    continue
+                self._store(key, value, len(key) + len(encoded), updated_at)
+                self.preloaded += 1
+
+    def _queue_write(self, key: str, value: Dict[str, Any], encoded: Optional[str] = None) -> None:
+        if encoded is None:
+            encoded = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        try:
+            self._writes.put_nowait((key, encoded, time.time()))
+        except queue.Full:
+            self.dropped_writes += 1
+
+    def _write_loop(self, path: str) -> None:
+        """Writer thread: commit queued rows in batches and prune the file"""
+        try:
+            conn = sqlite3.connect(path)
+        except sqlite3.Error as e:
+            print(f"Sentiment cache writer failed to start: {e}")
+            return
+        next_prune = 0.0
+        stopping = False
+        while not stopping:
+            batch = []
+            wait = next_prune - time.monotonic()
+            if wait > 0:
+                try:
+                    batch.append(self._writes.get(timeout=wait))
+                except queue.Empty:
+                    pass
+            while len(batch) < WRITE_BATCH_SIZE and not self._writes.empty():
+                batch.append(self._writes.get_nowait())
+            if None in batch:
+                # close() was called: write what is left, then stop
+                batch = [row for row in batch if row is not None]
+                stopping = True
+            try:
+                if batch:
+                    with conn:
+                        conn.executemany(
+                            "INSERT OR REPLACE INTO sentiment_cache (key, value, updated_at) VALUES (?, ?, ?)", batch
+                        )
+                    self.disk_writes += len(batch)
+                if time.monotonic() >= next_prune:
+                    self._prune(conn)
+                    next_prune = time.monotonic() + SENTIMENT_CACHE_PRUNE_INTERVAL_SECONDS
+            except sqlite3.Error as e:
+                print(f"Sentiment cache write failed: {e}")
+        conn.close()
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        """Delete expired rows, then the oldest rows beyond max_rows"""
+        with conn:
+            deleted = conn.execute(
+                "DELETE FROM sentiment_cache WHERE updated_at < ?",
+                (time.time() - self.max_age_days * 86400,),
+            ).rowcount
+            excess = conn.execute("SELECT COUNT(*) FROM sentiment_cache").fetchone()[0] - self.max_rows
+            if excess > 0:
+                deleted += conn.execute(
+                    "DELETE FROM sentiment_cache WHERE key IN "
+                    "(SELECT key FROM sentiment_cache ORDER BY updated_at LIMIT ?)",
+                    (excess,),
+                ).rowcount
+        self.pruned_rows += max(deleted, 0)
+
+    def _store(self, key: str, value: Dict[str, Any], size: int, written_at: float) -> None:
+        # Caller holds the lock; written_at is the row's updated_at on disk
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._entries[key] = (value, size, written_at)
+        self._bytes += size
+        while self._bytes > self.max_bytes and self._entries:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result
+
+        Args:
+            key (str): Key from cache_key()
+
+        Returns:
+            dict: Copy of the result marked `cached: True`, or None on a miss
+        """
+        if self.max_bytes <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value, size, written_at = entry
+            touch = self._writer is not None and time.time() - written_at >= TOUCH_INTERVAL_SECONDS
+            if touch:
+                self._entries[key] = (value, size, time.time())
+        if touch:
+            # Keep the row from being pruned as if it were unused
+            self._queue_write(key, value)
+        return dict(value, cached=True)
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """
+        Cache a freshly computed result
+
+        Args:
+            key (str): Key from cache_key()
+            result (dict): Analysis result (JSON-serializable)
+        """
+        if self.max_bytes <= 0:
+            return
+        value = {k: v for k, v in result.items() if k != "cached"}
+        try:
+            encoded = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            self._store(key, value, len(key) + len(encoded), time.time())
+        if self._writer is not None:
+            self._queue_write(key, value, encoded)
+
+    def clear(self) -> None:
+        """Drop all in-memory entries (the on-disk store is kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "persistent": self._writer is not None,
+            "hits": self.hits,
+            "preloaded": self.preloaded,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "evictions": self.evictions,
+            "disk_writes": self.disk_writes,
+            "pending_writes": self._writes.qsize(),
+            "dropped_writes": self.dropped_writes,
+            "pruned_rows": self.pruned_rows,
+        }
+
+    def close(self) -> None:
+        """Write out queued rows and close the on-disk store"""
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            self._writes.put(None)
+            writer.join(timeout=5)
+
+
+# Process-wide cache used by the sentiment analyzers
+sentiment_cache = SentimentCache()
@@ -0,0 +1,171 @@
+"""
+Subject lists for suggestions and task forms: default subjects plus a
+per-user overlay.
+
+The default subjects (one short list per category) are preloaded in
+memory. They are reloaded by Database.update_subjects and by the default
+data seeding, and in the background once they are older than
+SUBJECT_DEFAULTS_REFRESH_INTERVAL_SECONDS. Each user's custom subjects are
+cached per category in a bounded LRU. Database.create_user_subject,
+update_user_subject and delete_user_subject drop the user's entry, and
+entries expire after SUBJECT_CACHE_TTL_SECONDS so changes made by other
+workers are eventually seen.
+
+Merged lists are stable: defaults in catalog order, then the user's
+subjects in creation order, without duplicates.
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+SUBJECT_CACHE_TTL_SECONDS = float(os.getenv("SUBJECT_CACHE_TTL_SECONDS", "300"))
+SUBJECT_CACHE_MAX_USERS = int(os.getenv("SUBJECT_CACHE_MAX_USERS", "10000"))
+SUBJECT_DEFAULTS_REFRESH_INTERVAL_SECONDS = float(os.getenv("SUBJECT_DEFAULTS_REFRESH_INTERVAL_SECONDS", "60"))
+
+
+def merge_subjects(default_subjects, user_subjects) -> List[str]:
+    """
+    Defaults first, then user subjects, dropping duplicates and blanks
+
+    Args:
+        default_subjects (iterable): Default subjects of a category
+        user_subjects (iterable): The user's custom subjects of that category
+
+    Returns:
+        list: Merged subjects in stable order
+    """
+    merged = [*default_subjects, *user_subjects]
+    return list(dict.fromkeys(subject for subject in merged if subject))
+
+
+class SubjectCatalog:
+    """
+    Default subjects in memory with a per-user LRU/TTL overlay cache
+
+    Args:
+        defaults_loader: async callable returning category -> default subjects
+        user_loader: async callable(user_id, category) returning the user's subject names
+        max_users (int): Maximum number of users with cached subjects
+        ttl_seconds (float): Maximum age of a user's cached subjects
+        refresh_interval (float): Seconds after which the defaults are reloaded in the background
+    """
+
+    def __init__(
+        self,
+        defaults_loader: Callable[[], Awaitable[Dict[str, List[str]]]],
+        user_loader: Callable[[str, str], Awaitable[List[str]]],
+        max_users: int = SUBJECT_CACHE_MAX_USERS,
+        ttl_seconds: float = SUBJECT_CACHE_TTL_SECONDS,
+        refresh_interval: float = SUBJECT_DEFAULTS_REFRESH_INTERVAL_SECONDS
+    ):
+        self._defaults_loader = defaults_loader
+        self._user_loader = user_loader
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self.refresh_interval = refresh_interval
+        self._defaults: Optional[Dict[str, Tuple[str, ...]]] = None
+        self._defaults_loaded_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+        # user_id -> category -> (loaded_at, subjects)
+        self._users: "OrderedDict[str, Dict[str, Tuple[float, Tuple[str, ...]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.default_loads = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    async def refresh_defaults(self) -> None:
+        """Reload the default subjects"""
+        try:
+            defaults = await self._defaults_loader()
+        except Exception as e:
+            # Keep serving the last good defaults
+            print(f"Error loading default subjects: {str(e)}")
+            self._defaults_loaded_at = time.monotonic()
+            return
+        self._defaults = {category: tuple(subjects or ()) for category, subjects in defaults.items()}
+        self._defaults_loaded_at = time.monotonic()
+        self.default_loads += 1
+
+    async def _default_subjects(self, category: str) -> Tuple[str, ...]:
+        if self._defaults is None:
+            await self.refresh_defaults()
+        elif time.monotonic() - self._defaults_loaded_at >= self.refresh_interval:
+            if self._refresh_task is None or self._refresh_task.done():
+                self._refresh_task = asyncio.create_task(self.refresh_defaults())
+        return (self._defaults or {}).get(category, ())
+
+    def _cached(self, user_id: str, category: str) -> Optional[Tuple[str, ...]]:
+        with self._lock:
+            entry = self._users.get(user_id, {}).get(category)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            self._users.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def _store(self, user_id: str, category: str, subjects: Tuple[str, ...]) -> None:
+        if self.max_users <= 0:
+            return
+        with self._lock:
+            self._users.setdefault(user_id, {})[category] = (time.monotonic(), subjects)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+                self.evictions += 1
+
+    async def get(self, category: str, user_id: Optional[str] = None) -> List[str]:
+        """
+        Subjects of a category, merged with the user's custom subjects
+
+        Args:
+            category (str): Category name
+            user_id (str, optional): User whose custom subjects to include
+
+        Returns:
+            list: Subjects in stable order
+        """
+        default_subjects = await self._default_subjects(category)
+        if not user_id:
+            return list(default_subjects)
+        user_subjects = self._cached(user_id, category)
+        if user_subjects is None:
+            try:
+                user_subjects = tuple(await self._user_loader(user_id, category))
+            except Exception as e:
+                print(f"Error getting user subjects: {str(e)}")
+                return merge_subjects(default_subjects, ())
+            self._store(user_id, category, user_subjects)
+        return merge_subjects(default_subjects, user_subjects)
+
+    def invalidate(self, user_id: str) -> None:
+        """
+        Drop a user's cached subjects (all categories)
+
+        Args:
+            user_id (str): User ID
+        """
+        with self._lock:
+            if self._users.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters"""
+        lookups = self.hits + self.misses
+        return {
+            "default_categories": len(self._defaults or {}),
+            "default_loads": self.default_loads,
+            "users": len(self._users),
+            "max_users": self.max_users,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,165 @@
+"""
+In-memory catalog of mood/category suggestions.
+
+The whole (mood x category) suggestion matrix is small, so it is loaded
+once and every lookup is answered from memory with its fallback chain
+already resolved (exact mood, similar moods, neutral, generic). The
+catalog is reloaded by Database.update_suggestions and by the default data
+seeding. When a lookup finds the snapshot older than
+SUGGESTIONS_REFRESH_INTERVAL_SECONDS, it starts a background reload and
+still serves the current snapshot, so edits made by other worker
+processes are eventually picked up without a request ever waiting on the
+database.
+"""
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+SUGGESTIONS_REFRESH_INTERVAL_SECONDS = float(os.getenv("SUGGESTIONS_REFRESH_INTERVAL_SECONDS", "60"))
+
+# Moods tried (in order) when a mood has no suggestions for a category
+SIMILAR_MOODS = {
+    "happy": ["content", "neutral"],
+    "content": ["happy", "neutral"],
+    "neutral": ["content", "happy"],
+    "sad": ["very_sad", "tired"],
+    "very_sad": ["sad", "tired"],
+    "tired": ["lazy", "neutral"],
+    "lazy": ["tired", "neutral"],
+    "stressed": ["tired", "angry"],
+    "angry": ["stressed", "neutral"]
+}
+
+GENERIC_SUGGESTIONS = (
+    "Let's take a small step forward today.",
+    "Break tasks into smaller, manageable parts.",
+    "Try focusing for just 10 minutes to start.",
+    "Remember your why - what motivates you?"
+)
+
+Matrix = Dict[str, Dict[str, List[str]]]
+
+
+def resolve(matrix: Matrix, mood: str, category: str) -> Tuple[str, ...]:
+    """
+    Apply the fallback chain for one mood and category
+
+    Exact mood, then similar moods (neutral for unknown moods), then the
+    neutral entry even if it is empty, then the generic suggestions.
+
+    Args:
+        matrix (dict): mood -> category -> suggestions
+        mood (str): Requested mood
+        category (str): Requested category
+
+    Returns:
+        tuple: Suggestions
+    """
+    for candidate in [mood] + SIMILAR_MOODS.get(mood, ["neutral"]):
+        suggestions = matrix.get(candidate, {}).get(category)
+        if suggestions:
+            return tuple(suggestions)
+    neutral = matrix.get("neutral", {})
+    if category in neutral:
+        return tuple(neutral[category] or ())
+    return GENERIC_SUGGESTIONS
+
+
+class _SuggestionIndex:
+    """Immutable snapshot of the matrix with every fallback chain resolved"""
+
+    def __init__(self, matrix: Matrix):
+        self.matrix = {mood: dict(by_category) for mood, by_category in matrix.items()}
+        moods = set(self.matrix) | set(SIMILAR_MOODS)
+        categories = {category for by_category in self.matrix.values() for category in by_category}
+        self.by_key: Dict[Tuple[str, str], Tuple[str, ...]] = {
+            (mood, category): resolve(self.matrix, mood, category)
+            for mood in moods for category in categories
+        }
+        # Any mood outside SIMILAR_MOODS and the matrix falls back the same way
+        self.unknown_mood = {category: resolve(self.matrix, "", category) for category in categories}
+        self.count = sum(len(v) for by_category in self.matrix.values() for v in by_category.values())
+
+    def lookup(self, mood: str, category: str) -> Tuple[str, ...]:
+        found = self.by_key.get((mood, category))
+        if found is not None:
+            return found
+        return self.unknown_mood.get(category, GENERIC_SUGGESTIONS)
+
+
+class SuggestionCatalog:
+    """
+    Suggestion matrix preloaded in memory with resolved fallbacks
+
+    Args:
+        loader: async callable returning the matrix (mood -> category -> suggestions)
+        refresh_interval (float): Seconds after which a lookup triggers a background reload
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Awaitable[Matrix]],
+        refresh_interval: float = SUGGESTIONS_REFRESH_INTERVAL_SECONDS
+    ):
+        self._loader = loader
+        self.refresh_interval = refresh_interval
+        self._index: Optional[_SuggestionIndex] = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.loads = 0
+        self.load_errors = 0
+        self.lookups = 0
+
+    async def refresh(self) -> None:
+        """Reload the matrix and rebuild the resolved lookups"""
+        async with self._lock:
+            try:
+                index = _SuggestionIndex(await self._loader())
+            except Exception as e:
+                # Keep serving the last good snapshot
+                print(f"Error loading suggestion catalog: {str(e)}")
+                self.load_errors += 1
+                self._loaded_at = time.monotonic()
+                return
+            self._index = index
+            self._loaded_at = time.monotonic()
+            self.loads += 1
+
+    def _refresh_in_background(self) -> None:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.refresh())
+
+    async def get(self, mood: str, category: str) -> List[str]:
+        """
+        Suggestions for a mood and category, with fallbacks applied
+
+        Args:
+            mood (str): Mood to get suggestions for
+            category (str): Category to get suggestions for
+
+        Returns:
+            list: Suggestions
+        """
+        if self._index is None:
+            await self.refresh()
+        elif time.monotonic() - self._loaded_at >= self.refresh_interval:
+            self._refresh_in_background()
+        self.lookups += 1
+        index = self._index
+        return list(index.lookup(mood, category) if index is not None else GENERIC_SUGGESTIONS)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return load counters"""
+        index = self._index
+        return {
+            "moods": len(index.matrix) if index is not None else 0,
+            "suggestions": index.count if index is not None else 0,
+            "resolved_pairs": len(index.by_key) if index is not None else 0,
+            "loads": self.loads,
+            "load_errors": self.load_errors,
+            "lookups": self.lookups,
+            "refresh_interval_seconds": self.refresh_interval,
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+        }
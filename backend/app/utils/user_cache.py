@@ -0,0 +1,111 @@
+"""
+Process-wide cache of authenticated user records.
+
+get_current_user runs on every authenticated request. Caching the user
+document by id saves a database round trip on almost every request.
+Entries expire after USER_CACHE_TTL_SECONDS (the maximum staleness
+tolerated for changes made by other workers). They are invalidated
+explicitly whenever a user is updated through this process.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+
+
+class UserCache:
+    """
+    Bounded LRU cache with per-entry TTL
+
+    Args:
+        max_entries (int): Maximum number of cached users
+        ttl_seconds (float): Maximum age of an entry before it is refetched
+    """
+
+    def __init__(self, max_entries: int = USER_CACHE_MAX_ENTRIES, ttl_seconds: float = USER_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached user
+
+        Args:
+            user_id (str): User ID
+
+        Returns:
+            dict: User data or None on a miss / expired entry
+        """
+        if self.max_entries <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user_id: str, user: Dict[str, Any]) -> None:
+        """
+        Cache a user record
+
+        Args:
+            user_id (str): User ID
+            user (dict): User data
+        """
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (time.monotonic(), dict(user))
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: str) -> None:
+        """
+        Drop a user from the cache
+
+        Args:
+            user_id (str): User ID
+        """
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop all cached users"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+# Process-wide cache used by get_current_user
+user_cache = UserCache()
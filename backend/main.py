@@ -3,7 +3,6 @@ from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 import os
 from dotenv import load_dotenv
-from datetime import datetime, timedelta
 import asyncio
 
 # Load environment variables
@@ -37,6 +36,16 @@ app.add_middleware(
 # Import routes
 from app.routes import mood, quote, planner, history, auth, plans, moods, suggestions, user_subjects, decision, peerpulse
 from app.utils.database import db
+from app.utils.indexes import check_queries, index_report
+from app.utils.scheduler import plan_scheduler
+from app.utils.user_cache import user_cache
+from app.utils.security import password_hasher
+from app.utils.inference_batcher import emotion_batcher
+from app.utils.sentiment_cache import sentiment_cache
+from app.utils.decision import decision_surface
+from app.utils.response_picker import quote_catalog
+from app.utils.quote_rotation import quote_rotation
+from app.utils.pulse_counters import pulse_counters
 
 # Include routers
 app.include_router(auth.router)
@@ -57,136 +66,51 @@ async def initialize_default_data():
     """
     Initialize default data (quotes, suggestions, subjects, users) during application startup
     """
+    # Verify the MongoDB connection and warm its pool (falls back to
+    # in-memory storage unless MONGO_REQUIRED is set)
+    await db.connect()
+
     print("Initializing default data during startup...")
-    success = insert_all_defaults()
+    success = await insert_all_defaults()
     if success:
         print("Default data initialized successfully.")
         print("Default users available: khushi@example.com, jayesh@example.com, sangita@example.com, amit@example.com (password: password123)")
     else:
         print("Warning: Some default data could not be initialized.")
 
-    # Start background auto-rescheduler
-    async def auto_rescheduler_loop():
-        while True:
-            try:
-                now = datetime.now()
-                # Determine current HH:MM to compare with scheduled_time
-                current_hm = f"{now.hour:02d}:{now.minute:02d}"
-                # Fetch all plans for all users (Mongo path); for in-memory, iterate values
-                plans_to_check = []
-                if db.is_connected():
-                    # Pull pending/in_progress/snoozed plans scheduled before now; conservative: get all and filter
-                    plans_raw = list(db.plans.find({}))
-                    for p in plans_raw:
-                        p['id'] = str(p.get('_id')) if p.get('_id') else p.get('id')
-                        plans_to_check.append(p)
-                else:
-                    for _uid, plist in db.plans.items():
-                        plans_to_check.extend(plist)
-
-                for p in plans_to_check:
-                    status = p.get('status')
-                    st = p.get('scheduled_time')
-                    if not st or status in ('completed', 'cancelled'):
-                        continue
-                    st_str = st if isinstance(st, str) else None
-                    if not st_str:
-                        continue
-                    # If scheduled time is earlier than current minute and still not completed, mark missed
-                    try:
-                        # Compare HH:MM lexicographically since both 24h strings
-                        if st_str < current_hm and status in ('pending', 'snoozed'):
-                            # Auto-reschedule this task to a future time today and make it lighter
-                            new_duration = max(10, int((p.get('duration_minutes') or 20) * 0.75))
-                            # Move to 60 minutes from now (rounded to next 5 minutes)
-                            new_dt = now + timedelta(minutes=60)
-                            # Round up to the next 5-minute boundary
-                            rounded_minute = ((new_dt.minute + 4) // 5) * 5
-                            if rounded_minute == 60:
-                                new_dt = new_dt.replace(hour=(new_dt.hour + 1) % 24, minute=0)
-                            else:
-                                new_dt = new_dt.replace(minute=rounded_minute)
-                            new_st = f"{new_dt.hour:02d}:{new_dt.minute:02d}"
-                            
-                            # Check for time conflicts
-                            user_id = p.get('user_id')
-                            conflict_found = False
-                            
-                            if user_id:
-                                # Parse new start and end times for comparison
-                                def parse_hhmm_to_minutes(value) -> int | None:
-                                    try:
-                                        if value is None:
-                                            return None
-                                        if isinstance(value, str):
-                                            hh, mm = value.split(":")[:2]
-                                            return int(hh) * 60 + int(mm)
-                                    except Exception:
-                                        return None
-                                    return None
-                                
-                                new_start = parse_hhmm_to_minutes(new_st)
-                                new_end = (new_start + new_duration) if new_start is not None and new_duration > 0 else None
-                                
-                                # Get other plans for this user
-                                other_plans = []
-                                if db.is_connected():
-                                    other_plans = list(db.plans.find({"user_id": user_id}))
-                                else:
-                                    other_plans = db.get_user_plans(user_id)
-                                
-                                # Check for conflicts
-                                for op in other_plans:
-                                    # Skip the current plan being rescheduled
-                                    if str(op.get('_id', '')) == str(p.get('_id', '')) or op.get('id') == p.get('id'):
-                                        continue
-                                        
-                                    # Skip completed or cancelled plans
-                                    if op.get('status') in ('completed', 'cancelled'):
-                                        continue
-                                        
-                                    op_start = parse_hhmm_to_minutes(op.get("scheduled_time"))
-                                    op_dur = int(op.get("duration_minutes") or 0)
-                                    op_end = (op_start + op_dur) if op_start is not None and op_dur > 0 else None
-                                    
-                                    if op_start is None or op_end is None or new_start is None or new_end is None:
-                                        continue
-                                        
-                                    # Check for overlap
-                                    if new_start < op_end and op_start < new_end:
-                                        # Found conflict - push forward by op_dur minutes
-                                        conflict_found = True
-                                        # Add the conflicting task's duration + 5 min buffer
-                                        new_dt = new_dt + timedelta(minutes=op_dur + 5)
-                                        # Recalculate scheduled time
-                                        new_st = f"{new_dt.hour:02d}:{new_dt.minute:02d}"
-                                        # Update new_start and new_end for next iteration
-                                        new_start = parse_hhmm_to_minutes(new_st)
-                                        new_end = (new_start + new_duration) if new_start is not None and new_duration > 0 else None
-                                
-                            # Update existing plan instead of creating a new one (avoids duplicates)
-                            update = {
-                                'status': 'pending',
-                                'scheduled_time': new_st,
-                                'duration_minutes': new_duration,
-                                'auto_rescheduled': True,
-                                'conflict_resolved': conflict_found,  # Mark if we had to resolve conflicts
-                            }
-                            plan_id = p.get('id') or (str(p.get('_id')) if p.get('_id') else None)
-                            if plan_id:
-                                db.update_plan(plan_id, update)
-                    except Exception:
-                        continue
-            except Exception:
-                pass
-            # Run roughly every 5 minutes
-            await asyncio.sleep(300)
-
-    # Fire-and-forget background task
+    # Start background auto-rescheduler (event-driven, see app/utils/scheduler.py)
+    try:
+        await plan_scheduler.rebuild()
+        asyncio.create_task(plan_scheduler.run())
+    except Exception as e:
+        print(f'Failed to start auto-rescheduler: {e}')
+
+    # Load the peer pulse minute counters and keep them synced with MongoDB
+    try:
+        await pulse_counters.rebuild()
+    except Exception as e:
+        print(f'Failed to load peer pulse counters: {e}')
+    # Flush even if the load failed, or this worker's pulses never reach the others
+    if db.is_connected():
+        asyncio.create_task(pulse_counters.run())
+
+    # Load or precompute the fuzzy decision surface off the event loop
+    decision_surface.start_background_build()
+
+@app.on_event("shutdown")
+async def shutdown_workers():
+    """
+    Stop background worker pools and close the database client on application shutdown
+    """
+    password_hasher.shutdown()
+    emotion_batcher.shutdown()
+    sentiment_cache.close()
+    await peerpulse.pulse_broadcaster.close()
     try:
-        asyncio.create_task(auto_rescheduler_loop())
-    except Exception as _:
-        print('Failed to start auto-rescheduler loop')
+        await pulse_counters.flush()
+    except Exception as e:
+        print(f'Peer pulse counter flush failed: {e}')
+    await db.close()
 
 @app.get("/")
 async def root():
@@ -198,11 +122,51 @@ async def reinitialize_data():
     Manually reinitialize the database with default data (quotes, suggestions, subjects, users)
     This endpoint is for administrative use only and not meant to be public.
     """
-    success = insert_all_defaults()
+    success = await insert_all_defaults()
+    # Seeded plans and pulses bypass their routes, so re-read the queue and counters
+    await plan_scheduler.rebuild()
+    await pulse_counters.rebuild()
     if success:
         return {
             "message": "Default data reinitialized successfully",
             "note": "Default users available: khushi@example.com, jayesh@example.com, sangita@example.com, amit@example.com (password: password123)"
         }
     else:
-        return {"message": "Error reinitializing some default data", "success": False}
\ No newline at end of file
+        return {"message": "Error reinitializing some default data", "success": False}
+
+@app.get("/_admin/indexes")
+async def get_index_report():
+    """
+    Report missing, unregistered and unused MongoDB indexes and the
+    registered query shapes that would scan a whole collection.
+    This endpoint is for administrative use only and not meant to be public.
+    """
+    if not db.is_connected():
+        return {"connected": False}
+    report = await index_report(db.db)
+    report["collection_scans"] = await check_queries(db.db)
+    return {"connected": True, **report}
+
+@app.get("/_admin/metrics")
+async def get_metrics():
+    """
+    Report in-process cache, scheduler and connection pool counters.
+    This endpoint is for administrative use only and not meant to be public.
+    """
+    return {
+        "user_cache": user_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "emotion_batcher": emotion_batcher.stats(),
+        "sentiment_cache": sentiment_cache.stats(),
+        "decision_surface": decision_surface.stats(),
+        "quote_catalog": quote_catalog.stats(),
+        "quote_rotation": quote_rotation.stats(),
+        "suggestion_catalog": db.suggestion_catalog.stats(),
+        "subject_catalog": db.subject_catalog.stats(),
+        "peer_pulse_counters": pulse_counters.stats(),
+        "peer_pulse_rate_limiter": peerpulse.pulse_rate_limiter.stats(),
+        "peer_pulse_stream": peerpulse.pulse_broadcaster.stats(),
+        "plan_scheduler": {"queued": len(plan_scheduler), "fired": plan_scheduler.fired_count},
+        "plan_conflict_index": db.plan_index.stats(),
+        "mongo_pool": db.pool_metrics(),
+    }
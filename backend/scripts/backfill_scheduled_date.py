@@ -2,24 +2,29 @@
 Usage: run within project venv: python -m backend.scripts.backfill_scheduled_date
 Logic: If scheduled_date missing, derive from created_at (date part) else today.
 """
+import asyncio
 from datetime import datetime, date
 from app.utils.database import db
 
-def backfill():
-    if not db.is_connected():
+async def backfill():
+    if not await db.connect():
         print("Mongo not connected; in-memory mode—nothing to backfill persistently.")
         return
     modified = 0
     cursor = db.plans.find({ 'scheduled_date': { '$exists': False } })
-    for doc in cursor:
+    async for doc in cursor:
         created = doc.get('created_at')
         if isinstance(created, datetime):
             sched_date = created.date().isoformat()
         else:
             sched_date = date.today().isoformat()
-        db.plans.update_one({'_id': doc['_id']}, { '$set': { 'scheduled_date': sched_date } })
+        await db.plans.update_one({'_id': doc['_id']}, { '$set': { 'scheduled_date': sched_date } })
         modified += 1
     print(f"Backfill complete. Updated {modified} documents.")
+    if modified:
+        # Backfilled plans now belong to a calendar day
+        await db.rebuild_plan_rollups()
+    await db.close()
 
 if __name__ == '__main__':
-    backfill()
\ No newline at end of file
+    asyncio.run(backfill())
\ No newline at end of file
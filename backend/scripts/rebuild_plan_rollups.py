@@ -0,0 +1,18 @@
+"""Recompute the per-day plan rollups (plan_daily_rollups) from the plans collection.
+Usage: run within project venv: python -m backend.scripts.rebuild_plan_rollups [user_id]
+Run after editing plans outside the API, or if the counters ever drift.
+"""
+import asyncio
+import sys
+from app.utils.database import db
+
+async def rebuild(user_id=None):
+    if not await db.connect():
+        print("Mongo not connected; in-memory mode—nothing to rebuild persistently.")
+        return
+    count = await db.rebuild_plan_rollups(user_id)
+    print(f"Rebuild complete. Wrote {count} daily rollups.")
+    await db.close()
+
+if __name__ == '__main__':
+    asyncio.run(rebuild(sys.argv[1] if len(sys.argv) > 1 else None))
@@ -7,7 +7,7 @@ export {
   getCurrentUser,
   logout,
   createPlan,
-  getUserPlans,
+  getAllUserPlans as getUserPlans,
   getPlanById,
   updatePlan,
   deletePlan,
@@ -161,21 +161,56 @@ export const createPlan = async (planData) => {
   }
 };
 
-export const getUserPlans = async (category = null, status = null) => {
+// One page of plans; pass the returned next_cursor as options.cursor for the next one
+export const getPlansPage = async (category = null, status = null, options = {}) => {
+  const params = new URLSearchParams();
+  if (category) params.append('category', category);
+  if (status) params.append('status', status);
+  if (options.fromDate) params.append('from_date', options.fromDate);
+  if (options.toDate) params.append('to_date', options.toDate);
+  if (options.limit) params.append('limit', options.limit);
+  if (options.cursor) params.append('cursor', options.cursor);
+  if (options.fields) params.append('fields', options.fields);
+  if (options.order) params.append('order', options.order);
+  const qs = params.toString() ? `?${params.toString()}` : '';
+  const response = await apiClient.get(`/plans${qs}`);
+  return response.data;
+};
+
+// Every plan matching the filters (follows next_cursor across pages).
+// Without date bounds this is the user's full history; prefer getDayPlans or getPlansPage.
+export const getAllUserPlans = async (category = null, status = null, options = {}) => {
   try {
-    let url = '/plans';
-    const params = new URLSearchParams();
-    if (category) params.append('category', category);
-    if (status) params.append('status', status);
-    if (params.toString()) url += `?${params.toString()}`;
-    const response = await apiClient.get(url);
-    return response.data;
+    const plans = [];
+    let cursor = null;
+    do {
+      const page = await getPlansPage(category, status, { ...options, cursor });
+      plans.push(...(page.plans || []));
+      cursor = page.next_cursor;
+    } while (cursor);
+    return { plans, count: plans.length, next_cursor: null };
   } catch (error) {
     console.error('Error getting plans:', error);
     throw error;
   }
 };
 
+// Local YYYY-MM-DD of today (plans are scheduled per calendar day)
+export const todayISODate = () => {
+  const d = new Date();
+  return `${d.getFullYear()}-${String(d.getMonth() + 1).padStart(2, '0')}-${String(d.getDate()).padStart(2, '0')}`;
+};
+
+// One day's plans (default today)
+export const getDayPlans = (day = null, options = {}) => getAllUserPlans(null, null, {
+  ...options,
+  fromDate: day || todayISODate(),
+  toDate: day || todayISODate(),
+});
+
+// One day's plans (default today) with just the fields needed for time-conflict checks
+export const getDayPlanSlots = (day = null) => getDayPlans(day, { fields: 'status,duration_minutes' });
+
 export const getPlanById = async (planId) => {
   try {
     const response = await apiClient.get(`/plans/${planId}`);
@@ -241,6 +276,25 @@ export const getPeerPulse = async (windowMinutes=30) => {
   }
 };
 
+// Live peer pulse over server-sent events; returns an unsubscribe function,
+// or null when the browser has no EventSource (callers then poll getPeerPulse)
+export const subscribePeerPulse = (windowMinutes=30, onData, onError) => {
+  if (typeof window === 'undefined' || !window.EventSource) return null;
+  const source = new EventSource(`${apiClient.defaults.baseURL}/peerpulse/stream?window_minutes=${windowMinutes}`);
+  source.addEventListener('pulse', (event) => {
+    try {
+      onData(JSON.parse(event.data));
+    } catch (e) {
+      console.error('Peer pulse stream parse failed', e);
+    }
+  });
+  source.onerror = (e) => {
+    // EventSource reconnects by itself unless the server refused the stream
+    if (source.readyState === EventSource.CLOSED && onError) onError(e);
+  };
+  return () => source.close();
+};
+
 export const setPlanReminder = async (planId, leadMinutes) => {
   try {
     const response = await apiClient.post(`/plans/${planId}/reminder`, null, { params: { lead_minutes: leadMinutes } });
@@ -290,7 +344,7 @@ export const fetchMoodHistory = async (limit = 30, moodType = null) => {
     if (moodType) params.append('mood_type', moodType);
     const qs = params.toString() ? `?${params.toString()}` : '';
     const response = await apiClient.get(`/moods/${qs}`);
-    return response.data; // { moods: [...], count }
+    return response.data; // { moods: [...], count, next_cursor }
   } catch (error) {
     console.error('Error fetching mood history:', error);
     // Return empty data instead of throwing error
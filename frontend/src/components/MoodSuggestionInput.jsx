@@ -2,7 +2,7 @@ import { useState, useEffect } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import MoodBadge from './MoodBadge';
 import SubjectSelector from './SubjectSelector';
-import { analyzeUserMood, trackMood, getMotivationalQuote, getPersonalizedPlan, getSubjectsByCategory, getUserPlans, createPlan, updatePlan } from '../api';
+import { analyzeUserMood, trackMood, getMotivationalQuote, getPersonalizedPlan, getSubjectsByCategory, getDayPlanSlots, createPlan, updatePlan } from '../api';
 import { hasOverlap as utilHasOverlap, computeNextFree as utilComputeNextFree, computeChainShifts, applyChainShifts } from '../utils/timeConflicts';
 import { createUserSubject } from '../api/userSubjects';
 import toast from 'react-hot-toast';
@@ -131,7 +131,7 @@ const MoodSuggestionInput = ({ onComplete, language = 'english', userId }) => {
   const hasLocalTimeConflict = async (proposedStartTime, duration) => {
     if (!proposedStartTime) return false;
     try {
-      const res = await getUserPlans();
+      const res = await getDayPlanSlots();
       return utilHasOverlap(res?.plans || [], proposedStartTime, duration);
     } catch { return false; }
   };
@@ -140,7 +140,7 @@ const MoodSuggestionInput = ({ onComplete, language = 'english', userId }) => {
   const computeNextFreeStart = async (desiredStart, duration) => {
     if (!desiredStart) return '';
     try {
-      const res = await getUserPlans();
+      const res = await getDayPlanSlots();
       return utilComputeNextFree(res?.plans || [], desiredStart, duration);
     } catch { return ''; }
   };
@@ -247,7 +247,7 @@ const MoodSuggestionInput = ({ onComplete, language = 'english', userId }) => {
       if (conflict) {
         // Offer auto-chain shift
         try {
-          const res = await getUserPlans();
+          const res = await getDayPlanSlots();
           const shifts = computeChainShifts(res?.plans || [], planData.scheduled_time, planData.duration_minutes);
           if (shifts.length > 0) {
             const confirmChain = window.confirm(`Time conflict. Auto-shift ${shifts.length} subsequent task(s)?`);
@@ -1,28 +1,42 @@
 import { useEffect, useState } from 'react';
 import { motion } from 'framer-motion';
-import { getPeerPulse } from '../api';
+import { getPeerPulse, subscribePeerPulse } from '../api';
 
 const PeerPulseWidget = ({ refreshMs = 30000, windowMinutes=30, hidden=false }) => {
   const [stats, setStats] = useState(null);
   const [top, setTop] = useState(null);
   const [loading, setLoading] = useState(true);
 
+  const applyStats = (data) => {
+    setStats(data);
+    if (data?.distribution) {
+      const entries = Object.entries(data.distribution).sort((a,b)=>b[1]-a[1]);
+      setTop(entries[0] || null);
+    }
+    setLoading(false);
+  };
+
   const fetchStats = async () => {
     try {
-      const data = await getPeerPulse(windowMinutes);
-      setStats(data);
-      if (data?.distribution) {
-        const entries = Object.entries(data.distribution).sort((a,b)=>b[1]-a[1]);
-        setTop(entries[0] || null);
-      }
+      applyStats(await getPeerPulse(windowMinutes));
     } catch (_) { /* silent */ } finally { setLoading(false); }
   };
 
   useEffect(()=>{
     if (hidden) return; // do not fetch if widget hidden
-    fetchStats();
-    const id = setInterval(fetchStats, refreshMs);
-    return ()=> clearInterval(id);
+    let pollId = null;
+    const startPolling = () => {
+      if (pollId) return;
+      fetchStats();
+      pollId = setInterval(fetchStats, refreshMs);
+    };
+    // Prefer the live stream; fall back to polling when it is unavailable
+    const unsubscribe = subscribePeerPulse(windowMinutes, applyStats, startPolling);
+    if (!unsubscribe) startPolling();
+    return ()=> {
+      if (unsubscribe) unsubscribe();
+      if (pollId) clearInterval(pollId);
+    };
   },[hidden, windowMinutes]);
 
   if (hidden) return null;
@@ -3,7 +3,7 @@ import { motion } from 'framer-motion';
 import SubjectSelector from './SubjectSelector';
 import { createUserSubject } from '../api/userSubjects';
 import toast from 'react-hot-toast';
-import { getUserPlans } from '../api';
+import { getDayPlanSlots } from '../api';
 import { hasOverlap as utilHasOverlap, computeNextFree as utilComputeNextFree, parseTimeToMinutes, minutesToHHMM } from '../utils/timeConflicts';
 import { STRINGS } from '../i18n/strings';
 
@@ -54,7 +54,7 @@ const TaskForm = ({
       const startMinutes = parseTimeToMinutes(start);
       if (active) setPastTime(startMinutes != null && startMinutes < nowMinutes);
       try {
-        const res = await getUserPlans();
+        const res = await getDayPlanSlots();
         const plans = res?.plans || [];
         const conflict = utilHasOverlap(plans, start, task.duration_minutes || 0);
         if (!active) return;
@@ -1,6 +1,6 @@
 import { useState } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
-import { updatePlan, deletePlan, snoozePlan, setPlanReminder, getUserPlans } from '../api';
+import { updatePlan, deletePlan, snoozePlan, setPlanReminder, getDayPlanSlots } from '../api';
 import { hasOverlap as utilHasOverlap, computeNextFree as utilComputeNextFree, computeChainShifts, applyChainShifts } from '../utils/timeConflicts';
 import toast from 'react-hot-toast';
 import { FaCheck, FaRegClock, FaPencilAlt, FaTrash, FaPlay, FaClock, FaSave, FaTimes, FaExclamationTriangle, FaCalendarAlt, FaLayerGroup } from 'react-icons/fa';
@@ -151,19 +151,19 @@ const TaskList = ({ tasks, refreshTasks, language = 'english' }) => {
   };
   
   // Save task changes
-  const hasLocalConflict = async (candidateTime, duration, taskId) => {
+  const hasLocalConflict = async (candidateTime, duration, taskId, day = null) => {
     if (!candidateTime) return false;
     try {
-      const res = await getUserPlans();
+      const res = await getDayPlanSlots(day);
       const filtered = (res?.plans||[]).filter(p => p.id !== taskId);
       return utilHasOverlap(filtered, candidateTime, duration);
     } catch { return false; }
   };
 
-  const computeNextFree = async (candidateTime, duration, taskId) => {
+  const computeNextFree = async (candidateTime, duration, taskId, day = null) => {
     if (!candidateTime) return '';
     try {
-      const res = await getUserPlans();
+      const res = await getDayPlanSlots(day);
       const filtered = (res?.plans||[]).filter(p => p.id !== taskId);
       return utilComputeNextFree(filtered, candidateTime, duration);
     } catch { return ''; }
@@ -478,10 +478,10 @@ const TaskList = ({ tasks, refreshTasks, language = 'english' }) => {
                           const updated = { ...editingTask, scheduled_time: v };
                           setEditingTask(updated);
                           if (v) {
-                            const conflict = await hasLocalConflict(v, updated.duration_minutes || 30, updated.id);
+                            const conflict = await hasLocalConflict(v, updated.duration_minutes || 30, updated.id, updated.scheduled_date);
                             setEditConflict(conflict);
                             if (conflict) {
-                              const nextFree = await computeNextFree(v, updated.duration_minutes || 30, updated.id);
+                              const nextFree = await computeNextFree(v, updated.duration_minutes || 30, updated.id, updated.scheduled_date);
                               setEditSuggested(nextFree);
                             } else {
                               setEditSuggested('');
@@ -9,7 +9,7 @@ import CustomSubjectForm from '../components/CustomSubjectForm';
 import TaskForm from '../components/TaskForm';
 import { useUser } from '../context/UserContext';
 import { AuthContext } from '../context/AuthContext';
-import { apiClient, createPlan, getUserPlans, updatePlan } from '../api';
+import { apiClient, createPlan, getDayPlans, getDayPlanSlots, updatePlan } from '../api';
 import { hasOverlap as utilHasOverlap, computeNextFree as utilComputeNextFree, computeChainShifts, applyChainShifts } from '../utils/timeConflicts';
 import { FaPlus, FaRegLightbulb, FaFilter, FaTags, FaTimes } from 'react-icons/fa';
 import toast from 'react-hot-toast';
@@ -38,6 +38,8 @@ const PlannerPage = () => {
   };
 
   const todayLocalYMD = getLocalYMD();
+  // Day shown in the task list; only its plans are fetched
+  const activeDate = selectedDate || todayLocalYMD;
   const todayDisplay = (() => { const d=new Date(); return `${d.getDate()}-${d.getMonth()+1}-${d.getFullYear()}`; })();
   const [showCustomSubjectForm, setShowCustomSubjectForm] = useState(false);
   const [selectedCustomCategory, setSelectedCustomCategory] = useState('study');
@@ -49,19 +51,19 @@ const PlannerPage = () => {
 
   const language = userPrefs?.language || 'english';
 
-  // Fetch user plans when component mounts
+  // Fetch the shown day's plans on mount and when another day is selected
   useEffect(() => {
     if (user) {
       fetchUserPlans();
     }
-  }, [user]);
+  }, [user, activeDate]);
 
   // Poll plans periodically to catch background auto-reschedules
   useEffect(() => {
     if (!user) return;
     const timer = setInterval(async () => {
       try {
-        const response = await getUserPlans();
+        const response = await getDayPlans(activeDate);
         const plans = response.plans || [];
         let changed = false;
         
@@ -89,7 +91,7 @@ const PlannerPage = () => {
       } catch (_) {}
     }, 120000); // 2 minutes
     return () => clearInterval(timer);
-  }, [user, tasks]);
+  }, [user, tasks, activeDate]);
 
   // Ask for Notification permission once
   useEffect(() => {
@@ -147,7 +149,7 @@ const PlannerPage = () => {
   const fetchUserPlans = async () => {
     setIsLoading(true);
     try {
-      const response = await getUserPlans();
+      const response = await getDayPlans(activeDate);
       const plans = response.plans || [];
       // Notify user for any newly auto-rescheduled tasks - disabled
       try {
@@ -220,12 +222,12 @@ const PlannerPage = () => {
   // Local helper: compute conflict for proposed start time
   const hasLocalTimeConflict = async (proposedStartTime, duration) => {
     if (!proposedStartTime) return false;
-    try { const res = await getUserPlans(); return utilHasOverlap(res?.plans||[], proposedStartTime, duration); } catch { return false; }
+    try { const res = await getDayPlanSlots(); return utilHasOverlap(res?.plans||[], proposedStartTime, duration); } catch { return false; }
   };
 
   const computeNextFreeStart = async (desiredStart, duration) => {
     if (!desiredStart) return '';
-    try { const res = await getUserPlans(); return utilComputeNextFree(res?.plans||[], desiredStart, duration); } catch { return ''; }
+    try { const res = await getDayPlanSlots(); return utilComputeNextFree(res?.plans||[], desiredStart, duration); } catch { return ''; }
   };
 
   useEffect(() => {
@@ -292,7 +294,8 @@ Click OK to reschedule existing by +${newTask.duration_minutes} min, or Cancel t
           if (choice && ep.id) {
             // Reschedule existing: push by duration
             // Apply chain shift starting from existing overlapping task
-            const plansRes = await getUserPlans();
+            // New tasks are created for today, so only today's plans can be shifted
+            const plansRes = await getDayPlans();
             const shifts = computeChainShifts(plansRes?.plans||[], existingTime, ep.duration_minutes || newTask.duration_minutes || 0);
             if (shifts.length>0) {
               await applyChainShifts(shifts, updatePlan);
@@ -403,7 +406,6 @@ const getFilteredTasks = () => {
   let filtered = [...tasks];
 
   // Date filter: if selectedDate set show only tasks whose scheduled_date matches; otherwise default to today only for "Today's Tasks" concept
-  const activeDate = selectedDate || todayLocalYMD;
   filtered = filtered.filter(task => (task.scheduled_date || todayLocalYMD) === activeDate);
   
   if (filterStatus !== 'all') {